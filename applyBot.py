@@ -2,37 +2,74 @@ from config.config import *
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
 from utils.application_flow import go_to_job
-from utils.browser_utils import _safe_click, explore_page, setup_driver
+from utils.locators import EXPECTED, find, locator_report
+from utils.browser_utils import _safe_click, explore_page, settle_report, setup_driver
 import sys
 import time
 import random
 from utils.logging_utils import init_log
-from utils.memory_utils import load_qa_memory, load_resume_text
+from utils.memory_utils import load_qa_memory, save_qa_memory
+from utils.ai_utils import init_ai_session
+from utils import ai_cache, ai_engine, cover_store, semantic_index, tracing, wd_profiler
+from utils.worker_pool import WORKERS, clone_profiles, run_pool
+from utils.job_queue import JobQueue, apply_from_queue, crawl
 
 
-def main():
+def main(mode=None):
+    """
+    mode None: crawl and apply interleaved (or the worker pool when WORKERS > 1).
+    "crawl": only walk the search results into the job queue.
+    "apply": only apply to jobs from the job queue (run alongside / after a crawler).
+    """
     init_log()
+    if mode is None and WORKERS > 1:
+        clone_profiles(WORKERS)   # while PROFILE_PATH is not held open by the search browser
     driver = setup_driver()
+    if mode == "crawl":
+        try:
+            crawl(driver, JobQueue())
+        finally:
+            driver.quit()
+        return
     driver.get(SEARCH_URL)
     root = driver.current_window_handle
-    resume_text = load_resume_text(RESUME_PATH)
+    init_ai_session()
     mem = load_qa_memory()
     page = 10
     if(not skip_manual):
         test = input("Press Enter to start processing jobs...")
-    while True:
-        print(f"Processing jobs on page {page}")
-        if random.random() < 0.3:
-            explore_page(driver)
-        title, company = go_to_job(driver, root, mem)
-        
-        page += 10
-        el = driver.find_element(By.CSS_SELECTOR, '[data-testid="pagination-page-next"]')
-        _safe_click(driver, el)
-        time.sleep(2)
+    try:
+        if mode == "apply":
+            apply_from_queue(driver, mem, JobQueue())
+            return
+        if WORKERS > 1:
+            # this browser only crawls the search results; WORKERS other browsers apply
+            run_pool(driver, mem, WORKERS)
+            return
+        while True:
+            print(f"Processing jobs on page {page}")
+            if random.random() < 0.3:
+                explore_page(driver)
+            title, company = go_to_job(driver, root, mem)
+            
+            page += 10
+            el = find(driver, By.CSS_SELECTOR, '[data-testid="pagination-page-next"]', mode=EXPECTED)
+            _safe_click(driver, el)
+            time.sleep(2)
+    finally:
+        # fold the answer journal back into qa_memory.json
+        save_qa_memory(mem)
+        ai_cache.report()
+        cover_store.report()
+        semantic_index.report()
+        ai_engine.shutdown()
+        settle_report()
+        locator_report()
+        tracing.report()
+        wd_profiler.report()
 
 if __name__ == "__main__":
     if (len(sys.argv)>1):
         skip_manual = True
-    main()
+    main(sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] in ("crawl", "apply") else None)
     #application_field("How many years of Jira projects experience do you have?")
\ No newline at end of file
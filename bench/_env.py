@@ -0,0 +1,25 @@
+import importlib.machinery
+import importlib.util
+import os
+import sys
+
+# Benchmarks must run on a fresh (offline) checkout: if config/config.py doesn't exist yet,
+# load config/config.py.example in its place before anything imports utils/.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_config():
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    if os.path.exists(os.path.join(ROOT, "config", "config.py")):
+        import config.config
+        return config.config
+    import config as pkg
+    path = os.path.join(ROOT, "config", "config.py.example")
+    # no loader is registered for the .example suffix, so name one explicitly
+    loader = importlib.machinery.SourceFileLoader("config.config", path)
+    spec = importlib.util.spec_from_file_location("config.config", path, loader=loader)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules["config.config"] = mod
+    spec.loader.exec_module(mod)
+    pkg.config = mod
+    return mod
@@ -0,0 +1,327 @@
+"""
+Micro-benchmarks for the text-matching and memory-recall hot paths.
+
+    python -m bench.micro                       # all functions, 1k/10k/100k memories
+    python -m bench.micro --sizes 1000,10000 --funcs recall_answer
+    python -m bench.micro --save-baseline       # store the numbers as the new baseline
+
+Memories come in two flavours:
+  synthetic  generated from question templates typical of Indeed forms
+  real       your QA_MEMORY_FILE with answers anonymized, padded with reworded
+             variants of its own questions up to each size (skipped if the file is missing)
+
+Reports ops/sec and p50/p95/p99 latency per function. Results are compared against
+bench/baselines/micro.json (if present) and anything slower than --tolerance is flagged;
+the exit code is 1 when something regressed. Baselines are machine specific, save one
+on the machine you compare on.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+from bench._env import load_config
+
+config = load_config()
+
+from utils.answer_utils import adapt_answer_to_question, infer_question_category
+from utils.memory_utils import recall_answer
+from utils.qa_memory import QAMemory
+from utils.text_utils import _normalize_q, fuzzy_match_option, fuzzy_match_question, normalize_answer
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baselines", "micro.json")
+SEED = 1234
+
+# --- corpora --- #
+_STEMS = [
+    "How many years of {skill} experience do you have?",
+    "Do you have experience with {skill}?",
+    "Are you comfortable working {mode}?",
+    "Have you worked with {skill} in a {env} environment?",
+    "What is your level of proficiency in {skill}?",
+    "Are you willing to relocate to {city}?",
+    "Can you commute to {city} for this position?",
+    "Do you have a valid {cert} certification?",
+    "What is your desired salary for a {mode} role?",
+    "Are you legally authorized to work in {country}?",
+    "Will you now or in the future require sponsorship to work in {country}?",
+    "Please describe your experience with {skill} and {skill2}.",
+    "Which {env} tools have you used for {skill}?",
+    "How many years of experience do you have in {env}?",
+    "Are you available to work {shift} shifts?",
+]
+_FILL = {
+    "skill": ["Python", "Java", "SQL", "AWS", "Kubernetes", "React", "Excel", "Salesforce", "Tableau",
+              "customer service", "project management", "data analysis", "Linux", "Terraform", "Go",
+              "machine learning", "QuickBooks", "SAP", "C++", "Docker", "GraphQL", "Spark", "Figma"],
+    "mode": ["remotely", "on-site", "hybrid", "full-time", "part-time", "contract"],
+    "env": ["enterprise", "startup", "healthcare", "financial services", "manufacturing", "agile", "DevOps"],
+    "city": ["Austin, TX", "Denver, CO", "Seattle, WA", "Chicago, IL", "Boston, MA", "Atlanta, GA", "Remote"],
+    "cert": ["CompTIA Security+", "PMP", "AWS Solutions Architect", "CPA", "CISSP", "Six Sigma", "driver's license"],
+    "country": ["the United States", "Canada", "the UK"],
+    "shift": ["night", "weekend", "rotating", "12-hour", "overtime"],
+}
+_OPTION_SETS = [
+    ["Yes", "No"],
+    ["Yes", "No", "Prefer not to say"],
+    ["Less than 1 year", "1-2 years", "3-5 years", "6-10 years", "More than 10 years"],
+    ["High school or equivalent", "Associate's", "Bachelor's", "Master's", "Doctorate"],
+    ["Beginner", "Intermediate", "Advanced", "Expert"],
+    ["Male", "Female", "Non-binary", "Decline to self identify"],
+    ["Alabama", "Alaska", "Arizona", "Arkansas", "California", "Colorado", "Connecticut", "Delaware",
+     "Florida", "Georgia", "Hawaii", "Idaho", "Illinois", "Indiana", "Iowa", "Kansas", "Kentucky",
+     "Louisiana", "Maine", "Maryland", "Massachusetts", "Michigan", "Minnesota", "Texas", "Washington"],
+]
+_RAW_ANSWERS = ["yes", "No", "Y", "n", "true", "0", "bachelor", "M.S.", "phd", "5", "3-5 years",
+                "Intermediate", "I have built ETL pipelines for five years.", "f", "Expert", "remote"]
+_QUALIFIERS = ["", "", " for this {role} role", " at {company}", " in the last {n} years", " as a {role}",
+               " for our {company} client", " (minimum {n} years)"]
+_ROLES = ["software engineer", "data analyst", "nurse", "warehouse associate", "account manager", "technician",
+          "project coordinator", "sales representative", "DevOps engineer", "accountant", "teacher", "driver"]
+_SYLLABLES = ["ac", "me", "glo", "bex", "ini", "tech", "um", "bra", "vo", "lux", "tri", "dyne", "sol", "ora", "nex", "zen"]
+_FILLER = ["please", "currently", "really", "any", "professional", "hands-on", "total"]
+
+
+def _template_question(rng):
+    stem = rng.choice(_STEMS)
+    picks = {k: rng.choice(v) for k, v in _FILL.items()}
+    picks["skill2"] = rng.choice(_FILL["skill"])
+    qualifier = rng.choice(_QUALIFIERS).format(
+        role=rng.choice(_ROLES),
+        company="".join(rng.choice(_SYLLABLES) for _ in range(3)).title(),
+        n=rng.randint(1, 15),
+    )
+    question = stem.format(**picks)
+    return question[:-1] + qualifier + question[-1]
+
+def _answer_for(rng, question):
+    q = question.lower()
+    if q.startswith(("how many years", "what is your desired")):
+        return str(rng.randint(0, 15))
+    if q.startswith(("what is your level", "which")):
+        return {"text": rng.choice(_OPTION_SETS[4]), "value": str(rng.randint(1, 4))}
+    if q.startswith("please describe"):
+        return "Several years of hands-on work."
+    return rng.choice(["Yes", "No"])
+
+def reword(rng, question):
+    """A plausible re-phrasing: dropped/inserted filler words, case and punctuation noise."""
+    words = question.rstrip("?").split()
+    op = rng.random()
+    if op < 0.35 and len(words) > 4:
+        del words[rng.randrange(1, len(words))]
+    elif op < 0.7:
+        words.insert(rng.randrange(1, len(words) + 1), rng.choice(_FILLER))
+    else:
+        i = rng.randrange(len(words) - 1)
+        words[i], words[i + 1] = words[i + 1], words[i]
+    text = " ".join(words) + rng.choice(["?", "", " ?", "."])
+    return text.upper() if rng.random() < 0.05 else text
+
+def synthetic_memory(size, rng):
+    mem = QAMemory()
+    while len(mem) < size:
+        q = _template_question(rng)
+        mem[_normalize_q(q)] = {"kind": "text", "answer": _answer_for(rng, q), "ts": ""}
+    return mem
+
+def _anonymize(answer):
+    if isinstance(answer, dict):
+        return {k: _anonymize(v) for k, v in answer.items()}
+    if isinstance(answer, list):
+        return [_anonymize(a) for a in answer]
+    if not isinstance(answer, str):
+        return answer
+    if answer.strip().lower() in ("yes", "no", "true", "false") or re.fullmatch(r"\d+(\.\d+)?", answer.strip()):
+        return answer
+    return re.sub(r"\w", "x", answer)
+
+def real_memory(size, rng, path=None):
+    """QA_MEMORY_FILE with answers scrubbed (emails/urls in questions masked), padded by rewording."""
+    path = path or getattr(config, "QA_MEMORY_FILE", "./data/qa_memory.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    seed = []
+    for key, entry in raw.items():
+        if key.startswith("_") or not isinstance(entry, dict):
+            continue
+        q = re.sub(r"\S+@\S+|https?://\S+", "<redacted>", key)
+        seed.append((q, {"kind": entry.get("kind"), "answer": _anonymize(entry.get("answer")), "ts": ""}))
+    if not seed:
+        return None
+    mem = QAMemory()
+    for q, entry in seed[:size]:
+        mem[_normalize_q(q)] = entry
+    attempts = 0
+    while len(mem) < size and attempts < size * 20:
+        q, entry = rng.choice(seed)
+        mem[_normalize_q(reword(rng, q))] = entry
+        attempts += 1
+    return mem
+
+def query_set(mem, rng, n=300):
+    """Questions as a page would ask them: 40% verbatim, 30% reworded, 30% never seen."""
+    keys = [k for k in mem if not k.startswith("_")]
+    out = []
+    for _ in range(n):
+        r = rng.random()
+        if r < 0.4:
+            out.append(rng.choice(keys))
+        elif r < 0.7:
+            out.append(reword(rng, rng.choice(keys)))
+        else:
+            out.append(_template_question(rng))
+    return out
+
+# --- timing --- #
+def _percentile(sorted_vals, p):
+    if not sorted_vals:
+        return 0.0
+    k = min(len(sorted_vals) - 1, max(0, round(p / 100 * (len(sorted_vals) - 1))))
+    return sorted_vals[k]
+
+def measure(fn, args_list, seconds=0.5, min_ops=20, max_ops=200000):
+    """Call fn(*args) cycling through args_list for ~seconds; per-call latency in microseconds."""
+    lat = []
+    clock = time.perf_counter_ns
+    deadline = time.perf_counter() + seconds
+    i = 0
+    while (time.perf_counter() < deadline or i < min_ops) and i < max_ops:
+        args = args_list[i % len(args_list)]
+        t = clock()
+        fn(*args)
+        lat.append((clock() - t) / 1000)
+        i += 1
+    total = sum(lat) / 1e6
+    lat.sort()
+    return {
+        "ops": i,
+        "ops_per_sec": round(i / total, 1) if total else 0.0,
+        "p50_us": round(_percentile(lat, 50), 2),
+        "p95_us": round(_percentile(lat, 95), 2),
+        "p99_us": round(_percentile(lat, 99), 2),
+    }
+
+# --- cases --- #
+def memory_cases(mem, rng, legacy_dict):
+    queries = query_set(mem, rng)
+    keys = [k for k in mem if not k.startswith("_")]
+    cases = {
+        "recall_answer": (lambda q: recall_answer(mem, q), [(q,) for q in queries]),
+        # a 10-question page matched in one batch (QAMemory.find_keys, used by prefill_from_memory)
+        "find_keys[page]": (mem.find_keys, [(queries[i:i + 10],) for i in range(0, len(queries), 10)]),
+        # one stored question against one page question, as the legacy scan does per key
+        "fuzzy_match_question": (fuzzy_match_question, [(rng.choice(keys), q) for q in queries]),
+    }
+    if legacy_dict:
+        plain = dict(mem)
+        cases["recall_answer[dict]"] = (lambda q: recall_answer(plain, q), [(q,) for q in queries])
+    return cases
+
+def standalone_cases(rng):
+    questions = [_template_question(rng) for _ in range(300)]
+    stored = [(rng.choice(_RAW_ANSWERS), rng.choice(_OPTION_SETS)) for _ in range(300)]
+    adapt = []
+    for q in questions:
+        opts = rng.choice(_OPTION_SETS + [None])
+        ans = _answer_for(rng, q)
+        adapt.append((rng.choice([ans, [ans, rng.choice(_RAW_ANSWERS)]]), q, opts))
+    return {
+        "_normalize_q": (_normalize_q, [(q,) for q in questions]),
+        "normalize_answer": (normalize_answer, [(a,) for a in _RAW_ANSWERS]),
+        "fuzzy_match_option": (fuzzy_match_option, stored),
+        "adapt_answer_to_question": (adapt_answer_to_question, adapt),
+        "infer_question_category": (infer_question_category,
+                                    [(q, a) for q, a in zip(questions, [_answer_for(rng, q) for q in questions])]),
+    }
+
+
+def run(sizes, funcs=None, seconds=0.5, corpora=("synthetic", "real"), legacy_max=10000, qa_file=None):
+    results = {}
+
+    def record(name, corpus, size, fn, args_list):
+        if funcs and name not in funcs:
+            return
+        key = f"{name}|{corpus}|{size}"
+        results[key] = measure(fn, args_list, seconds)
+        r = results[key]
+        print(f"{name:<26}{corpus:<11}{size:>8}{r['ops_per_sec']:>13,.0f}{r['p50_us']:>11.1f}{r['p95_us']:>11.1f}{r['p99_us']:>11.1f}")
+
+    print(f"{'function':<26}{'corpus':<11}{'size':>8}{'ops/sec':>13}{'p50 us':>11}{'p95 us':>11}{'p99 us':>11}")
+    for name, (fn, args_list) in standalone_cases(random.Random(SEED)).items():
+        record(name, "-", 0, fn, args_list)
+    for corpus in corpora:
+        for size in sizes:
+            rng = random.Random(SEED + size)
+            t = time.perf_counter()
+            mem = synthetic_memory(size, rng) if corpus == "synthetic" else real_memory(size, rng, qa_file)
+            if mem is None:
+                print(f"({corpus} corpus skipped: no usable QA_MEMORY_FILE)")
+                break
+            build = time.perf_counter() - t
+            print(f"  -- {corpus} memory, {len(mem)} entries (built in {build:.1f}s)")
+            for name, (fn, args_list) in memory_cases(mem, rng, size <= legacy_max).items():
+                record(name, corpus, size, fn, args_list)
+    return results
+
+def compare(results, baseline, tolerance):
+    """Names of results whose throughput dropped (or p95 rose) by more than tolerance."""
+    regressed = []
+    for key, r in results.items():
+        b = baseline.get(key)
+        if not b:
+            continue
+        slower = r["ops_per_sec"] < b["ops_per_sec"] * (1 - tolerance)
+        tail = r["p95_us"] > b["p95_us"] * (1 + tolerance) * 1.5   # tails are noisier, give them more room
+        if slower or tail:
+            regressed.append(key)
+            print(f"REGRESSION {key}: {b['ops_per_sec']:,.0f} -> {r['ops_per_sec']:,.0f} ops/sec, "
+                  f"p95 {b['p95_us']:.1f} -> {r['p95_us']:.1f} us")
+    return regressed
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="1000,10000,100000")
+    ap.add_argument("--funcs", help="comma separated function names (default: all)")
+    ap.add_argument("--corpus", choices=["synthetic", "real", "both"], default="both")
+    ap.add_argument("--seconds", type=float, default=0.5, help="time budget per function/size")
+    ap.add_argument("--legacy-max", type=int, default=10000,
+                    help="largest memory to run the plain-dict recall_answer scan on")
+    ap.add_argument("--qa-file", help="memory file for the 'real' corpus (default: QA_MEMORY_FILE)")
+    ap.add_argument("--baseline", default=BASELINE_FILE)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    args = ap.parse_args(argv)
+
+    corpora = ("synthetic", "real") if args.corpus == "both" else (args.corpus,)
+    results = run([int(s) for s in args.sizes.split(",")], set(args.funcs.split(",")) if args.funcs else None,
+                  args.seconds, corpora, args.legacy_max, args.qa_file)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline} ({len(results)} entries)")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        regressed = compare(results, json.load(f), args.tolerance)
+    print(f"{len(regressed)} regression(s) against {args.baseline}" if regressed else "No regressions against baseline.")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
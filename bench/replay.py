@@ -0,0 +1,241 @@
+"""
+Offline replay benchmark over recorded application flows.
+
+Record fixtures during a normal run with RECORD_FIXTURES_DIR = "./bench/fixtures" in
+config.py, then (no network / OpenAI key needed):
+
+    python -m bench.replay --fixtures ./bench/fixtures [--flows name1,name2] [--repeat 3]
+
+Each recorded flow is served from a local HTTP server under /indeed.com/<flow>/<step>/<path>
+(so the URL-based routing in handle_application sees the same routes), opened in headless
+Chrome and walked by the real handle_application with ai_funnel stubbed out. Reports wall
+time, WebDriver commands and AI calls per page.
+"""
+import argparse
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+from bench._env import load_config
+
+config = load_config()
+
+_SCRIPT_RE = re.compile(r"<script\b[^>]*>.*?</script\s*>", re.I | re.S)
+_CONTINUE_RE = r"continue|review|submit|next|apply|finish"
+
+# Recorded pages are static snapshots: their own scripts are stripped and any
+# continue/submit-like button navigates to the next recorded step instead.
+_NAV_JS = """<script>
+document.addEventListener('click', e => {
+    const b = e.target.closest('button, [role=button]');
+    if (!b || !/%s/i.test(b.innerText || '')) return;
+    e.preventDefault(); e.stopPropagation();
+    setTimeout(() => { location.href = %s; }, 30);
+}, true);
+</script>"""
+
+
+def load_flows(fixtures, only=None):
+    flows = {}
+    for name in sorted(os.listdir(fixtures)):
+        meta_path = os.path.join(fixtures, name, "meta.json")
+        if not os.path.exists(meta_path) or (only and name not in only):
+            continue
+        with open(meta_path, "r", encoding="utf-8") as f:
+            flows[name.lower()] = dict(json.load(f), folder=os.path.join(fixtures, name))
+    return flows
+
+def step_url(base, flow, i, meta):
+    if i >= len(meta["steps"]):
+        return f"{base}/indeed.com/{flow}/end/post-apply"
+    return f"{base}/indeed.com/{flow}/{i}{meta['steps'][i]['path']}"
+
+
+def make_server(flows, port=0):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            parts = self.path.split("?")[0].split("/")
+            # ['', 'indeed.com', flow, step, ...original path]
+            if len(parts) < 4 or parts[1] != "indeed.com" or parts[2].lower() not in flows:
+                return self._send(404, "<html><body>not recorded</body></html>")
+            flow, meta = parts[2].lower(), flows[parts[2].lower()]
+            if parts[3] == "end":
+                return self._send(200, "<html><body><h1>Application submitted (replay)</h1></body></html>")
+            i = int(parts[3])
+            with open(os.path.join(meta["folder"], meta["steps"][i]["file"]), "r", encoding="utf-8") as f:
+                page = _SCRIPT_RE.sub("", f.read())
+            base = f"http://127.0.0.1:{self.server.server_port}"
+            nav = _NAV_JS % (_CONTINUE_RE, json.dumps(step_url(base, flow, i + 1, meta)))
+            page = page.replace("</body>", nav + "</body>") if "</body>" in page else page + nav
+            self._send(200, page)
+
+        def _send(self, code, body):
+            data = body.encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class FakeAI:
+    """Stands in for ai_funnel: deterministic answers, one call counted per page."""
+
+    def __init__(self):
+        self.calls = {}
+        self.page = "?"
+
+    def __call__(self, messages, **kwargs):
+        self.calls[self.page] = self.calls.get(self.page, 0) + 1
+        fmt = (kwargs.get("text") or {}).get("format") or {}
+        if fmt.get("type") == "json_schema":
+            props = fmt["schema"]["properties"]
+            out = {k: (p["enum"][0] if p.get("enum") else "1") for k, p in props.items()}
+            return SimpleNamespace(output_text=json.dumps(out))
+        content = messages[-1]["content"]
+        if "Options:\n- " in content:
+            return SimpleNamespace(output_text=content.split("Options:\n- ", 1)[1].split("\n")[0])
+        if "cover letter" in content.lower():
+            return SimpleNamespace(output_text="Dear Hiring Manager,\n\nReplay cover letter.\n\nRegards")
+        return SimpleNamespace(output_text="1")
+
+
+def sandbox(tmp):
+    """Point every file the flow writes at a temp dir and replace the model with FakeAI."""
+    from utils import (ai_utils, applied_index, cover_store, fixtures, logging_utils, memory_utils,
+                       semantic_index, sqlite_store, tracing)
+    config.USE_OPENAI = True
+    config.OPENAI_KEY = config.OPENAI_KEY or "replay"
+    config.USE_AI_CACHE = False
+    config.WD_PROFILE = True
+    ai_utils.USE_OPENAI = True
+    cover_store.USE_COVER_STORE = False
+    fixtures.RECORD_FIXTURES_DIR = None          # don't record the replay itself
+    semantic_index.SEMANTIC_RECALL = False       # would index FakeAI answers next to the real memory
+    config.STORAGE_BACKEND = "json"              # the sqlite backend writes to SQLITE_DB_FILE
+    sqlite_store.SQLITE_DB_FILE = os.path.join(tmp, "applybot.db")
+    memory_utils.QA_MEMORY_FILE = os.path.join(tmp, "qa_memory.json")
+    memory_utils.MISSED_Q_COUNTS_JSON = logging_utils.MISSED_Q_COUNTS_JSON = os.path.join(tmp, "missed_counts.json")
+    logging_utils.MISSED_Q_LOG_CSV = os.path.join(tmp, "missed_questions.csv")
+    logging_utils.LOG_FILE = os.path.join(tmp, "jobs_applied_")
+    tracing.TRACE_DIR = os.path.join(tmp, "traces")
+    applied_index._index = applied_index.AppliedIndex(path=os.path.join(tmp, "applied.db"))
+    fake = FakeAI()
+    ai_utils.ai_funnel = fake
+    return fake
+
+
+def headless_driver(chrome_binary=None):
+    from selenium import webdriver
+    from utils.browser_utils import install_settle_hook
+    from utils.locators import IMPLICIT_WAIT
+    from utils.wd_profiler import profile_driver
+    opts = webdriver.ChromeOptions()
+    opts.add_argument("--headless=new")
+    opts.add_argument("--no-sandbox")
+    opts.add_argument("--disable-dev-shm-usage")
+    opts.add_argument("--window-size=1080,1080")
+    if chrome_binary:
+        opts.binary_location = chrome_binary
+    driver = webdriver.Chrome(options=opts)   # chromedriver must be on PATH when offline
+    driver.implicitly_wait(IMPLICIT_WAIT)
+    install_settle_hook(driver)
+    return profile_driver(driver)
+
+
+def run(fixtures, only=None, repeat=1, chrome_binary=None):
+    from utils import application_flow
+    from utils.qa_memory import QAMemory
+
+    flows = load_flows(fixtures, only)
+    if not flows:
+        print(f"No recorded flows in {fixtures}")
+        return {}
+    tmp = tempfile.mkdtemp(prefix="applybot-replay-")
+    fake = sandbox(tmp)
+    server = make_server(flows)
+    base = f"http://127.0.0.1:{server.server_port}"
+    driver = headless_driver(chrome_binary)
+
+    pages = {}   # route -> {"visits", "wall", "cmds", "wd_secs", "ai"}
+    current = {"route": None, "t": None, "cmds": 0, "secs": 0.0}
+
+    def close_page():
+        if current["route"] is None:
+            return
+        n, secs = driver._wd_app.total()
+        row = pages.setdefault(current["route"], {"visits": 0, "wall": 0.0, "cmds": 0, "wd_secs": 0.0, "ai": 0})
+        row["visits"] += 1
+        row["wall"] += time.perf_counter() - current["t"]
+        row["cmds"] += n - current["cmds"]
+        row["wd_secs"] += secs - current["secs"]
+        current["route"] = None
+
+    orig_set_page = application_flow.set_page
+
+    def set_page(drv, route):
+        close_page()
+        route = re.sub(r"^/indeed\.com/[^/]+/(\d+|:n)", "", route) or "/"
+        n, secs = drv._wd_app.total()
+        current.update(route=route, t=time.perf_counter(), cmds=n, secs=secs)
+        fake.page = route
+        orig_set_page(drv, route)
+
+    application_flow.set_page = set_page
+    started = time.perf_counter()
+    results = []
+    try:
+        root = driver.current_window_handle
+        for _ in range(repeat):
+            for flow, meta in flows.items():
+                mem = QAMemory()
+                job = dict(meta["job"])
+                t0 = time.perf_counter()
+                driver.switch_to.window(root)
+                driver.execute_script("window.open(arguments[0]);", step_url(base, flow, 0, meta))
+                ok = application_flow.handle_application(driver, root, mem, job, timeout=5)
+                close_page()
+                results.append((flow, ok, time.perf_counter() - t0))
+                driver._wd_app = type(driver._wd_app)()
+                current.update(cmds=0, secs=0.0)
+    finally:
+        application_flow.set_page = orig_set_page
+        driver.quit()
+        server.shutdown()
+
+    for route, row in pages.items():
+        row["ai"] = fake.calls.get(route, 0)
+    print(f"\nReplayed {len(results)} flow run(s) in {time.perf_counter() - started:.1f}s")
+    for flow, ok, secs in results:
+        print(f"  {flow:<40} {'submitted' if ok else 'NOT submitted':<14} {secs:6.1f}s")
+    print(f"\n{'page':<45}{'visits':>7}{'wall s':>9}{'wd cmds':>9}{'wd s':>8}{'ai calls':>10}")
+    for route, row in sorted(pages.items(), key=lambda kv: -kv[1]["wall"]):
+        v = row["visits"]
+        print(f"{route[:44]:<45}{v:>7}{row['wall'] / v:>9.2f}{row['cmds'] / v:>9.0f}{row['wd_secs'] / v:>8.2f}{row['ai'] / v:>10.1f}")
+    return {"flows": results, "pages": pages}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--fixtures", default=os.path.join(os.path.dirname(__file__), "fixtures"))
+    ap.add_argument("--flows", help="comma separated flow directory names (default: all)")
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--chrome-binary", help="Chrome/Chromium executable if not the default")
+    args = ap.parse_args(argv)
+    run(args.fixtures, set(args.flows.split(",")) if args.flows else None, args.repeat, args.chrome_binary)
+
+
+if __name__ == "__main__":
+    main()
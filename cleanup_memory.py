@@ -1,53 +1,23 @@
 import json
-import re
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import util
 from config.config import *
 from utils.text_utils import _normalize_q
 from utils.text_utils import _norm
-
-def infer_question_category(question_text, answer):
-    """
-    Infers a detailed category for a question based on its answer type
-    and, for booleans, its polarity (positive/negative framing).
-    """
-    # First, determine the basic answer type
-    answer_type = "text" # Default
-    if isinstance(answer, list):
-        answer_type = "list"
-    elif isinstance(answer, dict):
-        answer_type = "dict"
-    elif isinstance(answer, (int, float)):
-        answer_type = "numeric"
-    elif isinstance(answer, str):
-        if re.match(r'^\d+(\.\d+)?$', answer.strip()):
-            answer_type = "numeric"
-        elif answer.strip().lower() in ["yes", "no", "true", "false"]:
-            answer_type = "boolean"
-
-    # If it's a boolean question, determine its polarity
-    if answer_type == "boolean":
-        q_lower = question_text.lower()
-        # Keywords indicating a negatively framed question (where 'No' is the desired answer for an authorized person)
-        negative_keywords = ["require", "future", "need visa"]
-        if any(keyword in q_lower for keyword in negative_keywords):
-            return "boolean_negative"
-        else:
-            # Assume positive framing otherwise (e.g., "Are you authorized...")
-            return "boolean_positive"
-            
-    return answer_type
+from utils.memory_utils import load_qa_memory, save_qa_memory
+from utils.answer_utils import infer_question_category
+from utils.embedding_cache import EmbeddingCache
 
 def cleanup_qa_memory():
     """
     Interactively cleans the QA memory file by categorizing questions by answer
     type and polarity, then performs semantic clustering within each category.
     """
-    try:
-        with open(QA_MEMORY_FILE, "r", encoding="utf-8") as f:
-            mem = json.load(f)
-    except FileNotFoundError:
+    mem = load_qa_memory()
+    if not mem:
         print(f"Error: {QA_MEMORY_FILE} not found. Make sure you are in the correct directory.")
         return
+    # compact the journal first so swapping in the cleaned file can't be undone by a replay
+    save_qa_memory(mem)
 
     # --- 1. Categorize questions by type and polarity ---
     print("Step 1: Categorizing questions by type and polarity...")
@@ -66,8 +36,8 @@ def cleanup_qa_memory():
 
     # --- 2. Perform semantic clustering within each category ---
     print("\nStep 2: Performing semantic clustering...")
-    print("Loading sentence transformer model...")
-    model = SentenceTransformer('all-mpnet-base-v2')
+    # cached embeddings: only questions added since the last run get encoded
+    encoder = EmbeddingCache('all-mpnet-base-v2')
     
     final_groups = []
 
@@ -83,7 +53,7 @@ def cleanup_qa_memory():
                 })
             continue
 
-        embeddings = model.encode(q_list, convert_to_tensor=True)
+        embeddings = encoder.encode(q_list, convert_to_tensor=True)
         clusters = util.community_detection(embeddings, min_community_size=15, threshold=0.55)
         
         processed_indices = set()
@@ -180,12 +150,11 @@ def prune_redundant_questions():
     their answer is consistent with the slot's canonical answer. Flags
     inconsistencies for manual review.
     """
-    try:
-        with open(QA_MEMORY_FILE, "r", encoding="utf-8") as f:
-            mem = json.load(f)
-    except FileNotFoundError:
+    mem = load_qa_memory()
+    if not mem:
         print(f"Error: {QA_MEMORY_FILE} not found.")
         return
+    save_qa_memory(mem)
 
     slots = mem.get("_slots", {})
     questions_to_process = {k: v for k, v in mem.items() if not k.startswith('_')}
@@ -0,0 +1,6 @@
+from utils.sqlite_store import migrate_from_files
+
+# One-shot import of qa_memory.json, missed_question_counts.json and the daily
+# jobs_applied_*.csv logs into SQLITE_DB_FILE. Set STORAGE_BACKEND = "sqlite" afterwards.
+if __name__ == "__main__":
+    migrate_from_files()
@@ -1,16 +1,16 @@
-import json
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import util
 from config.config import QA_MEMORY_FILE
+from utils.memory_utils import load_qa_memory
+from utils.embedding_cache import EmbeddingCache
 
 def analyze_question_frequency():
     """
     Analyzes the QA memory file to find the most frequently asked types of questions,
     which are ideal candidates for creating new slots.
     """
-    try:
-        with open(QA_MEMORY_FILE, "r", encoding="utf-8") as f:
-            mem = json.load(f)
-    except FileNotFoundError:
+    # snapshot + journal, so answers not yet compacted are included
+    mem = load_qa_memory()
+    if not mem:
         print(f"Error: {QA_MEMORY_FILE} not found.")
         return
 
@@ -22,11 +22,11 @@ def analyze_question_frequency():
         return
 
     # --- Use Sentence Transformers for accurate semantic clustering ---
-    print("Step 2: Loading sentence transformer model...")
-    model = SentenceTransformer('all-mpnet-base-v2')
+    print("Step 2: Loading embedding cache...")
+    encoder = EmbeddingCache('all-mpnet-base-v2')
     
     print("Step 3: Generating embeddings and clustering questions...")
-    embeddings = model.encode(questions_to_process, convert_to_tensor=True)
+    embeddings = encoder.encode(questions_to_process, convert_to_tensor=True)
     # A lower threshold is better for finding broader topics
     clusters = util.community_detection(embeddings, min_community_size=9, threshold=0.66)
 
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from config import config
+from utils.text_utils import _norm, _normalize_q
+
+# Disk-backed cache in front of ai_funnel for application_field / application_select.
+# Entries are keyed by question, options, resume and (optionally) job description,
+# expire after a TTL and are evicted least-recently-used once the cache is full.
+AI_CACHE_FILE = getattr(config, "AI_CACHE_FILE", "./data/ai_cache.db")
+AI_CACHE_MAX_ENTRIES = getattr(config, "AI_CACHE_MAX_ENTRIES", 20000)
+AI_CACHE_TTL_DAYS = getattr(config, "AI_CACHE_TTL_DAYS", 30)
+AI_CACHE_UNKNOWN_TTL_DAYS = getattr(config, "AI_CACHE_UNKNOWN_TTL_DAYS", 3)
+AI_CACHE_USE_DESC = getattr(config, "AI_CACHE_USE_DESC", False)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key       TEXT PRIMARY KEY,
+    value     TEXT,           -- JSON encoded answer, null = model had no usable answer
+    expires   REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS answers_last_used ON answers(last_used);
+"""
+
+def _sha1(text):
+    return hashlib.sha1((text or "").encode("utf-8", "ignore")).hexdigest()
+
+def desc_fingerprint(desc):
+    """Job-description part of the key; empty unless AI_CACHE_USE_DESC is on."""
+    if not AI_CACHE_USE_DESC:
+        return ""
+    return _sha1(_norm(desc))[:16]
+
+def cache_key(kind, question, options=None, resume_hash="", desc=""):
+    parts = {
+        "kind": kind,
+        "q": _normalize_q(question),
+        "opts": sorted(_norm(o) for o in (options or [])),
+        "resume": resume_hash,
+        "desc": desc_fingerprint(desc),
+    }
+    return _sha1(json.dumps(parts, sort_keys=True, ensure_ascii=False))
+
+
+class AnswerCache:
+    """LRU + TTL answer store backed by a small SQLite file; thread safe."""
+
+    def __init__(self, path=AI_CACHE_FILE, max_entries=AI_CACHE_MAX_ENTRIES,
+                 ttl_days=AI_CACHE_TTL_DAYS, unknown_ttl_days=AI_CACHE_UNKNOWN_TTL_DAYS):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl = ttl_days * 86400
+        self.unknown_ttl = unknown_ttl_days * 86400
+        self.hits = self.misses = self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._size = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+    def get(self, key):
+        """Return (hit, value). value may be None for a cached 'unknown'."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires FROM answers WHERE key = ?", (key,)).fetchone()
+            if row and row[1] > now:
+                with self._conn:
+                    self._conn.execute("UPDATE answers SET last_used = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                return True, json.loads(row[0])
+            if row:
+                with self._conn:
+                    self._conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+                self._size -= 1
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        now = time.time()
+        ttl = self.ttl if value not in (None, "") else self.unknown_ttl
+        with self._lock, self._conn:
+            existed = self._conn.execute("SELECT 1 FROM answers WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT INTO answers(key, value, expires, last_used) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value=excluded.value, expires=excluded.expires, last_used=excluded.last_used",
+                (key, json.dumps(value, ensure_ascii=False), now + ttl, now),
+            )
+            if not existed:
+                self._size += 1
+            if self._size > self.max_entries:
+                self._evict(self._size - self.max_entries)
+
+    def _evict(self, n):
+        # expired rows go first, then the least recently used ones
+        self._conn.execute(
+            "DELETE FROM answers WHERE key IN (SELECT key FROM answers ORDER BY (expires <= ?) DESC, last_used ASC LIMIT ?)",
+            (time.time(), n),
+        )
+        self._size -= n
+        self.evictions += n
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "entries": self._size,
+            "evictions": self.evictions,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_answer_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AnswerCache()
+        return _cache
+
+def report():
+    """Print hit/miss counters if the cache was used this run."""
+    if _cache is not None:
+        s = _cache.stats()
+        print(f"[AI cache] hits={s['hits']} misses={s['misses']} hit_rate={s['hit_rate']:.0%} "
+              f"entries={s['entries']} evictions={s['evictions']}")
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+from config import config
+
+# Runs blocking AI helpers (application_field / application_select) concurrently on a
+# private asyncio loop, so a page's questions wait for the slowest call instead of the sum.
+AI_CONCURRENCY = getattr(config, "AI_CONCURRENCY", 4)
+AI_REQUEST_TIMEOUT = getattr(config, "AI_REQUEST_TIMEOUT", 45)
+
+
+class AnswerEngine:
+    """
+    Event loop on a daemon thread. submit() returns a concurrent.futures.Future, so the
+    browser thread can consume results with as_completed() without touching asyncio.
+    At most `concurrency` calls run at once; each one is cut off after `timeout` seconds.
+    A call cut off keeps its slot until its thread really returns, so requests actually in
+    flight never exceed `concurrency`.
+    """
+
+    def __init__(self, concurrency=AI_CONCURRENCY, timeout=AI_REQUEST_TIMEOUT):
+        self.timeout = timeout
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="ai-engine", daemon=True)
+        self._thread.start()
+        self._sem = asyncio.run_coroutine_threadsafe(self._make_semaphore(concurrency), self.loop).result()
+
+    async def _make_semaphore(self, n):
+        return asyncio.Semaphore(max(1, n))
+
+    async def _run(self, fn, args):
+        await self._sem.acquire()
+        call = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+        call.add_done_callback(lambda _: self._sem.release())
+        return await asyncio.wait_for(asyncio.shield(call), self.timeout)
+
+    def submit(self, fn, *args):
+        return asyncio.run_coroutine_threadsafe(self._run(fn, args), self.loop)
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def concurrent_enabled():
+    return AI_CONCURRENCY > 1
+
+def get_answer_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AnswerEngine()
+        return _engine
+
+def shutdown():
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.close()
+            _engine = None
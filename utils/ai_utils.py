@@ -1,17 +1,125 @@
 from utils.memory_utils import load_resume_text
 from utils.text_utils import _norm, _normalize_q
+from utils.ai_cache import cache_key, get_answer_cache
+from utils.tracing import traced
 from config.config import *
+from config import config
 from openai import OpenAI
 from datetime import datetime
+import hashlib
+import json
+import threading
 
-def ai_funnel(messages):
+# --- prompt templates --- #
+# Each prompt is laid out as [fixed instructions + resume] -> [job description, question, options].
+# The first part is byte-identical on every call of the same kind, so provider-side prompt
+# caching can reuse it; anything that changes per call (including today's date) goes last.
+SELECT_INSTRUCTIONS = (
+    "Your task is to help this user find a job as quickly as possible. If you are unsure of the correct answer, choose the answer most likely to result in an employment offer. "
+    "Given a question and a list of options (as visible to a user), "
+    "choose the SINGLE best option based on the resume. "
+    "IMPORTANT: Respond with the option text EXACTLY as provided. "
+    "The user is a U.S. citizen. The correct answer to an inquiry about requiring sponsorship is 'No'. "
+    "Answer with exactly one of the options or 'unknown'."
+)
+
+FIELD_INSTRUCTIONS = (
+    "You fill job-application text fields using only facts from the provided resume. "
+    "If a question can be answered professionally with a single word, do so. "
+    f"Limit to {max_chars} characters unless the question explicitly requests a list. "
+    "If the resume lacks enough info, make your best guess based on typical experience levels. "
+    "If the question is asking for years, make sure to give an integer number only. "
+    "If question can be answered with a number, only return the number. "
+    "Your task is to help this user find a job as quickly as possible. You may take a few liberties to achieve this goal. "
+    "You may answer with 'N/A' if the question is not applicable to the user. "
+    "If the question asks for a date, answer in mm/dd/yyyy format. "
+    "Return ONLY the filled answer text (no labels, no quotes, no markdown)."
+)
+
+PAGE_INSTRUCTIONS = (
+    "You fill a whole page of a job application at once, using only facts from the provided resume. "
+    "Your task is to help this user find a job as quickly as possible. If you are unsure of the correct answer, choose the answer most likely to result in an employment offer. "
+    "The user is a U.S. citizen. The correct answer to an inquiry about requiring sponsorship is 'No'. "
+    "You receive a JSON list of questions, each with an id, a kind and, for choice questions, a list of options. "
+    "For questions with options, answer with the option text EXACTLY as provided, or 'unknown'. "
+    f"For free-text questions, answer briefly (at most {max_chars} characters unless a list is requested); "
+    "use a single word or a plain integer when that answers it, mm/dd/yyyy for dates and 'N/A' if it does not apply. "
+    "Return a JSON object mapping every question id to its answer."
+)
+
+COVER_INSTRUCTIONS = """You are an expert career coach and professional writer. Your task is to craft a highly compelling, authentic, and tailored cover letter in the user's own voice.
+
+                **CRITICAL GUIDELINES:**
+                1.  **Voice and Persona:** Write in the first person, as if you are the user. Adopt a tone that is professional, confident, and enthusiastic, reflecting their level of experience.
+                2.  **Content Sourcing:** Base the letter *exclusively* on the information provided in the user's resume and the job description. Do not invent skills, experiences, or accomplishments that are not present or directly implied. You may, however, frame existing experiences in the most positive and relevant light.
+                3.  **Strategic Goal:** The letter must not be a summary of the resume. It must connect the user's specific experiences and skills directly to the requirements and language of the job description. Answer: "Why am I the perfect fit for *this* role at *this* company?"
+                4.  **Structure:**
+                    -   Start with a strong opening paragraph stating the role you're applying for and a powerful hook (e.g., a key achievement relevant to the role).
+                    -   Use 1-2 body paragraphs to draw clear parallels between your past successes and the role's responsibilities. Use examples and metrics from the resume.
+                    -   Conclude by reiterating your enthusiasm for the company specifically and your confidence that you can contribute to their goals.
+                5.  **Formatting:** Return ONLY the raw text of the cover letter, ready to be copied and pasted. Do not use markdown (no **bold**, no headings). Use line breaks between paragraphs.
+                6.  **Length:** Concise and persuasive, approximately one page in length when written in a word processor.
+                """
+
+
+class AISession:
+    """
+    Everything the AI helpers share for one run: a single OpenAI client (so its HTTP
+    connection pool is reused across calls) and the resume, read and truncated once.
+    """
+
+    def __init__(self, api_key=None, model=None, resume_path=None):
+        self.model = model or OPENAI_MODEL
+        self.client = OpenAI(api_key=api_key or OPENAI_KEY) if USE_OPENAI else None
+        self.resume = load_resume_text(resume_path or RESUME_PATH)[:MAX_RESUME_CHARS]
+        self.resume_hash = hashlib.sha1(self.resume.encode("utf-8", "ignore")).hexdigest()[:16]
+
+    def prefix(self, instructions):
+        """Stable leading message: instructions followed by the resume."""
+        return {"role": "system", "content": instructions + "\n\nResume:\n<<<\n" + self.resume + "\n>>>"}
+
+    def respond(self, messages, **kwargs):
+        return self.client.responses.create(model=self.model, input=messages, **kwargs)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+def init_ai_session(**kwargs):
+    """Create the run's AISession (called once from applyBot.main)."""
+    global _session
+    with _session_lock:
+        _session = AISession(**kwargs)
+    return _session
+
+def get_ai_session():
+    """The current AISession; created on first use for scripts that skip init_ai_session()."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = AISession()
+        return _session
+
+def resume_hash():
+    """Fingerprint of the resume text the prompts use (part of the AI cache key)."""
+    return get_ai_session().resume_hash
+
+def _cached(kind, question, options, desc):
+    """(cache, key, hit, value) for a question, or a disabled cache when USE_AI_CACHE is off."""
+    if not getattr(config, "USE_AI_CACHE", True):
+        return None, None, False, None
+    cache = get_answer_cache()
+    key = cache_key(kind, question, options, resume_hash(), desc)
+    hit, value = cache.get(key)
+    if hit:
+        print(f"\t[AI cache] {str(value)[:100]}")
+    return cache, key, hit, value
+
+@traced()
+def ai_funnel(messages, **kwargs):
     if(not USE_OPENAI):
         return None
-    client = OpenAI(api_key=OPENAI_KEY)
-    response = client.responses.create(
-        model=OPENAI_MODEL,
-        input=messages,
-    )
+    response = get_ai_session().respond(messages, **kwargs)
     print(f"\t[AI] {response.output_text[:100] + ('...' if len(response.output_text)>100 else '')}")
     return response
 
@@ -19,38 +127,41 @@ def application_select(question: str, options: list[str], qDict: dict, desc: str
     """Return a number of years (float) or None if unknown."""
     if(not USE_OPENAI):
         return None
-    client = OpenAI(api_key=OPENAI_KEY)
     print(f"[{qDict["kind"] or "huh??"}] Autofilling for question: {question}")
-    text = load_resume_text(RESUME_PATH)[:MAX_RESUME_CHARS]
     slim_opts = options[:99]
-    # Ask for JUST a number; robustly parse the first number back.
+    cache, key, hit, cached = _cached("select", question, slim_opts, desc)
+    if hit:
+        return cached
+    session = get_ai_session()
     messages = [
+        session.prefix(SELECT_INSTRUCTIONS),
         {
-            "role": "system",
+            "role": "user",
             "content": (
-                "Your task is to help this user find a job as quickly as possible. If you are unsure of the correct answer, choose the answer most likely to result in an employment offer."
-                "Given a question and a list of options (as visible to a user), "
-                "choose the SINGLE best option based on the resume. "
-                "IMPORTANT: Respond with the option text EXACTLY as provided. "
-                "The user is a U.S. citizen. The correct answer to an inquiry about requiring sponsorship is 'No'"
-                "Resume:\n<<<\n" + text + "\n>>>\n"
                 "Job Description:\n<<<\n" + desc + "\n>>>\n"
                 f"Question: {question}\n"
-                f"Options:\n- " + "\n- ".join(slim_opts) + "\n\n"
-                "Answer with exactly one of the options or 'unknown'."
+                f"Options:\n- " + "\n- ".join(slim_opts)
             ),
-        }
+        },
     ]
     try:
         response = ai_funnel(messages)
+        choice = None
         # Return exact match if present
         for o in slim_opts:
             if response.output_text == o:
-                return o
+                choice = o
+                break
         # Try case-insensitive
-        for o in slim_opts:
-            if _norm(response.output_text) == _norm(o):
-                return o
+        if choice is None:
+            for o in slim_opts:
+                if _norm(response.output_text) == _norm(o):
+                    choice = o
+                    break
+        # 'unknown' / off-list answers are cached too (shorter TTL) so they aren't re-asked every posting
+        if cache:
+            cache.put(key, choice)
+        return choice
     except Exception as e:
         print("[select] API choose_option failed:", e)
     return None
@@ -59,45 +170,115 @@ def application_field(question: str, qDict: dict, desc: str) -> str | None:
     """Return a number of years (float) or None if unknown."""
     if(not USE_OPENAI):
         return None
-    client = OpenAI(api_key=OPENAI_KEY)
     print(f"[{qDict["kind"] or "huh??"}] Autofilling for question: {question}")
-    text = load_resume_text(RESUME_PATH)[:MAX_RESUME_CHARS]
-    # Ask for JUST a number; robustly parse the first number back.
+    cache, key, hit, cached = _cached("field", question, None, desc)
+    if hit:
+        return cached
+    session = get_ai_session()
     messages = [
-        {
-            "role": "system",
-            "content": (
-                "You fill job-application text fields using only facts from the provided resume. "
-                "If a question can be answered professionally with a single word, do so."
-                f"Limit to {max_chars} characters unless the question explicitly requests a list. "
-                "If the resume lacks enough info, make your best guess based on typical experience levels."
-                "If the question is asking for years, make sure to give an integer number only."
-                "If question can be answered with a number, only return the number."
-                "Your task is to help this user find a job as quickly as possible. You may take a few liberties to achieve this goal."
-                "You may answer with 'N/A' if the question is not applicable to the user."
-                f"If the question asks for a date, answer in mm/dd/yyyy format. The current date is {datetime.now().isoformat()[:10]}."
-            ),
-        },
+        session.prefix(FIELD_INSTRUCTIONS),
         {
             "role": "user",
             "content": (
-                "Resume:\n<<<\n"
-                f"{text}\n"
-                ">>>\n\n"
                 "Job Description:\n<<<\n" + desc + "\n>>>\n"
-                f"Question:\n{question}\n\n"
-                "Return ONLY the filled answer text (no labels, no quotes, no markdown)."
+                f"The current date is {datetime.now().isoformat()[:10]}.\n"
+                f"Question:\n{question}"
             ),
         },
     ]
     try:
         response = ai_funnel(messages)
+        if cache:
+            cache.put(key, response.output_text or None)
         return response.output_text
 
     except Exception as e:
         print("API call failed:", e)
     return None
 
+def _match_option(answer, options):
+    """Option text exactly as listed for a model answer (exact, then case/space-insensitive), else None."""
+    if not isinstance(answer, str):
+        return None
+    for o in options:
+        if answer == o:
+            return o
+    for o in options:
+        if _norm(answer) == _norm(o):
+            return o
+    return None
+
+def _page_schema(items):
+    """JSON schema for the page answer: one string per question id, option questions limited to their options."""
+    props = {}
+    for it in items:
+        if it.get("options"):
+            props[it["id"]] = {"type": "string", "enum": list(dict.fromkeys(list(it["options"]) + ["unknown"]))}
+        else:
+            props[it["id"]] = {"type": "string"}
+    return {"type": "object", "properties": props, "required": list(props), "additionalProperties": False}
+
+def application_page(items: list[dict], desc: str) -> dict | None:
+    """
+    Answer every unresolved question of a page with one model call.
+    items: [{"id", "question", "kind", "options" (list[str] or None)}]
+    Returns {id: answer or None}; option answers are always one of the listed options.
+    Returns None if the request itself failed (callers fall back to per-question calls).
+    """
+    if(not USE_OPENAI) or not items:
+        return None
+    answers, pending, cached = {}, [], {}
+    for it in items:
+        opts = (it.get("options") or [])[:99] or None
+        it = dict(it, options=opts)
+        cache, key, hit, value = _cached("select" if opts else "field", it["question"], opts, desc)
+        if hit:
+            answers[it["id"]] = value
+            continue
+        cached[it["id"]] = (cache, key)
+        pending.append(it)
+    if not pending:
+        return answers
+
+    print(f"[AI page] Answering {len(pending)} question(s) in one request")
+    session = get_ai_session()
+    listing = [
+        {"id": it["id"], "kind": it["kind"], "question": it["question"], **({"options": it["options"]} if it["options"] else {})}
+        for it in pending
+    ]
+    messages = [
+        session.prefix(PAGE_INSTRUCTIONS),
+        {
+            "role": "user",
+            "content": (
+                "Job Description:\n<<<\n" + desc + "\n>>>\n"
+                f"The current date is {datetime.now().isoformat()[:10]}.\n"
+                "Questions (JSON):\n" + json.dumps(listing, ensure_ascii=False)
+            ),
+        },
+    ]
+    try:
+        response = ai_funnel(messages, text={"format": {
+            "type": "json_schema", "name": "page_answers", "schema": _page_schema(pending), "strict": True,
+        }})
+        raw = json.loads(response.output_text)
+    except Exception as e:
+        print("[AI page] Batched request failed:", e)
+        return None
+
+    for it in pending:
+        value = raw.get(it["id"])
+        if it["options"]:
+            value = _match_option(value, it["options"])
+        elif not isinstance(value, str) or not value.strip() or value.strip().lower() == "unknown":
+            value = None
+        answers[it["id"]] = value
+        cache, key = cached[it["id"]]
+        if cache:
+            cache.put(key, value)
+    return answers
+
+
 def heuristic_pick_for_slot(slot_key, options_texts):
     nopts = [_norm(x) for x in options_texts]
     if slot_key == "country":
@@ -132,44 +313,20 @@ def heuristic_pick_for_slot(slot_key, options_texts):
             return options_texts[best_i]
     return None
 
+@traced()
 def cover_letter_ai(desc: str) -> str | None:
     if(not USE_OPENAI):
         return None
-    client = OpenAI(api_key=OPENAI_KEY)
-    text = load_resume_text(RESUME_PATH)[:MAX_RESUME_CHARS]
-    # Ask for JUST a number; robustly parse the first number back.
+    session = get_ai_session()
     messages = [
-        {
-            "role": "system",
-            "content": """You are an expert career coach and professional writer. Your task is to craft a highly compelling, authentic, and tailored cover letter in the user's own voice.
-
-                **CRITICAL GUIDELINES:**
-                1.  **Voice and Persona:** Write in the first person, as if you are the user. Adopt a tone that is professional, confident, and enthusiastic, reflecting their level of experience.
-                2.  **Content Sourcing:** Base the letter *exclusively* on the information provided in the user's resume and the job description. Do not invent skills, experiences, or accomplishments that are not present or directly implied. You may, however, frame existing experiences in the most positive and relevant light.
-                3.  **Strategic Goal:** The letter must not be a summary of the resume. It must connect the user's specific experiences and skills directly to the requirements and language of the job description. Answer: "Why am I the perfect fit for *this* role at *this* company?"
-                4.  **Structure:**
-                    -   Start with a strong opening paragraph stating the role you're applying for and a powerful hook (e.g., a key achievement relevant to the role).
-                    -   Use 1-2 body paragraphs to draw clear parallels between your past successes and the role's responsibilities. Use examples and metrics from the resume.
-                    -   Conclude by reiterating your enthusiasm for the company specifically and your confidence that you can contribute to their goals.
-                5.  **Formatting:** Return ONLY the raw text of the cover letter, ready to be copied and pasted. Do not use markdown (no **bold**, no headings). Use line breaks between paragraphs.
-                """
-        },
+        session.prefix(COVER_INSTRUCTIONS),
         {
             "role": "user",
-            "content": f"""Please write a cover letter for me based on my resume and the following job description.
-
-                **Job Description:**
-                <<<
-                {desc}
-                >>>
-
-                **My Resume:**
-                <<<
-                {text}
-                >>>
-
-                Please write the cover letter as if you are me, using the first person perspective. Focus on aligning my background with the key requirements of the role. The letter should be concise, persuasive, and approximately one page in length when written in a word processor.
-                """
+            "content": (
+                "Please write a cover letter for me based on my resume and the following job description, "
+                "as if you are me, focusing on aligning my background with the key requirements of the role.\n\n"
+                "Job Description:\n<<<\n" + desc + "\n>>>"
+            ),
         },
     ]
     try:
@@ -178,4 +335,4 @@ def cover_letter_ai(desc: str) -> str | None:
 
     except Exception as e:
         print("API call failed:", e)
-    return None
\ No newline at end of file
+    return None
@@ -1,3 +1,4 @@
+import re
 from utils.text_utils import fuzzy_match_option, _norm
 
 def adapt_answer_to_question(stored_answer, current_question, available_options=None):
@@ -35,4 +36,36 @@ def adapt_to_available_options(stored_answer, available_options):
         return adapted_answers if adapted_answers else None
     else:
         # For radio/select
-        return fuzzy_match_option(stored_answer, available_options)
\ No newline at end of file
+        return fuzzy_match_option(stored_answer, available_options)
+
+def infer_question_category(question_text, answer):
+    """
+    Infers a detailed category for a question based on its answer type
+    and, for booleans, its polarity (positive/negative framing).
+    """
+    # First, determine the basic answer type
+    answer_type = "text" # Default
+    if isinstance(answer, list):
+        answer_type = "list"
+    elif isinstance(answer, dict):
+        answer_type = "dict"
+    elif isinstance(answer, (int, float)):
+        answer_type = "numeric"
+    elif isinstance(answer, str):
+        if re.match(r'^\d+(\.\d+)?$', answer.strip()):
+            answer_type = "numeric"
+        elif answer.strip().lower() in ["yes", "no", "true", "false"]:
+            answer_type = "boolean"
+
+    # If it's a boolean question, determine its polarity
+    if answer_type == "boolean":
+        q_lower = question_text.lower()
+        # Keywords indicating a negatively framed question (where 'No' is the desired answer for an authorized person)
+        negative_keywords = ["require", "future", "need visa"]
+        if any(keyword in q_lower for keyword in negative_keywords):
+            return "boolean_negative"
+        else:
+            # Assume positive framing otherwise (e.g., "Are you authorized...")
+            return "boolean_positive"
+            
+    return answer_type
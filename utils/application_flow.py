@@ -1,23 +1,37 @@
 import time
+import threading
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import StaleElementReferenceException, ElementClickInterceptedException, TimeoutException, NoSuchElementException
-from utils.ai_utils import cover_letter_ai
-from utils.browser_utils import _safe_click, human_scroll_and_hover, human_sleep, wait_for_url_settled, is_recaptcha_present
-from .form_utils import click_apply, click_continue, click_submit, try_autofill, try_autofill_options, try_autofill_selects, click_add_cover, try_autofill_availability
+from utils.cover_store import await_cover_letter, start_cover_letter
+from utils.ai_engine import concurrent_enabled
+from utils.browser_utils import ChoiceBatch, _route_of, _safe_click, batch_mode, human_scroll_and_hover, human_sleep, page_dwell, wait_for_url_settled, is_recaptcha_present
+from .form_utils import ai_page_batch, answer_concurrently, click_apply, click_continue, click_submit, prefetch_ai_answers, try_autofill, try_autofill_options, try_autofill_selects, click_add_cover, try_autofill_availability
+from .applied_index import get_applied_index
+from .job_cards import filter_cards, harvest_cards
+from .locators import ABSENT, EXPECTED, OPTIONAL, find
+from .tracing import end_trace, span, start_trace, step
+from .wd_profiler import application_done, set_page
+from .fixtures import record_step, start_recording, stop_recording
 from .logging_utils import log_missed_questions, log_job
 from .memory_utils import recall_answer
-from .question_utils import extract_questions_with_elements, has_answer_on_page, pause_and_remember_questions, prefill_from_memory, remember_present_answers_without_pause
+from .question_utils import FormState, extract_questions_with_elements, has_answer_on_page, pause_and_remember_questions, prefill_from_memory, remember_present_answers_without_pause
+
+_applied_this_run = set()  # job keys opened this run, submitted or not (the search page can repeat cards)
+_captcha_lock = threading.Lock()  # one reCAPTCHA prompt on stdin at a time (parallel workers)
 
 def go_to_job(driver, root, mem):
-    job_cards = driver.find_elements(By.XPATH, "//div[contains(@class, 'cardOutline') and .//*[contains(text(), 'Easily apply')] and not(.//*[contains(text(), 'Visited')])]")    
-    print(f"Found {len(job_cards)} jobs with Indeed Apply button on this page.")
+    # one script call reads every card; filters run before anything is clicked
+    cards = harvest_cards(driver)
+    job_cards = filter_cards(cards, applied=get_applied_index(), handled=_applied_this_run)
+    print(f"Found {len(job_cards)} of {len(cards)} jobs worth applying to on this page.")
     #time.sleep(1000)
-    for job in job_cards:
+    for card in job_cards:
         try:
+            job = card.element
             if job:
                 print("Found job with easily apply button")
                 human_scroll_and_hover(driver, job)
@@ -27,28 +41,63 @@ def go_to_job(driver, root, mem):
                 backup = job.find_elements(By.TAG_NAME, "a")[0]
                 _safe_click(driver, backup)
                 human_sleep(2, 3)
-                desc = driver.find_element(By.ID, "jobDescriptionText")
-                title = driver.find_element(By.XPATH, "//h2[contains(@data-testid, 'jobsearch-JobInfoHeader-title')]")
-                company = driver.find_element(By.XPATH, "//div[contains(@data-testid, 'inlineHeader-companyName')]")
-                job_url = company.find_element(By.TAG_NAME, "a").get_attribute("href") or ""
-                status = driver.find_element(By.ID, "salaryInfoAndJobType") or ""
-                job_obj = {"desc": desc.text, "title": title.text, "company": company.text or "", "url": job_url or "", "status": status.text or "???"}
-                if "clearance" in (desc.text or "").lower():
-                    print("Skipping job requiring clearance")
-                    continue
-                print("\n\n----- NEW JOB START -----")
-                click_apply(driver)  # opens new tab
-                time.sleep(2)
-                handle_application(driver, root, mem, job_obj, timeout=5)  # <— walk the flow, answer, submit
+                apply_to_job(driver, root, mem, card)
         except Exception as e:
             print(f"Skip job: {e}")
     return None, None
 
-def handle_application(driver, root, mem, job_obj, timeout=20):
+def read_job(driver, card):
+    """job_obj for the job currently shown (search-page pane or the job's own page)."""
+    desc = find(driver, By.ID, "jobDescriptionText", mode=EXPECTED)
+    title = find(driver, By.XPATH, "//h2[contains(@data-testid, 'jobsearch-JobInfoHeader-title')]", mode=EXPECTED, budget=2)
+    company = find(driver, By.XPATH, "//div[contains(@data-testid, 'inlineHeader-companyName')]", mode=EXPECTED, budget=2)
+    link = find(company, By.TAG_NAME, "a", mode=ABSENT)  # not every company has a page
+    job_url = (link.get_attribute("href") if link else "") or ""
+    status = find(driver, By.ID, "salaryInfoAndJobType", mode=ABSENT)  # many postings show no pay
+    return {"desc": desc.text, "title": title.text, "company": company.text or "", "url": job_url or "", "status": (status.text if status else "") or "???", "job_key": card.job_key}
+
+def apply_to_job(driver, root, mem, card):
+    """
+    Read the opened job and walk its application. Returns the outcome:
+    "submitted", "skipped" (deliberately passed over) or "not_submitted" (the flow gave up).
+    Jobs whose full description mentions a clearance are skipped.
+    """
+    start_trace(job_key=card.job_key, title=card.title, company=card.company)
+    set_page(driver, "job")
+    outcome = "error"
+    try:
+        with span("read_job"):
+            job_obj = read_job(driver, card)
+        if "clearance" in (job_obj["desc"] or "").lower():
+            print("Skipping job requiring clearance")
+            outcome = "skipped"
+            return outcome
+        print("\n\n----- NEW JOB START -----")
+        # letter is written in the background while we walk the earlier steps
+        cover = start_cover_letter(job_obj)
+        try:
+            with span("click_apply"):
+                click_apply(driver)  # opens new tab
+                time.sleep(2)
+            submitted = handle_application(driver, root, mem, job_obj, timeout=5, cover=cover)  # <— walk the flow, answer, submit
+            if card.job_key:
+                _applied_this_run.add(card.job_key)
+            outcome = "submitted" if submitted else "not_submitted"
+            return outcome
+        finally:
+            if cover is not None:
+                cover.cancel()  # skipped/aborted before generation started: no letter is written
+    finally:
+        end_trace(outcome=outcome)
+        application_done(driver, card.title)
+
+def handle_application(driver, root, mem, job_obj, timeout=20, cover=None):
     """
     Switches to the new tab, walks the Indeed flow based on URL,
     answers questions (with memory), and submits at review.
     Then closes the tab and returns to root.
+    cover: optional future from start_cover_letter() for this job.
+    Returns True if the application was submitted.
     """
        # wait for new tab and switch
     try:
@@ -61,8 +110,9 @@ def handle_application(driver, root, mem, job_obj, timeout=20):
 
     # settle after tab switch (Indeed often does an initial SPA/redirect)
     wait_for_url_settled(driver, timeout=20, settle_time=0.8, max_hops=3)
-    driver.implicitly_wait(1)
+    start_recording(job_obj)
     done = False
+    submitted = False
     steps = 0
     URLS = {}
     while not done and steps < 15:
@@ -71,16 +121,19 @@ def handle_application(driver, root, mem, job_obj, timeout=20):
             steps += 1
             url = (driver.current_url or "").lower()
             print("Flow URL:", url)
+            step("step:" + _route_of(url))
+            set_page(driver, _route_of(url))
             if url in URLS:
                 URLS[url] += 1
             else:
                 URLS[url] = 1
+                record_step(driver)
             if URLS[url] >= 5:
                 print("Already visited this URL 3 times; aborting to avoid loop.")
                 done = True
                 break
             if "resume-selection-module" in url:
-                el = driver.find_element(By.CSS_SELECTOR, '[data-testid="resume-selection-file-resume-radio-card"]')
+                el = find(driver, By.CSS_SELECTOR, '[data-testid="resume-selection-file-resume-radio-card"]', mode=EXPECTED, budget=3)
                 _safe_click(driver, el)
 
                 click_continue(driver)
@@ -93,17 +146,32 @@ def handle_application(driver, root, mem, job_obj, timeout=20):
                 questions = extract_questions_with_elements(driver)  # ensure this returns locators
 
                 print(f"Prefilling questions({len(questions)})...")
-                prefill_from_memory(driver, questions, mem)
+                # batch mode: choices are queued and applied per pass instead of clicked one by one
+                batch = ChoiceBatch() if batch_mode() else None
+                prefill_from_memory(driver, questions, mem, batch=batch)
+                if batch is not None:
+                    batch.commit(driver)
                 print("Prefill done.")
+                # one bulk read of every answer on the page, refreshed only after we change the form
+                state = FormState(driver, questions)
                 
+                if ai_page_batch():
+                    # everything still unresolved goes to the model in one request
+                    prefetch_ai_answers(driver, mem, questions, job_obj.get("desc") or "", state=state)
+                if concurrent_enabled():
+                    # whatever still needs a per-question call goes out concurrently
+                    answer_concurrently(driver, mem, questions, job_obj.get("desc") or "", state=state, batch=batch)
                 print("Trying autofill...")
-                try_autofill(driver, mem, questions, job_obj.get("desc") or "")
+                try_autofill(driver, mem, questions, job_obj.get("desc") or "", state=state)
                 print("Trying autofill selects...")
-                try_autofill_selects(driver, mem, questions, job_obj.get("desc") or "")
+                try_autofill_selects(driver, mem, questions, job_obj.get("desc") or "", state=state, batch=batch)
                 print("Trying autofill options...")
-                try_autofill_options(driver, mem, questions, job_obj.get("desc") or "")
+                try_autofill_options(driver, mem, questions, job_obj.get("desc") or "", state=state, batch=batch)
+                if batch is not None and len(batch):
+                    batch.commit(driver)
+                    state.invalidate()
                 print("Trying autofill availability...")
-                try_autofill_availability(driver, mem, questions, job_obj.get("desc") or "")
+                try_autofill_availability(driver, mem, questions, job_obj.get("desc") or "", state=state)
                 print("Autofill done.")
                 # 2) Evaluate which required questions still lack answers
                 missing_required = []
@@ -111,7 +179,7 @@ def handle_application(driver, root, mem, job_obj, timeout=20):
                     #TODO: answering all for now - uncomment later?
                     if not q.get("required"):
                         continue
-                    if not has_answer_on_page(driver, q):
+                    if not has_answer_on_page(driver, q, state):
                         # If we also *don't* have a remembered answer, we'll need to pause
                         if recall_answer(mem, q["question"]) is None:
                             missing_required.append(q)
@@ -134,9 +202,11 @@ def handle_application(driver, root, mem, job_obj, timeout=20):
                     pause_and_remember_questions(driver)'''
                 else:
                     # 4) No pause; optionally record any prefilled answers that weren't in memory yet
-                    remember_present_answers_without_pause(driver, questions, mem)
+                    remember_present_answers_without_pause(driver, questions, mem, state)
 
                 # 5) Proceed
+                if batch is not None:
+                    page_dwell()  # one page-level pause instead of per-click pacing
                 click_continue(driver)
                 wait_for_url_settled(driver, timeout=20, settle_time=0.8, max_hops=3)
 
@@ -147,21 +217,25 @@ def handle_application(driver, root, mem, job_obj, timeout=20):
                     continue
 
                 if is_recaptcha_present(driver):
-                    print("!!!!!!!!!!!reCAPTCHA detected on review page; cannot proceed automatically.!!!!!!!!!!!")
-                    test = input("Please complete reCAPTCHA in browser, then press Enter here to continue...")
-                    test = None
-                    print("Continuing after reCAPTCHA...")
+                    # with parallel workers several tabs can hit this at once; prompt one at a time
+                    with _captcha_lock:
+                        print("!!!!!!!!!!!reCAPTCHA detected on review page; cannot proceed automatically.!!!!!!!!!!!")
+                        print(f"Job: {job_obj.get('title')} @ {job_obj.get('company')}")
+                        test = input("Please complete reCAPTCHA in browser, then press Enter here to continue...")
+                        test = None
+                        print("Continuing after reCAPTCHA...")
 
                 if click_submit(driver):
+                    submitted = True
                     print(f"====== Application complete! ======\n\n")
-                    log_job(job_obj.get("title"), job_obj.get("company"), job_obj.get("url") or "", job_obj.get("status") or "", job_obj.get("desc") or "")
+                    log_job(job_obj.get("title"), job_obj.get("company"), job_obj.get("url") or "", job_obj.get("status") or "", job_obj.get("desc") or "", job_key=job_obj.get("job_key") or "")
                     wait_for_url_settled(driver, timeout=5, settle_time=0.8, max_hops=3)
                     done = True
                 else:
                     click_continue(driver)
                     wait_for_url_settled(driver, timeout=20, settle_time=0.8, max_hops=3)
             elif ("/additional-documents" in url):
-                cover_letter_navigate(driver, desc=job_obj.get("desc") or "")
+                cover_letter_navigate(driver, job_obj, cover=cover)
             elif ("postresumeapply" in url):
                 wait_for_url_settled(driver, timeout=4, settle_time=0.8, max_hops=3)
 
@@ -192,7 +266,7 @@ def handle_application(driver, root, mem, job_obj, timeout=20):
         except Exception as e:
             print(f"Error during application flow: {e}")
 
-    driver.implicitly_wait(5)
+    stop_recording()
     # close tab and return
     try:
         driver.close()
@@ -203,24 +277,24 @@ def handle_application(driver, root, mem, job_obj, timeout=20):
     except Exception:
         pass
 
-    return True
+    return submitted
 
-def cover_letter_navigate(driver, desc):
+def cover_letter_navigate(driver, job_obj, cover=None):
     try:
-        el = driver.find_element(By.XPATH, "//*[@data-testid='cover-letter-radio-card-label']")
+        el = find(driver, By.XPATH, "//*[@data-testid='cover-letter-radio-card-label']", mode=EXPECTED, budget=3)
         _safe_click(driver, el)
 
-        cover_text = cover_letter_ai(desc) or ""
+        cover_text = await_cover_letter(cover, job_obj) or ""
             
-        textarea = driver.find_element(By.XPATH, "//textarea[@data-testid='cover-letter-radio-card-text-area']")
+        textarea = find(driver, By.XPATH, "//textarea[@data-testid='cover-letter-radio-card-text-area']", mode=EXPECTED, budget=3)
 
         # Try to click clear button if available and enabled
         try:
-            clear_button = driver.find_element(By.XPATH, "//*[@data-testid='cover-letter-radio-card-clear-button']")
+            clear_button = find(driver, By.XPATH, "//*[@data-testid='cover-letter-radio-card-clear-button']", mode=OPTIONAL)
             if clear_button.get_attribute("aria-disabled") == "false":
                 clear_button.click()
                 time.sleep(0.5)  # wait a bit for clear to take effect
-                el = driver.find_element(By.XPATH, "//*[@data-testid='confirm-dialog-confirm-button']")
+                el = find(driver, By.XPATH, "//*[@data-testid='confirm-dialog-confirm-button']", mode=EXPECTED, budget=3)
                 _safe_click(driver, el)
             else:
                 # If disabled, clear textarea directly
@@ -0,0 +1,256 @@
+import atexit
+import csv
+import glob
+import hashlib
+import io
+import math
+import os
+import re
+import sqlite3
+import threading
+from config import config
+from utils import sqlite_store
+from utils.text_utils import _norm
+
+# Jobs already applied to, across runs / profiles / machines. Keys are the Indeed job key
+# when known; only applications with no job key (old CSV rows whose URL carries none) are
+# stored by company+title, so a new posting with the same title isn't taken for an old one.
+# A Bloom filter
+# answers "definitely not applied" without touching disk; hits are confirmed in SQLite.
+# The daily CSV logs are ingested incrementally by byte offset, so old logs are read once.
+APPLIED_INDEX_FILE = getattr(config, "APPLIED_INDEX_FILE", "./data/applied_index.db")
+APPLIED_BLOOM_CAPACITY = getattr(config, "APPLIED_BLOOM_CAPACITY", 100000)
+APPLIED_BLOOM_FP_RATE = getattr(config, "APPLIED_BLOOM_FP_RATE", 0.01)
+APPLIED_BLOOM_SAVE_EVERY = getattr(config, "APPLIED_BLOOM_SAVE_EVERY", 20)  # recorded jobs between Bloom bit writes
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS applied (
+    key TEXT PRIMARY KEY          -- 'jk:<job key>', or 'ct:<company>|<title>' when there was none
+);
+CREATE TABLE IF NOT EXISTS sources (
+    path   TEXT PRIMARY KEY,      -- ingested CSV log (or 'sqlite:applications')
+    offset INTEGER NOT NULL       -- bytes consumed (row id for the sqlite source)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name  TEXT PRIMARY KEY,
+    value BLOB
+);
+"""
+
+KEY_SCHEME = "jk-else-ct"   # older indexes stored company+title for every application
+
+_JK_RE = re.compile(r"[?&](?:jk|vjk)=([0-9a-f]+)", re.I)
+
+def job_key_from_url(url):
+    m = _JK_RE.search(url or "")
+    return m.group(1) if m else ""
+
+def _ct_key(company, title):
+    company = _norm((company or "").split("\n")[0])
+    title = _norm((title or "").split("\n")[0])
+    return f"ct:{company}|{title}" if company and title else None
+
+def keys_for(job_key="", company="", title=""):
+    """Key to store for an application: its job key, or company+title only when there is none."""
+    if job_key:
+        return ["jk:" + job_key]
+    ct = _ct_key(company, title)
+    return [ct] if ct else []
+
+def lookup_keys(job_key="", company="", title=""):
+    """Keys a job is checked against: its job key, and the company+title of applications that had none."""
+    keys = ["jk:" + job_key] if job_key else []
+    ct = _ct_key(company, title)
+    return keys + [ct] if ct else keys
+
+
+class BloomFilter:
+    def __init__(self, capacity, fp_rate, bits=None):
+        self.m = max(8, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.k = max(1, round(self.m / capacity * math.log(2)))
+        self.bits = bytearray(bits) if bits is not None and len(bits) == (self.m + 7) // 8 else bytearray((self.m + 7) // 8)
+
+    def _positions(self, key):
+        d = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = int.from_bytes(d[:8], "big"), int.from_bytes(d[8:], "big") | 1
+        return [(h1 + i * h2) % self.m for i in range(self.k)]
+
+    def add(self, key):
+        for p in self._positions(key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+class AppliedIndex:
+    """Bloom filter in memory, exact key set in SQLite; thread safe."""
+
+    def __init__(self, path=APPLIED_INDEX_FILE, capacity=APPLIED_BLOOM_CAPACITY, fp_rate=APPLIED_BLOOM_FP_RATE):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self.bloom_hits = self.bloom_misses = self.false_positives = 0
+        self._unsaved = 0   # keys added since the Bloom bits were last saved
+        if self._meta("key_scheme") != KEY_SCHEME:
+            self._rekey()
+        self._load_bloom(capacity, fp_rate)
+
+    # --- bloom persistence --- #
+    def _meta(self, name):
+        row = self._conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _rekey(self):
+        """Drop keys written under an older scheme; ingest_logs() rebuilds them from the logs."""
+        with self._conn:
+            self._conn.execute("DELETE FROM applied")
+            self._conn.execute("DELETE FROM sources")
+            self._conn.execute("DELETE FROM meta")
+            self._conn.execute("INSERT INTO meta(name, value) VALUES ('key_scheme', ?)", (KEY_SCHEME,))
+
+    def _load_bloom(self, capacity, fp_rate):
+        size = self._conn.execute("SELECT COUNT(*) FROM applied").fetchone()[0]
+        params = self._params = f"{capacity}:{fp_rate}"
+        bits = self._meta("bloom_bits")
+        self.bloom = BloomFilter(capacity, fp_rate, bits)
+        # the saved bits are only trusted if they were written for the same params and key count
+        if bits is None or self._meta("bloom_params") != params or self._meta("bloom_count") != size:
+            self.bloom = BloomFilter(capacity, fp_rate)
+            for (key,) in self._conn.execute("SELECT key FROM applied"):
+                self.bloom.add(key)
+            self.save()
+
+    def save(self):
+        """Persist the Bloom bits so the next start doesn't rebuild them."""
+        with self._lock, self._conn:
+            self._unsaved = 0
+            size = self._conn.execute("SELECT COUNT(*) FROM applied").fetchone()[0]
+            self._conn.executemany(
+                "INSERT INTO meta(name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value=excluded.value",
+                [("bloom_bits", bytes(self.bloom.bits)), ("bloom_params", self._params), ("bloom_count", size)],
+            )
+
+    # --- lookups / updates --- #
+    def __contains__(self, key):
+        with self._lock:
+            if key not in self.bloom:
+                self.bloom_misses += 1
+                return False
+            self.bloom_hits += 1
+            found = self._conn.execute("SELECT 1 FROM applied WHERE key = ?", (key,)).fetchone() is not None
+            if not found:
+                self.false_positives += 1
+            return found
+
+    def seen(self, job_key="", company="", title=""):
+        return any(k in self for k in lookup_keys(job_key, company, title))
+
+    def _add_keys(self, keys):
+        new = 0
+        for key in keys:
+            cur = self._conn.execute("INSERT OR IGNORE INTO applied(key) VALUES (?)", (key,))
+            if cur.rowcount:
+                self.bloom.add(key)
+                new += 1
+        return new
+
+    def record(self, job_key="", company="", title=""):
+        """
+        Add an application. The Bloom bits are saved every APPLIED_BLOOM_SAVE_EVERY new keys and
+        on exit; if the run dies in between, the key count no longer matches and they are rebuilt.
+        """
+        with self._lock:
+            with self._conn:
+                self._unsaved += self._add_keys(keys_for(job_key, company, title))
+            if self._unsaved >= APPLIED_BLOOM_SAVE_EVERY:
+                self.save()
+
+    # --- incremental ingest --- #
+    def ingest_logs(self):
+        """Add jobs from CSV logs (and the sqlite applications table) not seen by earlier runs."""
+        added = 0
+        with self._lock:
+            for path in sorted(glob.glob(config.LOG_FILE + "*.csv")):
+                added += self._ingest_csv(path)
+            if sqlite_store.enabled():
+                added += self._ingest_sqlite()
+        if added:
+            self.save()
+            print(f"[applied] Indexed {added} new key(s)")
+        return added
+
+    def _ingest_csv(self, path):
+        row = self._conn.execute("SELECT offset FROM sources WHERE path = ?", (path,)).fetchone()
+        offset = row[0] if row else 0
+        size = os.path.getsize(path)
+        if size < offset:  # file was rewritten: start over
+            offset = 0
+        if size == offset:
+            return 0
+        with open(path, "rb") as f:
+            header = next(csv.reader(io.StringIO(f.readline().decode("utf-8", "replace"))), [])
+            if offset:
+                f.seek(offset)
+            else:
+                offset = f.tell()  # just past the header
+            data = f.read()
+        end = data.rfind(b"\n") + 1  # only whole lines; a half-written row waits for next time
+        text = data[:end].decode("utf-8", "replace")
+        keys = []
+        for rec in csv.DictReader(io.StringIO(text), fieldnames=header):
+            keys += keys_for(job_key_from_url(rec.get("Job URL")), rec.get("Company"), rec.get("Job Title"))
+        with self._conn:
+            added = self._add_keys(keys)
+            self._conn.execute(
+                "INSERT INTO sources(path, offset) VALUES (?, ?) ON CONFLICT(path) DO UPDATE SET offset=excluded.offset",
+                (path, offset + end),
+            )
+        return added
+
+    def _ingest_sqlite(self):
+        src = "sqlite:applications"
+        row = self._conn.execute("SELECT offset FROM sources WHERE path = ?", (src,)).fetchone()
+        last = row[0] if row else 0
+        with sqlite_store._lock:
+            rows = sqlite_store.connect().execute(
+                "SELECT id, company, title, url FROM applications WHERE id > ? ORDER BY id", (last,)
+            ).fetchall()
+        if not rows:
+            return 0
+        keys = []
+        for _, company, title, url in rows:
+            keys += keys_for(job_key_from_url(url), company, title)
+        with self._conn:
+            added = self._add_keys(keys)
+            self._conn.execute(
+                "INSERT INTO sources(path, offset) VALUES (?, ?) ON CONFLICT(path) DO UPDATE SET offset=excluded.offset",
+                (src, rows[-1][0]),
+            )
+        return added
+
+    def stats(self):
+        size = self._conn.execute("SELECT COUNT(*) FROM applied").fetchone()[0]
+        return {"keys": size, "bloom_hits": self.bloom_hits, "bloom_misses": self.bloom_misses,
+                "false_positives": self.false_positives}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_applied_index():
+    """The shared index, with any new log rows ingested on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = AppliedIndex()
+            _index.ingest_logs()
+        return _index
+
+@atexit.register
+def _save_on_exit():
+    if _index is not None and _index._unsaved:
+        _index.save()
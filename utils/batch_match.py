@@ -0,0 +1,89 @@
+from fuzzywuzzy import fuzz
+
+# Page-at-a-time fuzzy matching. One call scores every question (or answer) against every
+# candidate: with rapidfuzz installed that is a single multi-threaded native cdist, otherwise
+# the same fuzzywuzzy loops as before. Scores are the token-sort ratios fuzzywuzzy reports
+# (rounded to int; two empty sides score 100, one empty side 0), so thresholds and tie-breaking
+# don't change.
+try:
+    import numpy as np
+    from rapidfuzz import fuzz as rf_fuzz, process as rf_process
+except ImportError:
+    rf_process = None
+
+
+def sorted_tokens(text):
+    """Cleanup + token sort that fuzz.token_sort_ratio applies to each side."""
+    return fuzz._process_and_sort(text or "", force_ascii=True)
+
+def _could_reach(len_a, len_b, threshold):
+    """
+    Length-only upper bound on fuzz.ratio: it can never exceed 2*min/(a+b).
+    Lets the fallback loop skip choices that cannot possibly clear the threshold.
+    """
+    total = len_a + len_b
+    if total == 0:
+        return True
+    return round(200 * min(len_a, len_b) / total) >= threshold
+
+def _scores(queries, choices, threshold, first_only=False):
+    """
+    For each query: [(choice index, score)] of the choices scoring >= threshold, in choice order
+    (only the first one with first_only). queries/choices are already sorted_tokens() strings.
+    """
+    if not queries or not choices:
+        return [[] for _ in queries]
+    if rf_process is None:
+        out = []
+        for q in queries:
+            row = []
+            for j, c in enumerate(choices):
+                if not _could_reach(len(q), len(c), threshold):
+                    continue
+                s = fuzz.ratio(q, c)
+                if s >= threshold:
+                    row.append((j, s))
+                    if first_only:
+                        break
+            out.append(row)
+        return out
+
+    # rapidfuzz gives the unrounded ratio; fuzzywuzzy rounds it, so keep anything that could round up
+    matrix = rf_process.cdist(queries, choices, scorer=rf_fuzz.ratio, processor=None,
+                              score_cutoff=max(threshold - 0.5, 0), dtype=np.float32, workers=-1)
+    empty = [j for j, c in enumerate(choices) if not c]
+    if empty:
+        matrix[:, empty] = 0   # fuzzywuzzy scores an empty side as 0...
+    out = []
+    for q, row in zip(queries, matrix):
+        if not q:
+            out.append([(j, 100) for j in empty])   # ...unless both are: equal strings score 100
+            continue
+        hits = []
+        for j in np.flatnonzero(row):
+            s = int(round(float(row[j])))
+            if s >= threshold:
+                hits.append((int(j), s))
+        out.append(hits)
+    return out
+
+def first_matches(queries, choices, threshold=85):
+    """
+    Index of the first choice (in choice order) whose ratio against each query reaches the
+    threshold, or None -- what a per-query loop breaking on the first hit would return.
+    """
+    return [row[0][0] if row else None for row in _scores(queries, choices, threshold, first_only=True)]
+
+def best_match(target, choices, threshold=75):
+    """(index, score) of the highest token-sort ratio >= threshold (first one on ties), or (None, 0)."""
+    row = _scores([sorted_tokens(target)], [sorted_tokens(c) for c in choices], threshold)[0]
+    best, best_score = None, 0
+    for j, s in row:
+        if s > best_score:
+            best, best_score = j, s
+    return best, best_score
+
+def matches_any(choices, targets, threshold=75):
+    """Per choice: True if any target's token-sort ratio against it reaches the threshold."""
+    rows = _scores([sorted_tokens(c) for c in choices], [sorted_tokens(t) for t in targets], threshold)
+    return [bool(row) for row in rows]
@@ -3,18 +3,28 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.common.exceptions import StaleElementReferenceException, ElementClickInterceptedException, TimeoutException, NoSuchElementException
+from selenium.common.exceptions import StaleElementReferenceException, ElementClickInterceptedException, TimeoutException, NoSuchElementException, WebDriverException
+from urllib.parse import urlparse
+import re
+import threading
 import time
 import random
 from config import config
+from utils.tracing import traced
+from utils.wd_profiler import WD_PROFILE, profile_driver
+from utils.locators import ABSENT, IMPLICIT_WAIT, OPTIONAL, find, find_all
 
-def setup_driver():
+def setup_driver(profile_path=None):
     options = uc.ChromeOptions()
-    options.add_argument(f"--user-data-dir={config.PROFILE_PATH}")
+    options.add_argument(f"--user-data-dir={profile_path or config.PROFILE_PATH}")
     options.add_argument(f"--profile-directory={config.PROFILE_NAME}")  # or 'Profile 1', etc.
     options.add_argument("--window-size=1080,1080")
     driver = uc.Chrome(use_subprocess=True, options=options)
-    driver.implicitly_wait(5)
+    driver.implicitly_wait(IMPLICIT_WAIT)  # all waiting is explicit, see utils/locators.py
+    if WD_PROFILE:
+        profile_driver(driver)
+    if SETTLE_MODE == "events":
+        install_settle_hook(driver)
     return driver
 
 # === UTILITY FUNCTIONS === #
@@ -59,17 +69,127 @@ def _click_option(driver, opt):
     # Re-find and click
     if opt.get("label_locator"):
         try:
-            lab = driver.find_element(*opt["label_locator"])
-            if _safe_click(driver, lab):
+            lab = find(driver, *opt["label_locator"], mode=OPTIONAL)
+            if lab and _safe_click(driver, lab):
                 return True
         except Exception:
             pass
     try:
-        inp = driver.find_element(*opt["input_locator"])
-        return _safe_click(driver, inp)
+        inp = find(driver, *opt["input_locator"], mode=OPTIONAL)
+        return bool(inp) and _safe_click(driver, inp)
     except Exception:
         return False
     
+def batch_mode():
+    """APPLY_MODE = "batch": apply a page's choices in one script pass instead of human-paced clicks."""
+    return getattr(config, "APPLY_MODE", "stealth") == "batch"
+
+def page_dwell():
+    """Single page-level pause that replaces per-click pacing in batch mode."""
+    human_sleep(*getattr(config, "PAGE_DWELL_TIME", (2.0, 4.0)))
+
+# args[0]: [[op, element, want]] with op "check" (want = desired checked state)
+# or "select" (want = visible option text). Uses native clicks / value setter plus
+# bubbling input+change events so React-controlled inputs pick the change up.
+_APPLY_CHOICES_JS = r"""
+const norm = t => (t || '').replace(/\s+/g, ' ').trim();
+const setValue = Object.getOwnPropertyDescriptor(HTMLSelectElement.prototype, 'value').set;
+return arguments[0].map(([op, el, want]) => {
+    try {
+        if (!el) return false;
+        if (op === 'check') {
+            if (el.checked !== want) el.click();
+            return true;
+        }
+        const opt = Array.from(el.options).find(o => norm(o.text) === norm(want));
+        if (!opt) return false;
+        setValue.call(el, opt.value);
+        opt.selected = true;
+        el.dispatchEvent(new Event('input', {bubbles: true}));
+        el.dispatchEvent(new Event('change', {bubbles: true}));
+        return true;
+    } catch (e) {
+        return false;
+    }
+});
+"""
+
+_VERIFY_CHOICES_JS = r"""
+const norm = t => (t || '').replace(/\s+/g, ' ').trim();
+return arguments[0].map(([op, el, want]) => {
+    try {
+        if (op === 'check') return el.checked === want;
+        const opt = el.options[el.selectedIndex];
+        return !!opt && norm(opt.text) === norm(want);
+    } catch (e) {
+        return false;
+    }
+});
+"""
+
+class ChoiceBatch:
+    """
+    Collects the radio/checkbox/select choices made for one questions page and
+    applies them together: one script pass that sets them, one read-back that
+    verifies them. Used when APPLY_MODE = "batch"; the stealth path clicks
+    each option through _click_option instead.
+    """
+
+    def __init__(self):
+        self._ops = []
+        self._after = []   # (first op, end op, fn): run fn once ops[first:end] are verified
+
+    def __len__(self):
+        return len(self._ops)
+
+    def when_applied(self, fn, since):
+        """Call fn() at commit() if every op queued since len(batch) == since stuck (e.g. remember the answer)."""
+        self._after.append((since, len(self._ops), fn))
+
+    def check(self, driver, opt, want=True):
+        """Queue a radio/checkbox option to end up checked (want=True) or unchecked."""
+        el = opt.get("input") or _resolve(driver, None, opt.get("input_locator"))
+        self._ops.append(("check", el, want, opt.get("label")))
+        return True
+
+    def select(self, driver, q, text):
+        """Queue a <select> choice by visible text. False if the option does not exist."""
+        options = q.get("select_options")
+        if options is None or not any(" ".join(o["text"].split()) == " ".join(text.split()) for o in options):
+            return False
+        el = q.get("input") or _resolve(driver, None, q.get("input_locator"))
+        self._ops.append(("select", el, text, text))
+        return True
+
+    def commit(self, driver):
+        """Apply and verify every queued choice. Returns the labels that did not stick."""
+        if not self._ops:
+            self._run_after([])
+            return []
+        payload = [[op, el, want] for op, el, want, _ in self._ops]
+        try:
+            driver.execute_script(_APPLY_CHOICES_JS, payload)
+            ok = driver.execute_script(_VERIFY_CHOICES_JS, payload)
+        except Exception as e:
+            print(f"[batch] Applying choices failed: {e}")
+            ok = [False] * len(payload)
+        failed = [label for (_, _, _, label), good in zip(self._ops, ok) if not good]
+        print(f"[batch] Applied {len(payload) - len(failed)}/{len(payload)} choice(s) in one pass.")
+        if failed:
+            print(f"[batch] Did not stick: {failed}")
+        self._ops = []
+        self._run_after(ok)
+        return failed
+
+    def _run_after(self, ok):
+        after, self._after = self._after, []
+        for first, end, fn in after:
+            if all(ok[first:end]):
+                try:
+                    fn()
+                except Exception as e:
+                    print(f"[batch] After-commit step failed: {e}")
+
 def _resolve(driver, el, locator):
     if el:
         try:
@@ -79,7 +199,7 @@ def _resolve(driver, el, locator):
             pass
     if locator and not (locator[0] == By.XPATH and locator[1] == "."):
         try:
-            return driver.find_element(*locator)
+            return find(driver, *locator, mode=OPTIONAL)
         except Exception:
             return None
     return None
@@ -103,7 +223,147 @@ def wait_for_document_ready(driver, timeout=10):
         lambda d: d.execute_script("return document.readyState") == "complete"
     )
 
+# --- navigation settle detection --- #
+# A hook injected into every document (CDP Page.addScriptToEvaluateOnNewDocument, or on
+# demand) timestamps History API route changes, fetch/XHR traffic and DOM mutations.
+# wait_for_url_settled then waits *inside the page* until the route, the network and the
+# DOM have been quiet for a short window, instead of polling from Python.
+SETTLE_MODE = getattr(config, "SETTLE_MODE", "events")   # "events" or "poll" (the old polling loop)
+SETTLE_QUIET_MS = getattr(config, "SETTLE_QUIET_MS", 300)
+
+_SETTLE_HOOK_JS = r"""
+(() => {
+    if (window.__abSettle) return;
+    const now = () => performance.now();
+    const ab = window.__abSettle = {lastRoute: now(), lastNet: now(), lastMutation: now(), pending: new Map(), seq: 0};
+    const route = () => { ab.lastRoute = now(); };
+    for (const fn of ['pushState', 'replaceState']) {
+        const orig = history[fn];
+        history[fn] = function () { route(); return orig.apply(this, arguments); };
+    }
+    addEventListener('popstate', route);
+    addEventListener('hashchange', route);
+    const begin = () => { const id = ++ab.seq; ab.pending.set(id, now()); ab.lastNet = now(); return id; };
+    const end = id => { ab.pending.delete(id); ab.lastNet = now(); };
+    if (window.fetch) {
+        const origFetch = window.fetch;
+        window.fetch = function () {
+            const id = begin();
+            return origFetch.apply(this, arguments).finally(() => end(id));
+        };
+    }
+    const origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        const id = begin();
+        this.addEventListener('loadend', () => end(id));
+        return origSend.apply(this, arguments);
+    };
+    // nodes added/removed only: attribute churn (spinners, carousels, class toggles) never settles
+    new MutationObserver(() => { ab.lastMutation = now(); })
+        .observe(document, {childList: true, subtree: true});
+})();
+"""
+
+_SETTLE_WAIT_JS = _SETTLE_HOOK_JS + r"""
+const quiet = arguments[0], limit = arguments[1], done = arguments[arguments.length - 1];
+const ab = window.__abSettle, t0 = performance.now();
+const check = () => {
+    const now = performance.now();
+    // long-polls / beacons older than 5 s don't count as in flight
+    let inflight = 0;
+    for (const started of ab.pending.values()) if (now - started < 5000) inflight++;
+    const last = Math.max(ab.lastRoute, ab.lastNet, ab.lastMutation);
+    if (document.readyState === 'complete' && inflight === 0 && now - last >= quiet)
+        return done({url: location.href, ms: now - t0, settled: true});
+    if (now - t0 >= limit) return done({url: location.href, ms: now - t0, settled: false});
+    setTimeout(check, 25);
+};
+check();
+"""
+
+_settle_stats = {}
+_settle_lock = threading.Lock()
+
+def install_settle_hook(driver):
+    """Have Chrome inject the settle hook into every new document (best effort)."""
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _SETTLE_HOOK_JS})
+        return True
+    except Exception as e:
+        print(f"[settle] CDP hook unavailable, injecting per wait: {e}")
+        return False
+
+def _route_of(url):
+    """URL path with ids/numbers collapsed, e.g. /beta/indeedapply/form/questions/:n"""
+    path = urlparse(url or "").path or "/"
+    return re.sub(r"/(\d+|[0-9a-f]{12,})(?=/|$)", "/:n", path)
+
+def _record_settle(url, seconds):
+    with _settle_lock:
+        _settle_stats.setdefault(_route_of(url), []).append(seconds)
+
+def settle_report():
+    """Print measured settle times per route (count, median, max)."""
+    with _settle_lock:
+        rows = sorted(_settle_stats.items(), key=lambda kv: -sum(kv[1]))
+    for route, times in rows:
+        times = sorted(times)
+        print(f"[settle] {route}: n={len(times)} p50={times[len(times) // 2]:.2f}s max={times[-1]:.2f}s total={sum(times):.1f}s")
+
+@traced()
 def wait_for_url_settled(driver, timeout=20, settle_time=0.8, max_hops=3):
+    """
+    Waits for readyState=complete and follows quick JS redirects.
+    Returns the final URL once the route, network and DOM have been quiet for
+    min(settle_time, SETTLE_QUIET_MS) -- or whatever URL we're on at `timeout`.
+    Full-page redirects end the in-page wait; it is simply restarted on the new
+    document (at most max_hops times before giving up on the quiet check).
+    """
+    if SETTLE_MODE == "poll":
+        return _wait_for_url_settled_polling(driver, timeout, settle_time, max_hops)
+    start = time.time()
+    quiet_ms = int(min(settle_time, SETTLE_QUIET_MS / 1000) * 1000)
+    hops = 0
+    url = None
+    try:
+        prev_script_timeout = driver.timeouts.script
+    except Exception:
+        prev_script_timeout = None
+    try:
+        while True:
+            remaining = timeout - (time.time() - start)
+            if remaining <= 0:
+                break
+            try:
+                driver.set_script_timeout(remaining + 2)
+                res = driver.execute_async_script(_SETTLE_WAIT_JS, quiet_ms, int(remaining * 1000))
+                url = res["url"]
+                break
+            except TimeoutException:
+                break
+            except WebDriverException as e:
+                # the document went away under the script (navigation): wait on the new one
+                hops += 1
+                if hops > max_hops:
+                    print(f"[settle] Falling back to polling: {str(e).splitlines()[0][:120]}")
+                    return _wait_for_url_settled_polling(driver, max(1, timeout - (time.time() - start)), settle_time, max_hops)
+                time.sleep(0.05)
+    finally:
+        # the script timeout is driver-wide; don't leave this wait's value behind
+        if prev_script_timeout is not None:
+            try:
+                driver.set_script_timeout(prev_script_timeout)
+            except Exception:
+                pass
+    if url is None:
+        try:
+            url = driver.current_url
+        except Exception:
+            url = ""
+    _record_settle(url, time.time() - start)
+    return url
+
+def _wait_for_url_settled_polling(driver, timeout=20, settle_time=0.8, max_hops=3):
     """
     Waits for readyState=complete and follows quick JS redirects.
     Returns the final URL after it has remained unchanged for `settle_time` seconds.
@@ -168,27 +428,28 @@ def wait_for_any(driver, selectors, timeout=10):
             pass
     return None
 
-def _locator_for_input(inp):
-    _id = inp.get_attribute("id")
+def _input_locator_from(_id, name, value):
     if _id:
         return (By.ID, _id)
-    name = inp.get_attribute("name")
-    value = inp.get_attribute("value")
     if name and value:
         return (By.CSS_SELECTOR, f'input[name="{name}"][value="{value}"]')
     if name:
         return (By.NAME, name)
     return (By.XPATH, ".")  # last resort
 
-def _locator_for_el(el):
-    _id = el.get_attribute("id")
+def _el_locator_from(_id, name):
     if _id:
         return (By.ID, _id)
-    name = el.get_attribute("name")
     if name:
         return (By.CSS_SELECTOR, f'[name="{name}"]')
     return (By.XPATH, ".")
 
+def _locator_for_input(inp):
+    return _input_locator_from(inp.get_attribute("id"), inp.get_attribute("name"), inp.get_attribute("value"))
+
+def _locator_for_el(el):
+    return _el_locator_from(el.get_attribute("id"), el.get_attribute("name"))
+
 def is_recaptcha_present(driver):
     selectors = [
         "//iframe[@title='reCAPTCHA']",
@@ -197,7 +458,7 @@ def is_recaptcha_present(driver):
     ]
     
     for selector in selectors:
-        el = driver.find_elements(By.XPATH, selector)
+        el = find_all(driver, By.XPATH, selector, mode=ABSENT)
         if len(el) > 0 and el[0].is_displayed():
             return True
     return False
\ No newline at end of file
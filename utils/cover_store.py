@@ -0,0 +1,229 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from config import config
+from utils.ai_utils import cover_letter_ai
+from utils.text_utils import _norm
+from utils.tracing import traced
+
+# Generated cover letters, keyed by a SimHash of the job description plus company/title.
+# A new posting whose description is a near-duplicate of a stored one (reposts, staffing
+# agencies) reuses that letter instead of paying for another generation.
+COVER_STORE_FILE = getattr(config, "COVER_STORE_FILE", "./data/cover_letters.db")
+COVER_STORE_MAX_ENTRIES = getattr(config, "COVER_STORE_MAX_ENTRIES", 500)
+COVER_REUSE_SIMILARITY = getattr(config, "COVER_REUSE_SIMILARITY", 0.85)
+COVER_REUSE_SAME_COMPANY = getattr(config, "COVER_REUSE_SAME_COMPANY", True)
+COVER_RETARGET = getattr(config, "COVER_RETARGET", True)
+USE_COVER_STORE = getattr(config, "USE_COVER_STORE", True)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS letters (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    simhash   INTEGER NOT NULL,   -- 64-bit SimHash of the description (stored signed)
+    company   TEXT,               -- _norm(company)
+    title     TEXT,               -- title as shown on the posting
+    company_raw TEXT,
+    letter    TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS letters_company ON letters(company);
+"""
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_SHINGLE = 3
+
+def _signed(h):
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+def _unsigned(h):
+    return h & ((1 << 64) - 1)
+
+def simhash(text):
+    """64-bit SimHash over word 3-shingles of the normalized text."""
+    words = _WORD_RE.findall((text or "").lower())
+    if len(words) < _SHINGLE:
+        shingles = [" ".join(words)] if words else []
+    else:
+        shingles = [" ".join(words[i:i + _SHINGLE]) for i in range(len(words) - _SHINGLE + 1)]
+    weights = [0] * 64
+    for sh in shingles:
+        h = int.from_bytes(hashlib.blake2b(sh.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    out = 0
+    for bit, w in enumerate(weights):
+        if w > 0:
+            out |= 1 << bit
+    return out
+
+def similarity(a, b):
+    """1.0 for identical fingerprints, down to 0.0 when every bit differs."""
+    return 1.0 - bin(_unsigned(a) ^ _unsigned(b)).count("1") / 64.0
+
+def retarget(letter, old_title, new_title, old_company, new_company):
+    """Swap the stored posting's title/company for the new one's wherever the letter names them."""
+    for old, new in ((old_title, new_title), (old_company, new_company)):
+        if old and new and old != new:
+            letter = re.sub(re.escape(old), lambda _: new, letter, flags=re.I)
+    return letter
+
+
+class CoverStore:
+    """Size-bounded (LRU) SQLite store of generated letters; thread safe."""
+
+    def __init__(self, path=COVER_STORE_FILE, max_entries=COVER_STORE_MAX_ENTRIES,
+                 threshold=COVER_REUSE_SIMILARITY):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.reused = self.generated = self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def find(self, desc, company, title):
+        """(letter, stored title, stored company, similarity) of the closest stored posting above the threshold, or None."""
+        fp = simhash(desc)
+        sql = "SELECT id, simhash, title, company_raw, letter FROM letters"
+        params = ()
+        if COVER_REUSE_SAME_COMPANY:
+            sql += " WHERE company = ?"
+            params = (_norm(company),)
+        with self._lock:
+            best = None
+            for row_id, h, s_title, s_company, letter in self._conn.execute(sql, params):
+                sim = similarity(fp, h)
+                if sim >= self.threshold and (best is None or sim > best[0]):
+                    best = (sim, row_id, letter, s_title, s_company)
+            if best is None:
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE letters SET last_used = ? WHERE id = ?", (time.time(), best[1]))
+            self.reused += 1
+        return best[2], best[3], best[4], best[0]
+
+    def put(self, desc, company, title, letter):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO letters(simhash, company, title, company_raw, letter, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (_signed(simhash(desc)), _norm(company), title, company, letter, time.time()),
+            )
+            self.generated += 1
+            size = self._conn.execute("SELECT COUNT(*) FROM letters").fetchone()[0]
+            if size > self.max_entries:
+                n = size - self.max_entries
+                self._conn.execute(
+                    "DELETE FROM letters WHERE id IN (SELECT id FROM letters ORDER BY last_used ASC LIMIT ?)", (n,)
+                )
+                self.evictions += n
+
+    def stats(self):
+        total = self.reused + self.generated
+        return {
+            "reused": self.reused,
+            "generated": self.generated,
+            "reuse_rate": round(self.reused / total, 3) if total else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_cover_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CoverStore()
+        return _store
+
+def cover_letter_for_job(job_obj):
+    """Cover letter for a job: reused from a near-duplicate posting when possible, otherwise generated and stored."""
+    desc = job_obj.get("desc") or ""
+    company = job_obj.get("company") or ""
+    title = job_obj.get("title") or ""
+    if not USE_COVER_STORE:
+        return cover_letter_ai(desc)
+    store = get_cover_store()
+    hit = store.find(desc, company, title)
+    if hit:
+        letter, s_title, s_company, sim = hit
+        print(f"[cover] Reusing letter from '{s_title}' at '{s_company}' (similarity {sim:.2f})")
+        if COVER_RETARGET:
+            letter = retarget(letter, s_title, title, s_company, company)
+        return letter
+    letter = cover_letter_ai(desc)
+    if letter:
+        store.put(desc, company, title, letter)
+    return letter
+
+def report():
+    """Print reuse counters if the store was used this run."""
+    if _store is not None:
+        s = _store.stats()
+        print(f"[cover store] reused={s['reused']} generated={s['generated']} "
+              f"reuse_rate={s['reuse_rate']:.0%} evictions={s['evictions']}")
+
+
+# --- speculative cover letters --- #
+# The letter for a job is prepared on its own background thread as soon as the job is opened,
+# so by the time the flow reaches /additional-documents it is usually finished. Generation
+# starts COVER_LETTER_PREFETCH_DELAY seconds later (or as soon as the flow asks for it); a job
+# skipped or aborted before then cancels it without paying for a letter. A letter for an
+# abandoned job that already started still lands in the store, and never delays the next job's.
+COVER_LETTER_PREFETCH = getattr(config, "COVER_LETTER_PREFETCH", True)
+COVER_LETTER_PREFETCH_DELAY = getattr(config, "COVER_LETTER_PREFETCH_DELAY", 10)
+COVER_LETTER_TIMEOUT = getattr(config, "COVER_LETTER_TIMEOUT", 120)
+
+
+class _Prefetch(Future):
+    """Future that stays pending (so cancel() works) until its delay passes or wake is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.wake = threading.Event()
+        self.add_done_callback(lambda _: self.wake.set())   # cancel() wakes the thread to exit
+
+def start_cover_letter(job_obj):
+    """Future for cover_letter_for_job(job_obj) running in the background, or None when disabled."""
+    if not config.USE_OPENAI or not COVER_LETTER_PREFETCH:
+        return None
+    future = _Prefetch()
+
+    def run():
+        future.wake.wait(COVER_LETTER_PREFETCH_DELAY)
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(cover_letter_for_job(job_obj))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="cover-letter", daemon=True).start()
+    return future
+
+@traced()
+def await_cover_letter(future, job_obj):
+    """
+    Result of a start_cover_letter() future; produces it now if there is none or it failed.
+    A slow letter is waited on, not generated a second time.
+    """
+    if future is not None:
+        future.wake.set()   # needed now: don't sit out the rest of the delay
+        try:
+            return future.result(timeout=COVER_LETTER_TIMEOUT)
+        except FutureTimeout:
+            print(f"[cover] Letter still generating after {COVER_LETTER_TIMEOUT}s; still waiting for it.")
+            try:
+                return future.result()
+            except Exception as e:
+                print("[cover] Background cover letter unavailable:", repr(e))
+        except Exception as e:
+            print("[cover] Background cover letter unavailable:", repr(e))
+    return cover_letter_for_job(job_obj)
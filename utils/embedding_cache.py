@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+import re
+from config import config
+
+# Sentence embeddings for the offline memory tools (cleanup_memory.py, slot_suggester.py),
+# kept across runs so only questions that weren't seen before get encoded.
+# One <model>.npy matrix + <model>.index.json (sha1(model, text) -> row) per model.
+EMBEDDING_CACHE_DIR = getattr(config, "EMBEDDING_CACHE_DIR", "./data/embeddings")
+EMBEDDING_BATCH = getattr(config, "EMBEDDING_BATCH", 64)
+
+
+def text_key(model_name, text):
+    return hashlib.sha1(f"{model_name}\0{text}".encode("utf-8", "ignore")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, model_name, folder=EMBEDDING_CACHE_DIR):
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.model_name = model_name
+        self.matrix_path = os.path.join(folder, slug + ".npy")
+        self.index_path = os.path.join(folder, slug + ".index.json")
+        self._model = None
+        self.index = {}
+        self.matrix = None
+        self._load()
+
+    def _load(self):
+        import numpy as np
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            matrix = np.load(self.matrix_path)
+        except Exception:
+            return
+        if index.get("model") == self.model_name and len(index.get("rows", {})) == len(matrix):
+            self.index, self.matrix = index["rows"], matrix
+        else:
+            print(f"[embeddings] Cache for {self.model_name} doesn't match its index; starting over.")
+
+    def _save(self):
+        import numpy as np
+        folder = os.path.dirname(self.matrix_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        # matrix first, index second: a crash in between leaves a mismatch that _load discards
+        with open(self.matrix_path + ".tmp", "wb") as f:
+            np.save(f, self.matrix)
+        os.replace(self.matrix_path + ".tmp", self.matrix_path)
+        with open(self.index_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"model": self.model_name, "rows": self.index}, f)
+        os.replace(self.index_path + ".tmp", self.index_path)
+
+    def model(self):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            print(f"Loading sentence transformer model {self.model_name}...")
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def encode(self, texts, convert_to_tensor=False):
+        """
+        Embeddings for texts, in order (same vectors model.encode would return).
+        Only texts missing from the cache are encoded, in batches; the cache is saved after.
+        """
+        import numpy as np
+        keys = [text_key(self.model_name, t) for t in texts]
+        missing = {}
+        for k, t in zip(keys, texts):
+            if k not in self.index and k not in missing:
+                missing[k] = t
+        if missing:
+            print(f"[embeddings] Encoding {len(missing)} new of {len(texts)} question(s)...")
+            new = self.model().encode(list(missing.values()), batch_size=EMBEDDING_BATCH,
+                                      convert_to_numpy=True, show_progress_bar=len(missing) > EMBEDDING_BATCH)
+            new = new.astype(np.float32)
+            start = 0 if self.matrix is None else len(self.matrix)
+            self.matrix = new if self.matrix is None else np.vstack([self.matrix, new])
+            for i, k in enumerate(missing):
+                self.index[k] = start + i
+            self._save()
+        out = self.matrix[[self.index[k] for k in keys]] if keys else np.zeros((0, 0), np.float32)
+        if convert_to_tensor:
+            import torch
+            return torch.from_numpy(out)
+        return out
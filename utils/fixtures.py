@@ -0,0 +1,60 @@
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from urllib.parse import urlparse
+from config import config
+
+# Record mode for the offline replay benchmark (bench/replay.py): with RECORD_FIXTURES_DIR
+# set, the DOM of every application step is saved as <dir>/<flow>/<NN>_<route>.html plus a
+# meta.json describing the flow (job, step order, original paths).
+# Note: recorded pages contain whatever the form showed, including prefilled personal data.
+RECORD_FIXTURES_DIR = getattr(config, "RECORD_FIXTURES_DIR", None)
+
+_local = threading.local()
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", (text or "").lower()).strip("-")[:60] or "page"
+
+def start_recording(job_obj):
+    """Open a new flow directory for this application (no-op unless RECORD_FIXTURES_DIR is set)."""
+    if not RECORD_FIXTURES_DIR:
+        return
+    flow = datetime.now().strftime("%Y%m%d-%H%M%S") + "-" + _slug(job_obj.get("job_key") or job_obj.get("title"))
+    folder = os.path.join(RECORD_FIXTURES_DIR, flow)
+    os.makedirs(folder, exist_ok=True)
+    _local.flow = {
+        "folder": folder,
+        "meta": {
+            "job": {k: job_obj.get(k) or "" for k in ("title", "company", "desc", "status", "job_key")},
+            "steps": [],
+        },
+    }
+
+def record_step(driver):
+    """Save the current page's DOM as the flow's next step."""
+    flow = getattr(_local, "flow", None)
+    if flow is None:
+        return
+    try:
+        url = driver.current_url
+        html = driver.execute_script("return '<!DOCTYPE html>' + document.documentElement.outerHTML;")
+    except Exception as e:
+        print(f"[fixtures] Could not record step: {e}")
+        return
+    parsed = urlparse(url)
+    n = len(flow["meta"]["steps"])
+    name = f"{n:02d}_{_slug(parsed.path)}.html"
+    with open(os.path.join(flow["folder"], name), "w", encoding="utf-8") as f:
+        f.write(html)
+    flow["meta"]["steps"].append({"file": name, "path": parsed.path, "url": url})
+    with open(os.path.join(flow["folder"], "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(flow["meta"], f, ensure_ascii=False, indent=2)
+
+def stop_recording():
+    flow = getattr(_local, "flow", None)
+    _local.flow = None
+    if flow is not None:
+        print(f"[fixtures] Recorded {len(flow['meta']['steps'])} step(s) to {flow['folder']}")
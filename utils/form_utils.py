@@ -1,22 +1,154 @@
 import random
 import re
+from concurrent.futures import as_completed
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
-from utils.ai_utils import application_field, application_select, heuristic_pick_for_slot
-from utils.browser_utils import _click_option, _resolve, _safe_click, human_scroll_and_hover
+from utils.ai_engine import get_answer_engine
+from utils.ai_utils import application_field, application_page, application_select, heuristic_pick_for_slot
+from utils.browser_utils import _resolve, _safe_click, human_scroll_and_hover
+from utils.locators import ABSENT, EXPECTED, find, find_all
+from utils.tracing import traced
 from utils.memory_utils import recall_answer, recall_slot, remember_answer, remember_slot
-from utils.question_utils import detect_slot, has_answer_on_page, is_select_answered, select_by_visible_text
+from utils.question_utils import _choose, detect_slot, has_answer_on_page, is_select_answered, select_by_visible_text
 from utils.text_utils import _norm
-from selenium.webdriver.common.by import By
+from config import config
+
+
+def _slot_choice(mem, slot, option_texts):
+    """Select answer from slot memory, then slot heuristics; None if neither knows it."""
+    if not slot:
+        return None
+    mem_val = recall_slot(mem, slot)
+    if isinstance(mem_val, dict) and mem_val.get("text"):
+        return mem_val["text"]
+    if isinstance(mem_val, str) and mem_val:
+        return mem_val
+    return heuristic_pick_for_slot(slot, option_texts)
+
+def ai_page_batch():
+    return getattr(config, "AI_PAGE_BATCH", True)
+
+def _pending_ai_questions(driver, mem, questions, state=None):
+    """
+    [(index, q, options)] for every question the autofill passes would send to the
+    model: nothing on the page, nothing in memory, no slot/heuristic answer.
+    options is None for free-text questions.
+    """
+    pending = []
+    for i, q in enumerate(questions):
+        kind = q["kind"]
+        qtext = q.get("question") or ""
+        if kind not in ("text", "textarea", "select", "radio", "checkbox"):
+            continue
+        if has_answer_on_page(driver, q, state):
+            continue
+        options = None
+        if kind in ("text", "textarea"):
+            if recall_answer(mem, qtext) is not None:
+                continue
+        elif kind == "select":
+            if q.get("select_options") is None:
+                continue  # legacy extraction: leave it to the per-question pass
+            options = [o["text"] for o in q["select_options"] if not is_placeholder_option(o)]
+            slot = detect_slot(q["element"], q.get("slot_blob"), q.get("has_text_input"))
+            if not options or _slot_choice(mem, slot, options):
+                continue
+        else:
+            options = [o["label"] for o in q["options"]]
+            mem_ans = recall_answer(mem, qtext)
+            if kind == "checkbox" and isinstance(mem_ans, (str, list)):
+                continue
+            if kind == "radio" and isinstance(mem_ans, str) and mem_ans in options:
+                continue
+            slot = detect_slot(q["element"], q.get("slot_blob"), q.get("has_text_input"))
+            if not options or (slot and heuristic_pick_for_slot(slot, options)):
+                continue
+        pending.append((i, q, options))
+    return pending
 
+@traced()
+def prefetch_ai_answers(driver, mem, questions, desc, state=None):
+    """
+    Answer every question _pending_ai_questions finds with one application_page
+    request. Results are stored on q["ai_answer"], which try_autofill /
+    try_autofill_selects / try_autofill_options use instead of making their own
+    per-question calls. Returns the number of questions sent.
+    """
+    items, by_id = [], {}
+    for q in questions:
+        q.pop("ai_answer", None)
+    for i, q, options in _pending_ai_questions(driver, mem, questions, state):
+        qid = f"q{i}"
+        by_id[qid] = q
+        items.append({"id": qid, "question": q.get("question") or "", "kind": q["kind"], "options": options})
+
+    if not items:
+        return 0
+    answers = application_page(items, desc)
+    if answers is None:
+        return 0
+    for qid, q in by_id.items():
+        q["ai_answer"] = answers.get(qid)
+    return len(items)
+
+@traced()
+def answer_concurrently(driver, mem, questions, desc, state=None, batch=None):
+    """
+    Fire the per-question model calls for every pending question (those without an
+    ai_answer from the page batch) at once on the answer engine, and fill each
+    question on the browser thread as soon as its answer arrives.
+    Returns count of questions filled.
+    """
+    engine = get_answer_engine()
+    futures = {}
+    for _, q, options in _pending_ai_questions(driver, mem, questions, state):
+        if "ai_answer" in q:
+            continue
+        qtext = q.get("question") or ""
+        if options is None:
+            fut = engine.submit(application_field, qtext, q, desc)
+        else:
+            fut = engine.submit(application_select, qtext, options, q, desc)
+        futures[fut] = q
+    if not futures:
+        return 0
+
+    print(f"[AI] {len(futures)} question(s) in flight")
+    filled = 0
+    for fut in as_completed(futures):
+        q = futures[fut]
+        try:
+            answer = fut.result()
+        except Exception as e:
+            print(f"[AI] No answer for '{(q.get('question') or '')[:60]}…':", repr(e))
+            answer = None
+        # recorded even when empty so the sequential passes don't ask again
+        q["ai_answer"] = answer
+        if answer is None:
+            continue
+        if q["kind"] in ("text", "textarea"):
+            ok = _fill_text(driver, mem, q, answer, state)
+        elif q["kind"] == "select":
+            slot = detect_slot(q["element"], q.get("slot_blob"), q.get("has_text_input"))
+            ok = _fill_select(driver, mem, q, answer, slot, state, batch)
+        else:
+            ok = _fill_option(driver, mem, q, answer, state, batch)
+        filled += bool(ok)
+    if batch is not None and len(batch):
+        batch.commit(driver)
+        if state is not None:
+            state.invalidate()
+    return filled
 
-def try_autofill(driver, mem, questions, desc):
+@traced()
+def try_autofill(driver, mem, questions, desc, state=None):
     """
     For required text/textarea questions,
     call API, type the value, and remember it.
     Returns count of fields autofilled.
+    state: optional FormState snapshot used for the "already answered?" checks.
     """
     filled = 0
     for q in questions:
@@ -24,34 +156,44 @@ def try_autofill(driver, mem, questions, desc):
             continue
         qtext = q.get("question") or ""
         # already answered?
-        if has_answer_on_page(driver, q):
+        if has_answer_on_page(driver, q, state):
             continue
         if (recall_answer(mem, qtext) is not None):
             continue
         
-        txt = application_field(qtext, q, desc)
+        txt = q["ai_answer"] if "ai_answer" in q else application_field(qtext, q, desc)
         if txt is None:
             continue
 
-        el = _resolve(driver, q["input"], q["input_locator"])
-
-        try:
-            el.clear()
-            el.send_keys(txt)
-            remember_answer(mem, qtext, txt, kind=q["kind"])
+        if _fill_text(driver, mem, q, txt, state):
             filled += 1
-
-        except Exception as e:
-            print(f"[years] Fill failed for '{qtext[:60]}…':", e)
     return filled
 
-def try_autofill_selects(driver, mem, questions, desc):
+def _fill_text(driver, mem, q, txt, state=None):
+    """Type txt into a text question and remember it; True on success."""
+    qtext = q.get("question") or ""
+    el = _resolve(driver, q["input"], q["input_locator"])
+    try:
+        el.clear()
+        el.send_keys(txt)
+        if state is not None:
+            state.invalidate()
+        remember_answer(mem, qtext, txt, kind=q["kind"])
+        return True
+
+    except Exception as e:
+        print(f"[years] Fill failed for '{qtext[:60]}…':", e)
+    return False
+
+@traced()
+def try_autofill_selects(driver, mem, questions, desc, state=None, batch=None):
     """
     For unanswered <select> questions, try:
       1) slot memory (generic)
       2) heuristics by slot
       3) model-pick from options
     Saves per-question memory and slot memory when chosen.
+    With a ChoiceBatch the choice is queued and applied at batch.commit().
     """
     filled = 0
     for q in questions:
@@ -60,57 +202,77 @@ def try_autofill_selects(driver, mem, questions, desc):
          # only selects
         if q["kind"] != "select":
             continue
+        # already answered?
+        if state is not None and has_answer_on_page(driver, q, state):
+            continue
         el = _resolve(driver, q["input"], q["input_locator"])
         if not el:
             continue
-        # already answered?
-        if is_select_answered(el):
+        if state is None and is_select_answered(el):
             continue
 
-        opts = get_select_options(el)
+        # option list never changes, so the extraction snapshot is good enough
+        opts = q.get("select_options") or get_select_options(el)
         # flatten text list for picker
         option_texts = [o["text"] for o in opts if not is_placeholder_option(o)]
         if not option_texts:
             continue
 
-        slot = detect_slot(q["element"])
-        choice = None
-
-        # 1) slot memory
-        if slot:
-            mem_val = recall_slot(mem, slot)
-            if isinstance(mem_val, dict) and mem_val.get("text"):
-                choice = mem_val["text"]
-            elif isinstance(mem_val, str):
-                choice = mem_val
-
-        # 2) slot heuristics
-        if not choice and slot:
-            choice = heuristic_pick_for_slot(slot, option_texts)
+        slot = detect_slot(q["element"], q.get("slot_blob"), q.get("has_text_input"))
+        # 1) slot memory, 2) slot heuristics
+        choice = _slot_choice(mem, slot, option_texts)
 
-        # 3) model choose
+        # 3) model choose (answered already if the page went out in one batched request)
         if not choice:
-            choice = application_select(q["question"], option_texts, q, desc)
+            if "ai_answer" in q:
+                choice = q["ai_answer"]
+            else:
+                choice = application_select(q["question"], option_texts, q, desc)
 
         if not choice:
             continue
 
-        # Click chosen option
-        if (select_by_visible_text(Select(el), choice)):
-            # Remember
+        if _fill_select(driver, mem, q, choice, slot, state, batch, el=el):
+            filled += 1
+    return filled
+
+def _remember_when_applied(batch, since, fn):
+    """Run fn (the remember_* calls) now, or only once the batch has verified the queued choice."""
+    if batch is not None and len(batch) > since:
+        batch.when_applied(fn, since)
+    else:
+        fn()
+
+def _fill_select(driver, mem, q, choice, slot, state=None, batch=None, el=None):
+    """Pick choice in a <select> (or queue it on the page batch) and remember it; True on success."""
+    since = len(batch) if batch is not None else 0
+    # Click chosen option (or queue it on the page batch)
+    if batch is not None and batch.select(driver, q, choice):
+        applied = True
+    else:
+        el = el or _resolve(driver, q["input"], q["input_locator"])
+        if not el:
+            return False
+        applied = select_by_visible_text(Select(el), choice)
+        if applied and state is not None:
+            state.invalidate()
+    if applied:
+        def remember():
             remember_answer(mem, q["question"], {"text": choice}, kind="select")
             if slot:
                 remember_slot(mem, slot, {"text": choice})
-            filled += 1
-            print(f"[select] Autofilled '{q['question'][:60]}…' with '{choice}'")
-    return filled
+        _remember_when_applied(batch, since, remember)
+        print(f"[select] Autofilled '{q['question'][:60]}…' with '{choice}'")
+    return applied
 
-def try_autofill_options(driver, mem, questions, desc):
+@traced()
+def try_autofill_options(driver, mem, questions, desc, state=None, batch=None):
     """
     For unanswered radio/checkbox questions, try:
       1) memory recall
       2) heuristic pick
       3) model-pick from options
+    With a ChoiceBatch the clicks are queued and applied at batch.commit().
     """
     filled = 0
     for q in questions:
@@ -119,7 +281,7 @@ def try_autofill_options(driver, mem, questions, desc):
             continue
 
         # Check if question is already answered on the page.
-        if has_answer_on_page(driver, q):
+        if has_answer_on_page(driver, q, state):
             continue
 
         qtext = q.get("question") or ""
@@ -135,34 +297,49 @@ def try_autofill_options(driver, mem, questions, desc):
             elif q["kind"] == "checkbox":
                 ans_list = [ans.strip().lower() for ans in mem_ans]
                 chosen_options = [o for o in q["options"] if o["label"].strip().lower() in ans_list]
+                since = len(batch) if batch is not None else 0
                 for opt in chosen_options:
-                    _click_option(driver, opt)
+                    _choose(driver, opt, batch)
                 if chosen_options:
-                    remember_answer(mem, qtext, [o['label'] for o in chosen_options], kind="checkbox")
+                    if state is not None and batch is None:
+                        state.invalidate()
+                    labels = [o['label'] for o in chosen_options]
+                    _remember_when_applied(batch, since, lambda: remember_answer(mem, qtext, labels, kind="checkbox"))
                     filled += 1
                     print(f"Autofilled '{qtext[:60]}…' with memory recall.")
                 continue
 
         # 2) Slot heuristics (e.g., "yes" for work auth)
         if not choice:
-            slot = detect_slot(q["element"])
+            slot = detect_slot(q["element"], q.get("slot_blob"), q.get("has_text_input"))
             if slot:
                 choice = heuristic_pick_for_slot(slot, option_texts)
 
         # 3) Use AI to pick an option
         if not choice:
-            choice = application_select(qtext, option_texts, q, desc)
-
-        if choice:
-            # Find and click the chosen option's label.
-            target = next((o for o in q["options"] if o["label"] == choice), None)
-            if target:
-                if _click_option(driver, target):
-                    remember_answer(mem, qtext, choice, kind=q["kind"])
-                    filled += 1
-                    print(f"[autofill_options] Autofilled '{qtext[:60]}…' with '{choice}'")
+            if "ai_answer" in q:
+                choice = q["ai_answer"]
+            else:
+                choice = application_select(qtext, option_texts, q, desc)
+
+        if choice and _fill_option(driver, mem, q, choice, state, batch):
+            filled += 1
     return filled
 
+def _fill_option(driver, mem, q, choice, state=None, batch=None):
+    """Click the radio/checkbox option labelled choice and remember it; True on success."""
+    qtext = q.get("question") or ""
+    # Find and click the chosen option's label.
+    target = next((o for o in q["options"] if o["label"] == choice), None)
+    since = len(batch) if batch is not None else 0
+    if target and _choose(driver, target, batch):
+        if state is not None and batch is None:
+            state.invalidate()
+        _remember_when_applied(batch, since, lambda: remember_answer(mem, qtext, choice, kind=q["kind"]))
+        print(f"[autofill_options] Autofilled '{qtext[:60]}…' with '{choice}'")
+        return True
+    return False
+
 def autofill_questions(driver):
     try:
         # Text inputs (e.g., short answers)
@@ -194,7 +371,8 @@ def autofill_questions(driver):
     except Exception as e:
         print(f"Error autofilling questions: {e}")
 
-def try_autofill_availability(driver, mem, questions, desc):
+@traced()
+def try_autofill_availability(driver, mem, questions, desc, state=None):
     """
     For availability questions, provide a default answer.
     """
@@ -205,7 +383,7 @@ def try_autofill_availability(driver, mem, questions, desc):
 
         qtext = q.get("question") or ""
         # already answered?
-        if has_answer_on_page(driver, q):
+        if has_answer_on_page(driver, q, state):
             continue
             
         if q.get("availability_slots"):
@@ -215,6 +393,8 @@ def try_autofill_availability(driver, mem, questions, desc):
                 try:
                     Select(first_slot["Day"]).select_by_visible_text("Weekday")
                     Select(first_slot["Time"]).select_by_visible_text("Anytime (8am - 9pm)")
+                    if state is not None:
+                        state.invalidate()
                     remember_answer(mem, qtext, {"day": "Weekday", "time": "Anytime (8am - 9pm)"}, kind="availability")
                     filled += 1
                     print(f"[availability] Autofilled '{qtext[:60]}…' with Weekday/Anytime")
@@ -263,7 +443,7 @@ def select_by_text_contains(driver, select_el, needle_list):
 
 def click_apply(driver):
     try:
-        apply_button = driver.find_element(By.XPATH, "//*[@aria-label='Apply now opens in a new tab']")
+        apply_button = find(driver, By.XPATH, "//*[@aria-label='Apply now opens in a new tab']", mode=EXPECTED)
         actions = ActionChains(driver)
         actions.move_to_element(apply_button).pause(random.uniform(0.5, 1.0)).click().perform()
         return True
@@ -282,6 +462,7 @@ def _click_first(driver, selectors, timeout=2):
             pass
     return False
 
+@traced()
 def click_continue(driver):
     # tries multiple shapes of the Continue button
     return _click_first(driver, [
@@ -300,11 +481,12 @@ def click_continue(driver):
 
 def click_add_cover(driver):
         # Switch to iframe if exists
-    iframes = driver.find_elements(By.TAG_NAME, "iframe")
+    iframes = find_all(driver, By.TAG_NAME, "iframe", mode=ABSENT)
     for iframe in iframes:
         try:
             driver.switch_to.frame(iframe)
-            element = driver.find_element(By.XPATH, "//a[@aria-label='Add Supporting documents']")
+            # only one of the frames has the link: look, don't wait, in each
+            element = find(driver, By.XPATH, "//a[@aria-label='Add Supporting documents']", mode=EXPECTED, budget=0)
             _safe_click(driver, element)
             driver.switch_to.default_content()
             return True
@@ -313,6 +495,7 @@ def click_add_cover(driver):
             continue
     return False
 
+@traced()
 def click_submit(driver):
     return _click_first(driver, [
         '//button[not(@disabled) and (contains(normalize-space(.),"Submit") or .//span[contains(normalize-space(),"Submit")])]',
@@ -0,0 +1,131 @@
+import re
+from dataclasses import dataclass, field
+from config import config
+from utils.text_utils import _norm
+
+# Search-results harvesting: every job card on the page is read with one script call and
+# run through the filter pipeline, so clicks / hovers / description loads are only spent
+# on jobs we will actually apply to.
+TITLE_BLOCKLIST = getattr(config, "TITLE_BLOCKLIST", [])
+COMPANY_BLOCKLIST = getattr(config, "COMPANY_BLOCKLIST", [])
+SNIPPET_BLOCK_KEYWORDS = getattr(config, "SNIPPET_BLOCK_KEYWORDS", ["clearance"])
+MIN_SALARY = getattr(config, "MIN_SALARY", None)  # yearly; None = no floor
+
+
+@dataclass
+class JobCard:
+    job_key: str                # Indeed job key (data-jk), "" if the card has none
+    title: str
+    company: str
+    snippet: str
+    salary: str                 # salary text as shown, "" if none
+    link: str
+    easy_apply: bool
+    visited: bool
+    element: object = field(default=None, repr=False)   # WebElement of the card, for clicking
+
+
+_HARVEST_JS = r"""
+const text = el => el ? (el.innerText || '').trim() : '';
+const first = (root, sels) => {
+    for (const s of sels) { const el = root.querySelector(s); if (el) return el; }
+    return null;
+};
+return Array.from(document.querySelectorAll("div[class*='cardOutline']")).map(card => {
+    const anchor = first(card, ['a[data-jk]', 'h2 a', 'a']);
+    const all = text(card);
+    return {
+        el: card,
+        jk: (anchor && anchor.getAttribute('data-jk')) || card.querySelector('[data-jk]')?.getAttribute('data-jk') || '',
+        title: text(first(card, ['h2 span[title]', 'h2', '[class*="jobTitle"]'])),
+        company: text(first(card, ['[data-testid="company-name"]', '[class*="companyName"]'])),
+        snippet: text(first(card, ['[data-testid="jobsnippet_footer"]', '[class*="job-snippet"]', '[data-testid="belowJobSnippet"]'])),
+        salary: text(first(card, ['[class*="salary-snippet"]', '[data-testid="attribute_snippet_testid"]'])),
+        link: anchor ? anchor.href : '',
+        easy_apply: all.includes('Easily apply'),
+        visited: all.includes('Visited'),
+    };
+});
+"""
+
+def harvest_cards(driver):
+    """Every job card on the current results page as a JobCard (one execute_script)."""
+    cards = []
+    for raw in driver.execute_script(_HARVEST_JS) or []:
+        cards.append(JobCard(
+            job_key=raw["jk"], title=raw["title"], company=raw["company"], snippet=raw["snippet"],
+            salary=raw["salary"], link=raw["link"], easy_apply=raw["easy_apply"], visited=raw["visited"],
+            element=raw["el"],
+        ))
+    return cards
+
+
+_SALARY_RE = re.compile(r"\$\s*([\d,]+(?:\.\d+)?)\s*(k)?", re.I)
+_PERIODS = (("hour", 2080), ("day", 260), ("week", 52), ("month", 12), ("year", 1))
+
+def yearly_salary(text):
+    """Top of the salary range in the card text, annualized; None if the card shows no pay."""
+    amounts = [float(a.replace(",", "")) * (1000 if k else 1) for a, k in _SALARY_RE.findall(text or "")]
+    if not amounts:
+        return None
+    t = (text or "").lower()
+    mult = next((m for unit, m in _PERIODS if unit in t), 1)
+    return max(amounts) * mult
+
+def _contains_any(text, needles):
+    t = _norm(text)
+    return next((n for n in needles if _norm(n) and _norm(n) in t), None)
+
+# --- filter pipeline: each filter returns a rejection reason or None --- #
+def not_easy_apply(card, ctx):
+    return None if card.easy_apply else "not Easily apply"
+
+def already_visited(card, ctx):
+    return "visited" if card.visited else None
+
+def already_applied(card, ctx):
+    handled = ctx.get("handled")
+    if handled is not None and card.job_key and card.job_key in handled:
+        return "already opened this run"
+    applied = ctx.get("applied")
+    if applied is not None and applied.seen(card.job_key, card.company, card.title):
+        return "already applied"
+    return None
+
+def blocked_title(card, ctx):
+    hit = _contains_any(card.title, TITLE_BLOCKLIST)
+    return f"title contains '{hit}'" if hit else None
+
+def blocked_company(card, ctx):
+    hit = _contains_any(card.company, COMPANY_BLOCKLIST)
+    return f"company '{card.company}' blocked" if hit else None
+
+def blocked_snippet(card, ctx):
+    hit = _contains_any(card.snippet, SNIPPET_BLOCK_KEYWORDS)
+    return f"snippet mentions '{hit}'" if hit else None
+
+def below_salary_floor(card, ctx):
+    if MIN_SALARY is None:
+        return None
+    pay = yearly_salary(card.salary)
+    if pay is not None and pay < MIN_SALARY:
+        return f"salary {card.salary!r} below floor"
+    return None
+
+CARD_FILTERS = [not_easy_apply, already_visited, already_applied, blocked_title, blocked_company, blocked_snippet, below_salary_floor]
+
+def filter_cards(cards, applied=None, handled=None, filters=None):
+    """
+    Cards that pass every filter, in page order. applied: AppliedIndex of earlier
+    applications; handled: set of job keys already opened this run.
+    Prints one line per rejected card.
+    """
+    ctx = {"applied": applied, "handled": handled}
+    keep = []
+    for card in cards:
+        reason = next((r for r in (f(card, ctx) for f in (filters or CARD_FILTERS)) if r), None)
+        if reason:
+            print(f"[cards] Skip '{card.title[:50]}' @ {card.company[:30]}: {reason}")
+            continue
+        keep.append(card)
+    return keep
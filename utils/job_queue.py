@@ -0,0 +1,196 @@
+import os
+import sqlite3
+import threading
+import time
+from selenium.webdriver.common.by import By
+from config import config
+from utils.applied_index import get_applied_index
+from utils.application_flow import apply_to_job
+from utils.browser_utils import _safe_click, human_sleep
+from utils.job_cards import JobCard, filter_cards, harvest_cards
+from utils.locators import OPTIONAL, find
+
+# Durable job queue between the search crawler (producer) and the applier (consumer).
+# Both stages persist their progress in one SQLite file, so a crash / CAPTCHA / restart
+# resumes at the same results page and the same pending jobs, and the two stages can run
+# at different rates or in different processes (python applyBot.py crawl / apply).
+JOB_QUEUE_FILE = getattr(config, "JOB_QUEUE_FILE", "./data/job_queue.db")
+JOB_MAX_ATTEMPTS = getattr(config, "JOB_MAX_ATTEMPTS", 2)
+JOB_LEASE_MINUTES = getattr(config, "JOB_LEASE_MINUTES", 30)
+
+PENDING, IN_PROGRESS, APPLIED, SKIPPED, FAILED = "pending", "in_progress", "applied", "skipped", "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id       TEXT PRIMARY KEY,     -- Indeed job key, or the link when the card has none
+    job_key  TEXT,
+    title    TEXT,
+    company  TEXT,
+    snippet  TEXT,
+    salary   TEXT,
+    link     TEXT,
+    state    TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error    TEXT,
+    added    REAL NOT NULL,
+    updated  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs(state, added);
+
+CREATE TABLE IF NOT EXISTS crawl (
+    search_url TEXT PRIMARY KEY,
+    page_url   TEXT,               -- results page to resume from
+    page_no    INTEGER NOT NULL DEFAULT 1,
+    done       INTEGER NOT NULL DEFAULT 0,
+    updated    REAL NOT NULL
+);
+"""
+
+
+class JobQueue:
+    """Jobs with a state each (pending / in_progress / applied / skipped / failed) plus the crawl cursor."""
+
+    def __init__(self, path=JOB_QUEUE_FILE):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._lock = threading.Lock()
+        # isolation_level=None: transactions are explicit (BEGIN IMMEDIATE when claiming)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    # --- producer --- #
+    def push(self, cards):
+        """Enqueue cards not seen before; returns how many were new."""
+        now = time.time()
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO jobs(id, job_key, title, company, snippet, salary, link, state, added, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(c.job_key or c.link, c.job_key, c.title, c.company, c.snippet, c.salary, c.link, PENDING, now, now)
+                 for c in cards if c.job_key or c.link],
+            )
+            self._conn.execute("COMMIT")
+            return self._conn.total_changes - before
+
+    def cursor(self, search_url):
+        """(page_url, page_no) to resume crawling search_url from; starts over once a crawl finished."""
+        row = self._conn.execute("SELECT page_url, page_no, done FROM crawl WHERE search_url = ?", (search_url,)).fetchone()
+        if not row or row[2] or not row[0]:
+            return search_url, 1
+        return row[0], row[1]
+
+    def save_cursor(self, search_url, page_url, page_no, done=False):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO crawl(search_url, page_url, page_no, done, updated) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(search_url) DO UPDATE SET page_url=excluded.page_url, page_no=excluded.page_no, "
+                "done=excluded.done, updated=excluded.updated",
+                (search_url, page_url, page_no, int(done), time.time()),
+            )
+
+    # --- consumer --- #
+    def requeue_stale(self):
+        """Jobs left in_progress by a crashed applier go back to pending once their lease expires."""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET state = ?, updated = ? WHERE state = ? AND updated < ?",
+                (PENDING, time.time(), IN_PROGRESS, time.time() - JOB_LEASE_MINUTES * 60),
+            )
+            return cur.rowcount
+
+    def claim(self):
+        """Oldest pending job as a JobCard (marked in_progress), or None if the queue is empty."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")  # other processes wait, so a job is claimed once
+            try:
+                row = self._conn.execute(
+                    "SELECT id, job_key, title, company, snippet, salary, link FROM jobs "
+                    "WHERE state = ? ORDER BY added LIMIT 1", (PENDING,)
+                ).fetchone()
+                if row:
+                    self._conn.execute(
+                        "UPDATE jobs SET state = ?, attempts = attempts + 1, updated = ? WHERE id = ?",
+                        (IN_PROGRESS, time.time(), row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if not row:
+            return None
+        _, job_key, title, company, snippet, salary, link = row
+        return JobCard(job_key=job_key, title=title, company=company, snippet=snippet, salary=salary,
+                       link=link, easy_apply=True, visited=False)
+
+    def finish(self, card, state, error=None):
+        """Record the outcome; failures go back to pending until JOB_MAX_ATTEMPTS is used up."""
+        with self._lock:
+            if state == FAILED:
+                attempts = self._conn.execute("SELECT attempts FROM jobs WHERE id = ?", (card.job_key or card.link,)).fetchone()
+                if attempts and attempts[0] < JOB_MAX_ATTEMPTS:
+                    state = PENDING
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, updated = ? WHERE id = ?",
+                (state, error, time.time(), card.job_key or card.link),
+            )
+
+    def counts(self):
+        return dict(self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+
+
+def crawl(driver, jq, search_url=None):
+    """Producer: walk the search results (resuming at the saved page) and enqueue every card that passes the filters."""
+    search_url = search_url or config.SEARCH_URL
+    page_url, page_no = jq.cursor(search_url)
+    print(f"[crawl] Resuming at page {page_no}: {page_url}")
+    driver.get(page_url)
+    human_sleep(2, 3)
+    while True:
+        cards = filter_cards(harvest_cards(driver), applied=get_applied_index())
+        added = jq.push(cards)
+        print(f"[crawl] Page {page_no}: {added} new job(s) queued ({len(cards)} passed filters)")
+        el = find(driver, By.CSS_SELECTOR, '[data-testid="pagination-page-next"]', mode=OPTIONAL, budget=5)
+        if el is None:
+            jq.save_cursor(search_url, driver.current_url, page_no, done=True)
+            print(f"[crawl] Reached the last results page. Queue: {jq.counts()}")
+            return
+        _safe_click(driver, el)
+        time.sleep(2)
+        page_no += 1
+        jq.save_cursor(search_url, driver.current_url, page_no)
+
+def apply_from_queue(driver, mem, jq, idle_wait=30, wait_for_more=True):
+    """Consumer: claim pending jobs one at a time and apply; waits for the crawler when the queue runs dry."""
+    root = driver.current_window_handle
+    requeued = jq.requeue_stale()
+    if requeued:
+        print(f"[queue] {requeued} interrupted job(s) back to pending")
+    while True:
+        card = jq.claim()
+        if card is None:
+            if not wait_for_more:
+                return
+            print(f"[queue] Nothing pending; checking again in {idle_wait}s. Queue: {jq.counts()}")
+            time.sleep(idle_wait)
+            continue
+        if get_applied_index().seen(card.job_key, card.company, card.title):
+            jq.finish(card, SKIPPED, "already applied")
+            continue
+        try:
+            driver.get(card.link)
+            human_sleep(2, 3)
+            outcome = apply_to_job(driver, root, mem, card)
+            if outcome == "submitted":
+                jq.finish(card, APPLIED)
+            elif outcome == "skipped":
+                jq.finish(card, SKIPPED)
+            else:
+                # the flow gave up (loop, reCAPTCHA, unanswered question): retry up to JOB_MAX_ATTEMPTS
+                jq.finish(card, FAILED, outcome)
+        except Exception as e:
+            print(f"[queue] Job failed: {e}")
+            jq.finish(card, FAILED, str(e)[:500])
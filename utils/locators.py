@@ -0,0 +1,64 @@
+import os
+import sys
+import threading
+import time
+from selenium.common.exceptions import NoSuchElementException
+from config import config
+
+# Explicit waits instead of the driver-wide implicit wait. Every lookup declares what it
+# expects and gets its own time budget:
+#   expected -- must appear; wait up to the budget, then raise NoSuchElementException
+#   optional -- may appear; wait up to the (short) budget, then return None / []
+#   absent   -- normally isn't there; one immediate look, no waiting
+# Time spent waiting is recorded per call site so slow lookups show up in locator_report().
+EXPECTED, OPTIONAL, ABSENT = "expected", "optional", "absent"
+IMPLICIT_WAIT = getattr(config, "LOCATOR_IMPLICIT_WAIT", 0)
+BUDGETS = {EXPECTED: 5.0, OPTIONAL: 1.0, ABSENT: 0.0}
+BUDGETS.update(getattr(config, "LOCATOR_BUDGETS", {}))
+POLL = 0.1
+
+_stats = {}   # call site -> [calls, misses, seconds, max seconds]
+_lock = threading.Lock()
+
+
+def _caller_site(depth=2):
+    f = sys._getframe(depth)
+    return f"{os.path.splitext(os.path.basename(f.f_code.co_filename))[0]}.{f.f_code.co_name}"
+
+def _record(site, seconds, found):
+    with _lock:
+        st = _stats.setdefault(site, [0, 0, 0.0, 0.0])
+        st[0] += 1
+        st[1] += not found
+        st[2] += seconds
+        st[3] = max(st[3], seconds)
+
+def _lookup(ctx, by, sel, mode, budget, site):
+    budget = BUDGETS[mode] if budget is None or mode == ABSENT else budget
+    start = time.time()
+    deadline = start + budget
+    while True:
+        els = ctx.find_elements(by, sel)
+        if els or time.time() >= deadline:
+            break
+        time.sleep(POLL)
+    _record(site, time.time() - start, bool(els))
+    if not els and mode == EXPECTED:
+        raise NoSuchElementException(f"{sel} not found within {budget:.1f}s ({site})")
+    return els
+
+def find(ctx, by, sel, mode=EXPECTED, budget=None, site=None):
+    """First match under ctx (driver or element); None when an optional/absent one is missing."""
+    els = _lookup(ctx, by, sel, mode, budget, site or _caller_site())
+    return els[0] if els else None
+
+def find_all(ctx, by, sel, mode=OPTIONAL, budget=None, site=None):
+    """All matches; waits (per mode) for at least one."""
+    return _lookup(ctx, by, sel, mode, budget, site or _caller_site())
+
+def locator_report(top=15):
+    """Call sites ranked by total time spent waiting for elements."""
+    with _lock:
+        rows = sorted(_stats.items(), key=lambda kv: -kv[1][2])[:top]
+    for site, (calls, misses, secs, worst) in rows:
+        print(f"[locators] {site}: calls={calls} misses={misses} waited={secs:.1f}s max={worst:.2f}s")
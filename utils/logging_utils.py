@@ -2,21 +2,33 @@ from config.config import *
 from selenium.webdriver.support import expected_conditions as EC
 import os
 import csv
+import threading
 from datetime import datetime
 from utils.memory_utils import _load_counts, _save_counts, _append_rows_csv
+from utils import sqlite_store
+from utils.applied_index import get_applied_index
 from utils.question_utils import _question_key
 
+_log_lock = threading.Lock()  # CSV/JSON log writers may run on several worker threads
+
 def get_daily_log_path():
     return f"{LOG_FILE + datetime.now().strftime('%Y%m%d')}.csv"
 
 def init_log():
+    if sqlite_store.enabled():
+        sqlite_store.connect()
+        return
     if not os.path.exists(get_daily_log_path()):
         with open(get_daily_log_path(), mode='w', newline='', encoding='utf-8') as file:
             writer = csv.writer(file)
             writer.writerow(["Timestamp", "Job Title", "Company", "Job URL", "$$$", "Description"])
 
-def log_job(title, company, url, status, desc):
-    with open(get_daily_log_path(), mode='a', newline='', encoding='utf-8') as file:
+def log_job(title, company, url, status, desc, job_key=""):
+    get_applied_index().record(job_key, company, title)
+    if sqlite_store.enabled():
+        sqlite_store.add_application(datetime.now().isoformat(), title, company, url, status, desc)
+        return
+    with _log_lock, open(get_daily_log_path(), mode='a', newline='', encoding='utf-8') as file:
         writer = csv.writer(file)
         writer.writerow([datetime.now().isoformat(), title, company, url, status, desc])
 
@@ -37,7 +49,6 @@ def log_missed_questions(driver, missing_required):
     ts = datetime.now().isoformat(timespec="seconds")
 
     rows = []
-    counts = _load_counts()
 
     for q in missing_required:
         key = _question_key(q)
@@ -52,7 +63,9 @@ def log_missed_questions(driver, missing_required):
                 if opt.get("label"):
                     ctrl_opts = ctrl_opts + " | " + opt["label"]
             ctrl = q["options"][0].get("input")
-        if ctrl:
+        if "control_id" in q:
+            ctrl_id, ctrl_name = q["control_id"], q["control_name"]
+        elif ctrl:
             try:
                 ctrl_id = ctrl.get_attribute("id") or ""
             except Exception:
@@ -75,19 +88,25 @@ def log_missed_questions(driver, missing_required):
             "ans": "",  # no answer yet
         })
 
-        # bump counts
-        entry = counts.get(key) or {"question": qtext, "kind": kind, "count": 0}
-        entry["count"] = int(entry.get("count", 0)) + 1
-        # if the question text varies slightly, keep the most recent version
-        entry["question"] = qtext or entry["question"]
-        counts[key] = entry
-
-    _append_rows_csv(
-        MISSED_Q_LOG_CSV,
-        rows,
-        header=["timestamp", "url", "page_title", "q_key", "kind", "question", "control_id", "control_name", "options", "ans"],
-    )
-    _save_counts(counts)
+    # CSV append + counter read-modify-write happen under one lock (parallel workers)
+    with _log_lock:
+        _append_rows_csv(
+            MISSED_Q_LOG_CSV,
+            rows,
+            header=["timestamp", "url", "page_title", "q_key", "kind", "question", "control_id", "control_name", "options", "ans"],
+        )
+        if sqlite_store.enabled():
+            sqlite_store.bump_missed_counts([(r["q_key"], r["question"], r["kind"]) for r in rows])
+        else:
+            counts = _load_counts()
+            for r in rows:
+                # bump counts
+                entry = counts.get(r["q_key"]) or {"question": r["question"], "kind": r["kind"], "count": 0}
+                entry["count"] = int(entry.get("count", 0)) + 1
+                # if the question text varies slightly, keep the most recent version
+                entry["question"] = r["question"] or entry["question"]
+                counts[r["q_key"]] = entry
+            _save_counts(counts)
 
     # quick console summary
     bumped = ", ".join(f"{r['q_key']}" for r in rows)
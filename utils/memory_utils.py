@@ -1,11 +1,22 @@
 from config.config import *
+from config import config
 import os
 import csv
 import json
+import threading
 from utils.answer_utils import adapt_answer_to_question
+from utils.qa_memory import QAMemory
+from utils import semantic_index, sqlite_store
 from utils.text_utils import _norm, _normalize_q, fuzzy_match_question
 from datetime import datetime
 
+# Remembered answers are appended to a journal next to QA_MEMORY_FILE and only
+# folded back into the JSON snapshot every N records (and at shutdown).
+QA_JOURNAL_COMPACT_EVERY = getattr(config, "QA_JOURNAL_COMPACT_EVERY", 500)
+_journal_records = 0
+# One lock around memory reads/writes and journal appends, so worker threads can share a QAMemory.
+mem_lock = threading.RLock()
+
 def _append_rows_csv(path, rows, header):
     new_file = not os.path.exists(path)
     with open(path, "a", newline="", encoding="utf-8") as f:
@@ -39,20 +50,87 @@ def recall_slot(mem, slot_key):
     return (mem.get("_slots") or {}).get(slot_key)
 
 def remember_slot(mem, slot_key, value):
-    """Write/update a generic slot value and persist qa_memory.json via save_qa_memory()."""
-    mem.setdefault("_slots", {})[slot_key] = value
-    save_qa_memory(mem)
+    """Write/update a generic slot value and persist it (journal or sqlite)."""
+    with mem_lock:
+        mem.setdefault("_slots", {})[slot_key] = value
+        if sqlite_store.enabled():
+            sqlite_store.put_slot(slot_key, value)
+        else:
+            _journal_append(mem, {"op": "slot", "key": slot_key, "value": value})
 
-def load_qa_memory():
+def qa_journal_path():
+    """Append-only journal living next to QA_MEMORY_FILE (qa_memory.json -> qa_memory.journal.jsonl)."""
+    return os.path.splitext(QA_MEMORY_FILE)[0] + ".journal.jsonl"
+
+def _apply_journal_record(mem, rec):
+    if rec.get("op") == "answer":
+        mem[rec["key"]] = rec["value"]
+    elif rec.get("op") == "slot":
+        mem.setdefault("_slots", {})[rec["key"]] = rec["value"]
+
+def _replay_journal(mem):
+    """Apply journaled writes on top of the snapshot. A torn last line (crash mid-append) is skipped."""
+    replayed = 0
+    try:
+        with open(qa_journal_path(), "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    _apply_journal_record(mem, json.loads(line))
+                    replayed += 1
+                except (ValueError, KeyError):
+                    print(f"[memory] Skipping unreadable journal record: {line[:80]}")
+    except FileNotFoundError:
+        pass
+    return replayed
+
+def _journal_append(mem, rec):
+    global _journal_records
+    with open(qa_journal_path(), "a", encoding="utf-8") as f:
+        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    _journal_records += 1
+    if QA_JOURNAL_COMPACT_EVERY and _journal_records >= QA_JOURNAL_COMPACT_EVERY:
+        save_qa_memory(mem)
+
+def _load_json_qa_memory():
+    """Load the qa_memory.json snapshot and replay any journaled answers on top of it."""
+    global _journal_records
     try:
         with open(QA_MEMORY_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+            mem = QAMemory(json.load(f))
     except Exception:
-        return {}
+        mem = QAMemory()
+    _journal_records = _replay_journal(mem)
+    return mem
+
+def load_qa_memory():
+    if sqlite_store.enabled():
+        return QAMemory(sqlite_store.load_memory())
+    return _load_json_qa_memory()
 
 def save_qa_memory(mem):
-    with open(QA_MEMORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(mem, f, ensure_ascii=False, indent=2)
+    """
+    Compact: write the full snapshot (same qa_memory.json layout, incl. _slots)
+    atomically, then truncate the journal it now contains.
+    With the sqlite backend every write is already committed, so this is a no-op.
+    """
+    global _journal_records
+    if sqlite_store.enabled():
+        return
+    with mem_lock:
+        tmp = QA_MEMORY_FILE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(mem, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, QA_MEMORY_FILE)
+        # replaying the journal is idempotent, so a crash before this truncate is harmless
+        open(qa_journal_path(), "w", encoding="utf-8").close()
+        _journal_records = 0
 
 def remember_answer(mem, question_text, answer, kind=None):
     """
@@ -62,11 +140,23 @@ def remember_answer(mem, question_text, answer, kind=None):
       - dict like {"text": "...", "value": "..."} for selects
     """
     key = _normalize_q(question_text)
-    mem[key] = {"kind": kind, "answer": answer, "ts": datetime.now().isoformat()}
-    save_qa_memory(mem)
+    entry = {"kind": kind, "answer": answer, "ts": datetime.now().isoformat()}
+    with mem_lock:
+        mem[key] = entry
+        if sqlite_store.enabled():
+            sqlite_store.put_answer(key, entry)
+        else:
+            _journal_append(mem, {"op": "answer", "key": key, "value": entry})
+        if semantic_index.SEMANTIC_RECALL:
+            semantic_index.get_semantic_index().note(key)
 
 def recall_answer(mem, question_text):
     """Find the best matching answer using fuzzy question matching"""
+    if isinstance(mem, QAMemory):
+        # indexed lookup: exact normalized hit, then fuzzy over index candidates only
+        with mem_lock:
+            return mem.recall(question_text)
+
     norm_current = _normalize_q(question_text)
     
     # First try exact match
@@ -81,6 +171,30 @@ def recall_answer(mem, question_text):
     
     return None
 
+def prime_recall(mem, items):
+    """
+    Match a whole page against memory in one batch; later recall_answer calls reuse it.
+    items: [(question, kind, options or None)]. With SEMANTIC_RECALL, questions without a
+    string match are then matched by embedding (one batch too) if the stored answer fits.
+    """
+    if not isinstance(mem, QAMemory):
+        return
+    with mem_lock:
+        keys = mem.prime([q for q, _, _ in items])
+        misses = [item for item, key in zip(items, keys) if key is None]
+        if not semantic_index.SEMANTIC_RECALL or not misses:
+            return
+        mem_keys = list(mem)   # workers may add answers while the page is matched
+    try:
+        found = semantic_index.get_semantic_index().match(mem, misses, mem_keys)
+    except Exception as e:
+        print(f"[semantic] Lookup failed: {e}")
+        return
+    with mem_lock:
+        for (question, _, _), key in zip(misses, found):
+            if key is not None:
+                mem.prime_key(question, key)
+
 def get_adapted_answer(mem, current_question, available_options=None):
     """
     Get and adapt a stored answer for the current question
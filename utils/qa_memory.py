@@ -0,0 +1,159 @@
+from collections import defaultdict
+from utils.batch_match import first_matches, sorted_tokens as _sorted_tokens
+from utils.text_utils import _normalize_q
+
+class QAMemory(dict):
+    """
+    qa_memory.json dict with lookup indexes kept alongside it.
+
+    Behaves like the plain dict the rest of the bot already passes around
+    (mem[key], mem.get("_slots"), json.dump(mem), ...), but also maintains:
+      - normalized question -> stored keys (exact recall without re-normalizing every key)
+      - each key's sorted token string, in memory order (fuzzy recall scores them in one batch)
+      - per-page answers from prime(): every question on a page matched in one batch
+    Keys starting with '_' (e.g. '_slots') are metadata and are not indexed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._seq = {}                      # key -> insertion ordinal (mirrors dict order)
+        self._next_seq = 0
+        self._norm = {}                     # key -> (normalized text, sorted token string)
+        self._by_norm = defaultdict(list)   # normalized text -> [keys]
+        self._ordered = None                # ([keys], [sorted token strings]) in memory order, built lazily
+        self._primed = {}                   # (normalized question, threshold) -> key or None
+        self.update(*args, **kwargs)
+
+    # --- dict overrides that keep the indexes in sync --- #
+    def __setitem__(self, key, value):
+        if key not in self:
+            self._index(key)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._unindex(key)
+
+    def update(self, *args, **kwargs):
+        for k, v in dict(*args, **kwargs).items():
+            self[k] = v
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        if key in self:
+            value = super().pop(key)
+            self._unindex(key)
+            return value
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._unindex(key)
+        return key, value
+
+    def clear(self):
+        super().clear()
+        self._seq.clear()
+        self._norm.clear()
+        self._by_norm.clear()
+        self._ordered = None
+        self._primed.clear()
+
+    def copy(self):
+        return QAMemory(self)
+
+    # --- index maintenance --- #
+    def _index(self, key):
+        self._ordered = None
+        self._primed.clear()
+        self._seq[key] = self._next_seq
+        self._next_seq += 1
+        if not isinstance(key, str) or key.startswith("_"):
+            return
+        norm = _normalize_q(key)
+        self._norm[key] = (norm, _sorted_tokens(norm))
+        self._by_norm[norm].append(key)
+
+    def _unindex(self, key):
+        self._ordered = None
+        self._primed.clear()
+        self._seq.pop(key, None)
+        entry = self._norm.pop(key, None)
+        if entry is None:
+            return
+        keys = self._by_norm.get(entry[0])
+        if keys:
+            keys.remove(key)
+            if not keys:
+                del self._by_norm[entry[0]]
+
+    # --- lookups --- #
+    def find_exact(self, question_text):
+        """Stored key whose normalized form equals the question's, or None."""
+        keys = self._by_norm.get(_normalize_q(question_text))
+        return keys[0] if keys else None
+
+    def _ordered_keys(self):
+        """([keys], [sorted token strings]) in memory order, rebuilt after changes."""
+        if self._ordered is None:
+            keys = sorted(self._norm, key=self._seq.__getitem__)
+            self._ordered = (keys, [self._norm[k][1] for k in keys])
+        return self._ordered
+
+    def find_fuzzy(self, question_text, threshold=85):
+        """
+        First stored key (memory order) whose token-sort ratio against the
+        question reaches the threshold -- the same key fuzzy_match_question
+        would stop at when scanning the whole dict.
+        """
+        keys, sorted_strs = self._ordered_keys()
+        j = first_matches([_sorted_tokens(_normalize_q(question_text))], sorted_strs, threshold)[0]
+        return keys[j] if j is not None else None
+
+    def find_key(self, question_text, threshold=85):
+        primed = self._primed.get((_normalize_q(question_text), threshold), False)
+        if primed is not False:
+            return primed
+        key = self.find_exact(question_text)
+        return key if key is not None else self.find_fuzzy(question_text, threshold)
+
+    def find_keys(self, questions, threshold=85):
+        """
+        find_key for a whole page at once: exact hits from the index, the rest scored
+        against every stored key in one batch (first key in memory order reaching the threshold).
+        """
+        found = [self.find_exact(q) for q in questions]
+        todo = [i for i, key in enumerate(found) if key is None]
+        if todo:
+            keys, sorted_strs = self._ordered_keys()
+            hits = first_matches([_sorted_tokens(_normalize_q(questions[i])) for i in todo], sorted_strs, threshold)
+            for i, j in zip(todo, hits):
+                found[i] = keys[j] if j is not None else None
+        return found
+
+    def prime(self, questions, threshold=85):
+        """
+        Match a page's questions up front so the recall_answer calls that follow are lookups.
+        Primed results are dropped as soon as the memory changes.
+        """
+        self._primed.clear()
+        keys = self.find_keys(questions, threshold)
+        for q, key in zip(questions, keys):
+            self._primed[(_normalize_q(q), threshold)] = key
+        return keys
+
+    def prime_key(self, question_text, key, threshold=85):
+        """Answer question_text from `key` until the memory changes (e.g. a semantic match)."""
+        self._primed[(_normalize_q(question_text), threshold)] = key
+
+    def recall(self, question_text, threshold=85):
+        key = self.find_key(question_text, threshold)
+        if key is None:
+            return None
+        return self[key].get("answer")
@@ -5,11 +5,13 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.common.exceptions import StaleElementReferenceException, ElementClickInterceptedException, TimeoutException, NoSuchElementException
-from utils.browser_utils import _resolve, _safe_click, _click_option, _locator_for_input, _locator_for_el
-from utils.memory_utils import recall_answer, remember_answer, get_adapted_answer
+from utils.browser_utils import _resolve, _safe_click, _click_option, _locator_for_input, _locator_for_el, _input_locator_from, _el_locator_from
+from utils.memory_utils import recall_answer, remember_answer, get_adapted_answer, prime_recall
 from utils.text_utils import _norm, _normalize_q, fuzzy_match_question, normalize_answer
+from utils.batch_match import best_match, matches_any
+from utils.locators import EXPECTED, IMPLICIT_WAIT, find
+from utils.tracing import traced
 import hashlib
-from fuzzywuzzy import fuzz
 
 
 def select_by_visible_text(selfie, text: str):
@@ -72,7 +74,7 @@ def choose_answer_label(question_text, options_labels, mem):
     # fallback: first option
     return options_labels[0] if options_labels else None
 
-def remember_present_answers_without_pause(driver, questions, mem):
+def remember_present_answers_without_pause(driver, questions, mem, state=None):
     """If page already has answers (e.g., defaults) and we don't have them in memory, save them."""
     saved = 0
     for q in questions:
@@ -80,7 +82,7 @@ def remember_present_answers_without_pause(driver, questions, mem):
         #if is_equivalent_question_in_memory(mem, q["question"]):
             #continue  # already known (fuzzy match)
         
-        val = get_current_answer(driver, q)
+        val = get_current_answer(driver, q, state)
         if not val or (isinstance(val, list) and not val):
             continue  # no answer to save
         
@@ -215,28 +217,50 @@ def pause_and_remember_questions(driver):
     print(f"Saved {saved_count} answer(s) to {QA_MEMORY_FILE}.")
 
 
-def prefill_from_memory(driver, questions, mem):
-    """Apply remembered answers using fuzzy matching"""
+def _choose(driver, opt, batch=None, want=True):
+    """Click an option now (stealth path) or queue it on the page's ChoiceBatch."""
+    if batch is not None:
+        return batch.check(driver, opt, want)
+    return _click_option(driver, opt)
+
+def _known_options(q):
+    """Option texts already in the extracted question (no DOM reads), or None."""
+    if q["kind"] in ("radio", "checkbox") and q["options"]:
+        return [opt["label"] for opt in q["options"]]
+    if q["kind"] == "select" and q.get("select_options") is not None:
+        return [o["text"] for o in q["select_options"] if o["text"].strip()]
+    return None
+
+@traced()
+def prefill_from_memory(driver, questions, mem, batch=None):
+    """Apply remembered answers using fuzzy matching (queued on `batch` when given)"""
+    prime_recall(mem, [(q["question"], q["kind"], _known_options(q)) for q in questions])
     for q in questions:
         # Get available options for matching
         available_options = None
         if q["kind"] in ("radio", "checkbox") and q["options"]:
             available_options = [opt["label"] for opt in q["options"]]
         elif q["kind"] == "select":
-            el = _resolve(driver, q["input"], q["input_locator"])
-            if el:
-                available_options = [o.text for o in el.find_elements(By.TAG_NAME, "option") if o.text.strip()]
+            if q.get("select_options") is not None:
+                available_options = [o["text"] for o in q["select_options"] if o["text"].strip()]
+            else:
+                el = _resolve(driver, q["input"], q["input_locator"])
+                if el:
+                    available_options = [o.text for o in el.find_elements(By.TAG_NAME, "option") if o.text.strip()]
         
         # Get adapted answer
         adapted_ans = get_adapted_answer(mem, q["question"], available_options)
         if adapted_ans is None:
             if q["kind"] in ("radio", "checkbox") and len(q["options"]) < 2:
-                _click_option(driver, q["options"][0])
+                _choose(driver, q["options"][0], batch)
                 print(f" - [{q['kind']}] Only one option for '{q['question'][:60]}…', auto-selecting it.")
             continue
         print(f"[{q['kind']}] Q: {q["question"]}")    
         if q["kind"] == "radio":
             if len(q["options"]) < 2:
+                if batch is not None:
+                    _choose(driver, q["options"][0], batch)
+                    continue
                 inp = _resolve(driver, q["options"][0]["input"], q["options"][0]["input_locator"])
                 if inp and not _is_selected(inp):
                     _click_option(driver, q["options"][0])
@@ -244,19 +268,13 @@ def prefill_from_memory(driver, questions, mem):
                     continue
 
             # Find the best matching option using fuzzy matching
-            best_match = None
-            best_score = 0
-            for opt in q["options"]:
-                score = fuzz.token_sort_ratio(_norm(opt["label"]), _norm(str(adapted_ans)))
-                if score > best_score and score >= 75:  # 75% similarity threshold
-                    best_score = score
-                    best_match = opt
-            if best_match:
-                _click_option(driver, best_match)
-                print(f"\t[{q['kind']}] Fuzzy matched '{adapted_ans}' to '{best_match['label']}' (score: {best_score})")
+            i, best_score = best_match(_norm(str(adapted_ans)), [_norm(opt["label"]) for opt in q["options"]], 75)
+            if i is not None:
+                _choose(driver, q["options"][i], batch)
+                print(f"\t[{q['kind']}] Fuzzy matched '{adapted_ans}' to '{q['options'][i]['label']}' (score: {best_score})")
             else:
                 # Fallback to first option if no good match found
-                _click_option(driver, q["options"][0])
+                _choose(driver, q["options"][0], batch)
                 print(f"\t[{q['kind']}] No good match found for '{adapted_ans}', selected first option")
 
         elif q["kind"] == "checkbox":
@@ -264,24 +282,24 @@ def prefill_from_memory(driver, questions, mem):
                 adapted_ans = [adapted_ans]
             
             if len(q["options"]) == 1:
-                _click_option(driver, q["options"][0])
+                _choose(driver, q["options"][0], batch)
                 continue
             
             # Convert adapted answers to normalized set for comparison
             adapted_set = {_norm(str(a)) for a in adapted_ans}
             
-            for opt in q["options"]:
+            # Check which options should be selected using fuzzy matching
+            wanted = matches_any([_norm(opt["label"]) for opt in q["options"]], [_norm(str(a)) for a in adapted_ans], 75)
+            for opt, should_be_on in zip(q["options"], wanted):
+                if batch is not None:
+                    # the batch only clicks when the checked state differs
+                    batch.check(driver, opt, should_be_on)
+                    continue
+
                 inp = _resolve(driver, opt["input"], opt["input_locator"])
                 if not inp: 
                     continue
                 
-                # Check if this option should be selected using fuzzy matching
-                opt_norm = _norm(opt["label"])
-                should_be_on = any(
-                    fuzz.token_sort_ratio(opt_norm, _norm(adapted_ans_item)) >= 75
-                    for adapted_ans_item in adapted_ans
-                )
-                
                 is_on = _is_selected(inp)
                 if should_be_on and not is_on:
                     _click_option(driver, opt)
@@ -306,6 +324,20 @@ def prefill_from_memory(driver, questions, mem):
                 continue
             
             want_text = adapted_ans.get("text") if isinstance(adapted_ans, dict) else str(adapted_ans)
+
+            if batch is not None and q.get("select_options") is not None:
+                option_texts = [o["text"] for o in q["select_options"] if o["text"].strip()]
+                best_option = want_text if batch.select(driver, q, want_text) else None
+                if best_option is None:
+                    i, _ = best_match(_norm(want_text), [_norm(t) for t in option_texts], 75)
+                    best_option = option_texts[i] if i is not None else None
+                    if best_option:
+                        batch.select(driver, q, best_option)
+                if best_option:
+                    print(f"\t[{q['kind']}] Queued '{best_option}' for '{want_text}'")
+                else:
+                    print(f"\t[{q['kind']}] No good match found for '{want_text}' in options")
+                continue
             
             try:
                 # First, try to select by visible text with exact match
@@ -321,14 +353,9 @@ def prefill_from_memory(driver, questions, mem):
                 
                 if option_texts:
                     # Find best fuzzy match
-                    best_option = None
-                    best_score = 0
-                    for opt_text in option_texts:
-                        score = fuzz.token_sort_ratio(_norm(opt_text), _norm(want_text))
-                        if score > best_score and score >= 75:
-                            best_score = score
-                            best_option = opt_text
-                    
+                    i, best_score = best_match(_norm(want_text), [_norm(t) for t in option_texts], 75)
+                    best_option = option_texts[i] if i is not None else None
+
                     if best_option:
                         try:
                             select_by_visible_text(Select(el), best_option)
@@ -348,31 +375,36 @@ def _question_key(q):
     """
     base = _normalize_q(q.get("question") or "")
     ctrl_id = ctrl_name = testid = ""
-    try:
-        el = q.get("element")
-        if el:
-            # first data-testid in the subtree (often stable)
-            t = el.find_elements(By.CSS_SELECTOR, "[data-testid]")
-            if t:
-                testid = t[0].get_attribute("data-testid") or ""
-    except Exception:
-        return None
-
-    # prefer a real control for id/name
-    ctrl = None
-    if q.get("input"):
-        ctrl = q["input"]
-    elif q.get("options"):
-        ctrl = q["options"][0].get("input")
-    if ctrl:
-        try:
-            ctrl_id = ctrl.get_attribute("id") or ""
-        except Exception:
-            pass
+    if "testid" in q:
+        # snapshot-extracted questions already carry these; no DOM reads needed
+        testid = q["testid"]
+        ctrl_id, ctrl_name = q.get("control_id") or "", q.get("control_name") or ""
+    else:
         try:
-            ctrl_name = ctrl.get_attribute("name") or ""
+            el = q.get("element")
+            if el:
+                # first data-testid in the subtree (often stable)
+                t = el.find_elements(By.CSS_SELECTOR, "[data-testid]")
+                if t:
+                    testid = t[0].get_attribute("data-testid") or ""
         except Exception:
-            pass
+            return None
+
+        # prefer a real control for id/name
+        ctrl = None
+        if q.get("input"):
+            ctrl = q["input"]
+        elif q.get("options"):
+            ctrl = q["options"][0].get("input")
+        if ctrl:
+            try:
+                ctrl_id = ctrl.get_attribute("id") or ""
+            except Exception:
+                pass
+            try:
+                ctrl_name = ctrl.get_attribute("name") or ""
+            except Exception:
+                pass
 
     sig = "|".join([base, ctrl_name, ctrl_id, testid])
     digest = hashlib.sha1(sig.encode("utf-8", "ignore")).hexdigest()[:12]
@@ -395,19 +427,23 @@ def _item_blob_for_slots(item):
                 pass
     return " ".join(parts).lower()
 
-def detect_slot(item):
+def detect_slot(item, blob=None, has_text_input=None):
     """
     Map a question 'item' (the .ia-Questions-item element) to a generic slot key,
     like 'linkedin_url', 'country', etc., or return None if no match.
+    blob/has_text_input can be passed from a snapshot-extracted question to skip the DOM reads.
     """
-    blob = _item_blob_for_slots(item)
+    if blob is None:
+        blob = _item_blob_for_slots(item)
 
     # Primary regex rules
     for key, rx in SLOT_PATTERNS.items():
         if rx.search(blob):
             # sanity: URL slots should target text/textarea inputs
             if key.endswith("_url"):
-                if item.find_elements(By.CSS_SELECTOR, "input[type='text'], input:not([type]), textarea"):
+                if has_text_input is None:
+                    has_text_input = bool(item.find_elements(By.CSS_SELECTOR, "input[type='text'], input:not([type]), textarea"))
+                if has_text_input:
                     return key
             else:
                 return key
@@ -433,8 +469,10 @@ def is_select_answered(sel):
     except Exception:
         return False
 
-def get_current_answer(driver, q):
+def get_current_answer(driver, q, state=None):
     """Return the current value for a question q (None/empty if not answered)."""
+    if state is not None:
+        return state.answer(q)
     kind = q["kind"]
     if kind == "radio":
         for opt in q["options"]:
@@ -479,26 +517,117 @@ def get_current_answer(driver, q):
             return None
     return None  # info
 
-def has_answer_on_page(driver, q):
+def has_answer_on_page(driver, q, state=None):
+    """Pass a FormState to answer from the page snapshot instead of live per-option reads."""
     kind = q["kind"]
 
     if kind == "checkbox":
-        vals = get_current_answer(driver, q)
+        vals = get_current_answer(driver, q, state)
         return bool(vals) and len(vals) > 0
 
     if kind == "radio":
-        return bool(get_current_answer(driver, q))
+        return bool(get_current_answer(driver, q, state))
 
     if kind in ("text", "textarea"):
-        val = get_current_answer(driver, q)
+        val = get_current_answer(driver, q, state)
         return bool(val and val.strip())
 
     if kind == "select":
+        if state is not None:
+            return _select_answer_is_set(state.answer(q))
         el = _resolve(driver, q["input"], q["input_locator"])
         return bool(el) and is_select_answered(el)  # placeholder-aware
 
     return True  # info rows never block
 
+# Reads the current answer of every question in one call. args[0] is a list of
+# per-question descriptors: [kind, [option inputs], main input, [day, time]].
+_FORM_STATE_JS = r"""
+const isChecked = inp => !!inp && (inp.checked || ['true', 'checked', '1'].includes(inp.getAttribute('checked')));
+const selected = sel => {
+    if (!sel) return null;
+    const o = Array.from(sel.options).find(o => o.selected);
+    return o ? {text: (o.text || '').trim(), value: o.getAttribute('value') === null ? o.value : o.getAttribute('value')} : null;
+};
+return arguments[0].map(([kind, inputs, input, slot]) => {
+    if (kind === 'radio') return inputs.findIndex(isChecked);
+    if (kind === 'checkbox') return inputs.map((inp, i) => isChecked(inp) ? i : -1).filter(i => i >= 0);
+    if (kind === 'text' || kind === 'textarea') return input ? (input.value || '').trim() : null;
+    if (kind === 'select') return selected(input);
+    if (kind === 'availability') {
+        const day = selected(slot[0]), time = selected(slot[1]);
+        return day && time && day.text && time.text ? {day: day.text, time: time.text} : null;
+    }
+    return null;
+});
+"""
+
+def _state_descriptor(driver, q):
+    kind = q["kind"]
+    inputs, inp, slot = [], None, []
+    if kind in ("radio", "checkbox"):
+        inputs = [o.get("input") or _resolve(driver, None, o["input_locator"]) for o in q["options"]]
+    elif kind in ("text", "textarea", "select"):
+        inp = q["input"] or _resolve(driver, None, q["input_locator"])
+    elif kind == "availability":
+        s = (q.get("availability_slots") or [{}])[0]
+        slot = [s.get("Day"), s.get("Time")]
+    return [kind, inputs, inp, slot]
+
+def read_form_state(driver, questions):
+    """
+    Current answer of every question (same shapes as get_current_answer), read
+    with a single execute_script. Falls back to per-question reads if the
+    script fails (e.g. a stale element after a re-render).
+    """
+    try:
+        raw = driver.execute_script(_FORM_STATE_JS, [_state_descriptor(driver, q) for q in questions])
+    except Exception as e:
+        print(f"[form-state] Bulk read failed ({e}); reading questions one by one.")
+        return [get_current_answer(driver, q) for q in questions]
+
+    answers = []
+    for q, val in zip(questions, raw):
+        kind = q["kind"]
+        if kind == "radio":
+            answers.append(q["options"][val]["label"] if val is not None and val >= 0 else None)
+        elif kind == "checkbox":
+            answers.append([q["options"][i]["label"] for i in (val or [])])
+        elif kind in ("text", "textarea"):
+            answers.append(val or None)
+        else:
+            answers.append(val)
+    return answers
+
+class FormState:
+    """
+    Page-level snapshot of every question's current answer. It is read lazily
+    with one read_form_state call and reused until invalidate() is called,
+    which callers do right after they change something on the form.
+    """
+
+    def __init__(self, driver, questions):
+        self.driver = driver
+        self.questions = questions
+        self._answers = None
+
+    def invalidate(self):
+        self._answers = None
+
+    def answer(self, q):
+        if self._answers is None:
+            self._answers = {id(x): a for x, a in zip(self.questions, read_form_state(self.driver, self.questions))}
+        if id(q) not in self._answers:
+            return get_current_answer(self.driver, q)
+        return self._answers[id(q)]
+
+def _select_answer_is_set(val):
+    """Placeholder-aware, same rule as is_select_answered but on a {'text','value'} answer."""
+    if not val:
+        return False
+    return (val.get("value") or "").strip() != "" and not PLACEHOLDER_RE.search(val.get("text") or "")
+
+
 def compute_required(item, debug=False):
     """
     Decide if a question item is required. Works for both 'mosaic-provider-*' and 'css-*' skins.
@@ -534,6 +663,193 @@ def compute_required(item, debug=False):
     return has_asterisk or has_required_attr or has_invalid or has_err_text
 
 
+# One execute_script pass that reads everything extract_questions_with_elements needs.
+# Raw facts only; the Python side applies the same decisions as the per-element path.
+_SNAPSHOT_JS = r"""
+const shown = el => {
+    if (!el || !el.getClientRects().length) return false;
+    return getComputedStyle(el).visibility !== 'hidden';
+};
+const text = el => shown(el) ? (el.innerText || '').trim() : '';
+const first = (root, sel) => root.querySelector(sel);
+const xpathFirst = (root, xp) =>
+    document.evaluate(xp, root, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const xpathAll = (root, xp) => {
+    const snap = document.evaluate(xp, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const out = [];
+    for (let i = 0; i < snap.snapshotLength; i++) out.push(snap.snapshotItem(i));
+    return out;
+};
+const isChecked = inp => inp.checked || ['true', 'checked', '1'].includes(inp.getAttribute('checked'));
+const control = inp => inp ? {
+    el: inp, id: inp.getAttribute('id') || '', name: inp.getAttribute('name') || '',
+    value: inp.value || inp.getAttribute('value') || '', checked: isChecked(inp)
+} : null;
+
+let items = document.querySelectorAll("div[id^='q_']");
+if (!items.length) items = document.querySelectorAll('.ia-Questions-item');
+
+return Array.from(items).map(item => {
+    const legend = first(item, 'legend');
+    const rich = first(item, '[data-testid="rich-text"] span');
+    const info = first(item, '[data-testid="information-question"]');
+    const labels = Array.from(item.querySelectorAll('label'));
+
+    const blob = [text(item)];
+    item.querySelectorAll('input,textarea,select').forEach(c => {
+        ['name', 'id', 'placeholder', 'aria-label', 'data-testid', 'type'].forEach(a => {
+            const v = c.getAttribute(a);
+            if (v) blob.push(v);
+        });
+    });
+
+    const errNodes = xpathAll(item, ".//*[contains(@id,'error') or contains(@id,'error-text') or contains(@class,'error') or @role='alert' or @aria-live='assertive']");
+    const testidEl = first(item, '[data-testid]');
+    const textbox = first(item, 'textarea, input:not([type="radio"]):not([type="checkbox"])');
+
+    return {
+        el: item,
+        legend: legend ? text(legend) : null,
+        rich: rich ? text(rich) : null,
+        info: info ? text(info) : null,
+        label0: labels.length ? text(labels[0]) : null,
+        asterisk: !!xpathFirst(item, ".//label//*[normalize-space(text())='*'] | .//*[normalize-space(text())='*' and (@aria-hidden='true' or self::span or self::div)]"),
+        required_attr: !!first(item, "input[required], select[required], textarea[required], [aria-required='true']"),
+        invalid: !!first(item, "[aria-invalid='true']"),
+        err_text: errNodes.map(text).filter(Boolean).join(' '),
+        testid: testidEl ? (testidEl.getAttribute('data-testid') || '') : '',
+        blob: blob.join(' ').toLowerCase(),
+        has_text_input: !!first(item, "input[type='text'], input:not([type]), textarea"),
+        radio_in_label: !!first(item, 'label > input[type="radio"]'),
+        checkbox_in_label: !!first(item, 'label > input[type="checkbox"]'),
+        labels: labels.map(lab => {
+            const span = Array.from(lab.querySelectorAll('span')).map(text).find(Boolean);
+            return {
+                el: lab, text: text(lab), span: span || '',
+                radio: control(first(lab, 'input[type="radio"]')),
+                checkbox: control(first(lab, 'input[type="checkbox"]')),
+            };
+        }),
+        selects: Array.from(item.querySelectorAll('select')).map(sel => {
+            const id = sel.getAttribute('id') || '';
+            const lab = id ? item.querySelector('label[for="' + CSS.escape(id) + '"]') : null;
+            return {
+                el: sel, id: id, name: sel.getAttribute('name') || '',
+                label: lab ? text(lab) : null,
+                options: Array.from(sel.options).map(o => ({
+                    text: text(o) || (o.text || '').trim(), value: (o.getAttribute('value') === null ? o.value : o.getAttribute('value')).trim(), selected: o.selected
+                })),
+            };
+        }),
+        textbox: textbox ? {
+            el: textbox, tag: textbox.tagName.toLowerCase(),
+            id: textbox.getAttribute('id') || '', name: textbox.getAttribute('name') || ''
+        } : null,
+    };
+});
+"""
+
+def _snapshot_options(raw, kind):
+    """Build the option dicts for a radio/checkbox item from its snapshot labels."""
+    options = []
+    selected = None
+    for lab in raw["labels"]:
+        ctrl = lab.get(kind)
+        if not ctrl:
+            continue
+        label_text = lab["span"] or lab["text"]
+        opt = {
+            "label": label_text,
+            "input": ctrl["el"],
+            "label_el": lab["el"],
+            "input_locator": _input_locator_from(ctrl["id"], ctrl["name"], ctrl["value"]),
+            "label_locator": (By.CSS_SELECTOR, f'label[for="{ctrl["id"]}"]') if ctrl["id"] else None,
+        }
+        if kind == "radio":
+            opt["selected"] = ctrl["checked"]
+            if ctrl["checked"]:
+                selected = label_text
+        options.append(opt)
+    return options, selected
+
+def _extract_questions_snapshot(driver):
+    """
+    Same question dicts as the per-element extractor, built from one
+    execute_script call. Element handles come back inside that payload, so
+    nothing else touches the browser until a control is actually used.
+    """
+    results = []
+    for raw in driver.execute_script(_SNAPSHOT_JS) or []:
+        q_text = raw["legend"] or None
+        if not q_text and raw["rich"] is not None:
+            q_text = raw["rich"]
+        if not q_text and raw["info"] is not None:
+            q_text = raw["info"]
+        if not q_text and raw["label0"] is not None:
+            q_text = re.sub(r"\s*\*\s*$", "", raw["label0"]).strip() or None
+        if not q_text:
+            continue
+
+        required = bool(raw["asterisk"] or raw["required_attr"] or raw["invalid"]
+                        or (raw["err_text"] and ERROR_TEXT_RE.search(raw["err_text"])))
+        if("upload" in q_text.lower()):
+            continue
+        entry = {"question": q_text, "required": required, "kind": None,
+                 "element": raw["el"], "options": [], "input": None, "input_locator": None,
+                 "slot_blob": raw["blob"], "has_text_input": raw["has_text_input"], "testid": raw["testid"],
+                 "control_id": "", "control_name": ""}
+
+        if "interview" in q_text.lower() and raw["selects"]:
+            slot_inputs = {}
+            for sel in raw["selects"]:
+                if not sel["id"] or sel["label"] is None:
+                    continue
+                if "Day" in sel["label"]:
+                    slot_inputs["Day"] = sel["el"]
+                elif "Time" in sel["label"]:
+                    slot_inputs["Time"] = sel["el"]
+            if "Day" in slot_inputs and "Time" in slot_inputs:
+                entry["kind"] = "availability"
+                entry["availability_slots"] = [slot_inputs]
+                results.append(entry)
+                continue
+
+        kind = "radio" if raw["radio_in_label"] else "checkbox" if raw["checkbox_in_label"] else None
+        if kind:
+            entry["kind"] = kind
+            entry["options"], selected = _snapshot_options(raw, kind)
+            if selected is not None:
+                entry["selected"] = selected
+            first_ctrl = next((lab[kind] for lab in raw["labels"] if lab.get(kind)), None)
+            if first_ctrl:
+                entry["control_id"], entry["control_name"] = first_ctrl["id"], first_ctrl["name"]
+            results.append(entry)
+            continue
+
+        if raw["selects"]:
+            sel = raw["selects"][0]
+            entry["kind"] = "select"
+            entry["input"] = sel["el"]
+            entry["input_locator"] = _el_locator_from(sel["id"], sel["name"])
+            entry["control_id"], entry["control_name"] = sel["id"], sel["name"]
+            entry["select_options"] = sel["options"]
+            results.append(entry)
+            continue
+
+        box = raw["textbox"]
+        if box:
+            entry["kind"] = "textarea" if box["tag"] == "textarea" else "text"
+            entry["input"] = box["el"]
+            entry["input_locator"] = _el_locator_from(box["id"], box["name"])
+            entry["control_id"], entry["control_name"] = box["id"], box["name"]
+            results.append(entry)
+            continue
+
+        entry["kind"] = "info"
+        results.append(entry)
+    return results
+
+@traced()
 def extract_questions_with_elements(driver, timeout=10):
     '''
     [
@@ -545,6 +861,13 @@ def extract_questions_with_elements(driver, timeout=10):
             "options": list,          # A list of option dictionaries for "radio" or "checkbox" question types. Empty for others.
             "input": WebElement,      # The main input element (e.g., <select> or <input>). Null for "info" and "radio/checkbox" types.
             "input_locator": tuple,   # A tuple (By, str) for locating the main input element. Null for "info" and "radio/checkbox" types.
+            # Filled by the snapshot extractor only (readers fall back to the live element without them):
+            "slot_blob": str,         # Lower-cased item text + control attributes, see _item_blob_for_slots.
+            "has_text_input": bool,   # Whether the item holds a text input/textarea (URL slot sanity check).
+            "testid": str,            # First data-testid in the item subtree, see _question_key.
+            "control_id": str,        # id/name of the main control (or first option input).
+            "control_name": str,
+            "select_options": list,   # [{"text", "value", "selected"}] for "select" questions.
         },
         # ... more question dictionaries ...
     ]
@@ -561,6 +884,18 @@ def extract_questions_with_elements(driver, timeout=10):
         # ... more option dictionaries ...
     ]
     '''
+    try:
+        results = _extract_questions_snapshot(driver)
+    except Exception as e:
+        print(f"[extract] Snapshot extraction failed ({e}); falling back to per-element extraction.")
+        results = _extract_questions_legacy(driver)
+    temp = [i["question"][:25] for i in results]
+    print(f"Extracted {len(results)} questions from the page.")
+    print(f"Questions Preview: {temp}")
+    return results
+
+def _extract_questions_legacy(driver):
+    """Per-element extraction (one WebDriver round trip per lookup); kept as a fallback."""
     driver.implicitly_wait(0)
     items = driver.find_elements(By.CSS_SELECTOR, "div[id^='q_']")
     
@@ -610,7 +945,7 @@ def extract_questions_with_elements(driver, timeout=10):
                         continue
                     
                     # Find the label that is explicitly linked to this select element
-                    label_el = item.find_element(By.CSS_SELECTOR, f'label[for="{select_id}"]')
+                    label_el = find(item, By.CSS_SELECTOR, f'label[for="{select_id}"]', mode=EXPECTED, budget=0)
                     label_text = label_el.text.strip()
 
                     if "Day" in label_text:
@@ -695,9 +1030,6 @@ def extract_questions_with_elements(driver, timeout=10):
 
         entry["kind"] = "info"
         results.append(entry)
-    driver.implicitly_wait(5)
-    temp = [i["question"][:25] for i in results]
-    print(f"Extracted {len(results)} questions from the page.")
-    print(f"Questions Preview: {temp}")
+    driver.implicitly_wait(IMPLICIT_WAIT)
     return results
 
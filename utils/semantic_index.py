@@ -0,0 +1,248 @@
+import json
+import os
+import threading
+from config import config
+from utils.answer_utils import adapt_answer_to_question, infer_question_category
+from utils.text_utils import _normalize_q
+
+# Semantic recall: when no stored question is a close string match, fall back to the
+# nearest stored question by sentence embedding ("Do you have US work authorization?"
+# ~ "are you legally authorized to work in the us"). The embeddings live next to
+# QA_MEMORY_FILE as a raw float32 matrix (memory-mapped), a key list and a meta file:
+#   qa_memory.emb.f32 / qa_memory.emb.keys.jsonl / qa_memory.emb.meta.json
+# The model is loaded on the first page with an unanswered question, not at startup, and
+# loading it plus embedding a large backlog runs in a background thread; pages seen meanwhile
+# just get no semantic matches. `python -m utils.semantic_index` builds the index offline.
+SEMANTIC_RECALL = getattr(config, "SEMANTIC_RECALL", False)
+SEMANTIC_MODEL = getattr(config, "SEMANTIC_MODEL", "all-mpnet-base-v2")
+SEMANTIC_THRESHOLD = getattr(config, "SEMANTIC_THRESHOLD", 0.82)
+SEMANTIC_BATCH = 64
+SEMANTIC_INLINE_MAX = 32   # more unindexed keys than this (or no model yet) -> encode in the background
+
+
+def index_paths(memory_file):
+    base = os.path.splitext(memory_file)[0] + ".emb"
+    return base + ".f32", base + ".keys.jsonl", base + ".meta.json"
+
+def compatible(stored_question, stored_answer, question, kind=None, options=None):
+    """
+    Whether a stored answer can be reused for a semantically similar question:
+      - yes/no answers must have the same polarity ("authorized to work" vs "require sponsorship")
+      - lists only go to checkboxes, and option questions must accept the answer
+    """
+    category = infer_question_category(stored_question, stored_answer)
+    if category.startswith("boolean") and infer_question_category(question, stored_answer) != category:
+        return False
+    if category == "list" and kind not in (None, "checkbox"):
+        return False
+    if options and adapt_answer_to_question(stored_answer, question, options) in (None, []):
+        return False
+    return True
+
+
+class SemanticIndex:
+    """Append-only embedding matrix over memory keys; new keys are queued and encoded in batches."""
+
+    def __init__(self, memory_file, model_name=SEMANTIC_MODEL, threshold=SEMANTIC_THRESHOLD):
+        self.matrix_path, self.keys_path, self.meta_path = index_paths(memory_file)
+        self.model_name = model_name
+        self.threshold = threshold
+        self._model = None
+        self._lock = threading.RLock()
+        self._pending_lock = threading.Lock()   # separate, so note() never waits on an encode
+        self._pending = {}          # key -> None (ordered set of keys waiting to be encoded)
+        self.keys = []
+        self._rows = {}             # key -> row
+        self._matrix = None
+        self.dim = None
+        self.hits = self.misses = self.rejected = 0
+        self._backfill = None       # background thread loading the model / encoding a backlog
+        self._load()
+
+    # --- storage --- #
+    def _load(self):
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except Exception:
+            meta = {}
+        if meta.get("model") != self.model_name:
+            self._reset()
+            return
+        try:
+            self.dim = meta["dim"]
+            with open(self.keys_path, "r", encoding="utf-8") as f:
+                keys = [json.loads(line) for line in f if line.strip()]
+            # rows written before a crash but never recorded in meta are dropped
+            self.keys = keys[:meta["rows"]]
+            if len(keys) > len(self.keys):
+                with open(self.keys_path, "w", encoding="utf-8") as f:
+                    f.writelines(json.dumps(k, ensure_ascii=False) + "\n" for k in self.keys)
+            self._rows = {k: i for i, k in enumerate(self.keys)}
+            self._map()
+        except Exception as e:
+            print(f"[semantic] Index unreadable ({e}); rebuilding.")
+            self._reset()
+
+    def _unmap(self):
+        # Windows can neither resize nor delete a file that is still memory-mapped
+        matrix, self._matrix = self._matrix, None
+        del matrix
+
+    def _reset(self):
+        self._unmap()
+        for path in (self.matrix_path, self.keys_path, self.meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.keys, self._rows, self._matrix, self.dim = [], {}, None, None
+
+    def _map(self):
+        import numpy as np
+        self._matrix = None
+        if self.keys:
+            self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r", shape=(len(self.keys), self.dim))
+
+    def _append(self, keys, vectors):
+        folder = os.path.dirname(self.matrix_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        rows = len(self.keys)
+        self._unmap()
+        with open(self.matrix_path, "r+b" if os.path.exists(self.matrix_path) else "wb") as f:
+            f.seek(rows * self.dim * 4)
+            f.write(vectors.astype("float32").tobytes())
+            f.truncate()
+        with open(self.keys_path, "w" if rows == 0 else "a", encoding="utf-8") as f:
+            for k in keys:
+                f.write(json.dumps(k, ensure_ascii=False) + "\n")
+        for k in keys:
+            self._rows[k] = len(self.keys)
+            self.keys.append(k)
+        # meta last: it is what marks the new rows as valid
+        with open(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump({"model": self.model_name, "dim": self.dim, "rows": len(self.keys)}, f)
+        self._map()
+
+    # --- model --- #
+    def model(self):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            print(f"[semantic] Loading {self.model_name}...")
+            self._model = SentenceTransformer(self.model_name)
+            self.dim = self._model.get_sentence_embedding_dimension()
+        return self._model
+
+    def encode(self, texts):
+        return self.model().encode(texts, batch_size=SEMANTIC_BATCH, normalize_embeddings=True,
+                                   convert_to_numpy=True, show_progress_bar=False)
+
+    # --- updates --- #
+    def note(self, key):
+        """Queue a remembered key; it is encoded with the next batch (cheap, no model load)."""
+        if key not in self._rows:
+            with self._pending_lock:
+                self._pending[key] = None
+
+    def queue(self, keys):
+        """Queue every memory key that has no embedding yet; returns how many are waiting."""
+        with self._pending_lock:
+            for key in keys:
+                if isinstance(key, str) and not key.startswith("_") and key not in self._rows:
+                    self._pending[key] = None
+            return len(self._pending)
+
+    def sync(self, keys):
+        """Queue every memory key that has no embedding yet, then encode them all."""
+        self.queue(keys)
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            with self._pending_lock:
+                keys = [k for k in self._pending if k not in self._rows]
+                self._pending.clear()
+            if not keys:
+                return
+            self.model()   # sets self.dim
+            for i in range(0, len(keys), SEMANTIC_BATCH * 16):
+                chunk = keys[i:i + SEMANTIC_BATCH * 16]
+                self._append(chunk, self.encode(chunk))
+            print(f"[semantic] Indexed {len(keys)} question(s) ({len(self.keys)} total)")
+
+    def _backfilling(self):
+        return self._backfill is not None and self._backfill.is_alive()
+
+    def _start_backfill(self):
+        def run():
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[semantic] Background indexing failed: {e}")
+        self._backfill = threading.Thread(target=run, name="semantic-backfill", daemon=True)
+        self._backfill.start()
+
+    # --- lookup --- #
+    def match(self, mem, items, keys):
+        """
+        items: [(question, kind, options)] not found by string matching; keys: snapshot of
+        the memory's keys (taken under mem_lock by the caller).
+        One matrix product for the whole page; returns a stored key (or None) per item,
+        the most similar one above the threshold whose answer type fits the question.
+        """
+        if not items:
+            return []
+        waiting = self.queue(keys)
+        if self._backfilling():
+            return [None] * len(items)   # don't wait on the background thread holding the lock
+        with self._lock:
+            if self._backfilling():
+                return [None] * len(items)
+            if self._model is None or waiting > SEMANTIC_INLINE_MAX:
+                self._start_backfill()
+                return [None] * len(items)
+            self.flush()
+            if self._matrix is None:
+                return [None] * len(items)
+            scores = self.encode([_normalize_q(q) for q, _, _ in items]) @ self._matrix.T
+        out = []
+        for (question, kind, options), row in zip(items, scores):
+            found = None
+            for j in row.argsort()[::-1][:10]:
+                if row[j] < self.threshold:
+                    break
+                key = self.keys[j]
+                entry = mem.get(key)
+                if not isinstance(entry, dict):
+                    continue   # deleted since it was indexed
+                if compatible(key, entry.get("answer"), question, kind, options):
+                    found = key
+                    break
+                self.rejected += 1
+            if found is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                print(f"[semantic] '{question[:60]}' ~ '{found[:60]}' ({row[self._rows[found]]:.2f})")
+            out.append(found)
+        return out
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_semantic_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SemanticIndex(config.QA_MEMORY_FILE)
+        return _index
+
+def report():
+    if _index is not None and (_index.hits or _index.misses):
+        print(f"[semantic] hits={_index.hits} misses={_index.misses} rejected_by_type={_index.rejected} "
+              f"indexed={len(_index.keys)}")
+
+if __name__ == "__main__":
+    # offline build: python -m utils.semantic_index
+    from utils.memory_utils import load_qa_memory
+    get_semantic_index().sync(list(load_qa_memory()))
@@ -0,0 +1,189 @@
+import csv
+import glob
+import json
+import os
+import sqlite3
+import threading
+from config import config
+from utils.text_utils import _normalize_q
+
+# Optional single-file backend for QA memory, slots, missed-question counters and the
+# application log. Enabled with STORAGE_BACKEND = "sqlite" in config.py.
+SQLITE_DB_FILE = getattr(config, "SQLITE_DB_FILE", "./data/applybot.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS qa (
+    key     TEXT PRIMARY KEY,   -- key as stored in qa_memory.json
+    norm    TEXT NOT NULL,      -- _normalize_q(key)
+    kind    TEXT,
+    answer  TEXT,               -- JSON encoded
+    ts      TEXT
+);
+DROP INDEX IF EXISTS qa_norm;   -- lookups go through the in-memory QAMemory
+
+CREATE TABLE IF NOT EXISTS slots (
+    key     TEXT PRIMARY KEY,
+    value   TEXT                -- JSON encoded
+);
+
+CREATE TABLE IF NOT EXISTS missed_counts (
+    q_key    TEXT PRIMARY KEY,
+    question TEXT,
+    kind     TEXT,
+    count    INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS applications (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts          TEXT NOT NULL,
+    title       TEXT,
+    company     TEXT,
+    url         TEXT,
+    status      TEXT,
+    description TEXT
+);
+DROP INDEX IF EXISTS applications_uniq;            -- was (ts, title, company): ts differs on every log
+DROP INDEX IF EXISTS applications_company_title;
+"""
+
+# one application per company + title + day (the CSV logs carry no job key); rows an older
+# schema let through are collapsed to the first one when the index is created
+_APPLICATIONS_UNIQUE = """
+BEGIN;
+DELETE FROM applications WHERE id NOT IN (
+    SELECT MIN(id) FROM applications GROUP BY company, title, substr(ts, 1, 10)
+);
+CREATE UNIQUE INDEX applications_day ON applications(company, title, substr(ts, 1, 10));
+COMMIT;
+"""
+
+_conn = None
+_lock = threading.RLock()
+
+
+def enabled():
+    return getattr(config, "STORAGE_BACKEND", "json") == "sqlite"
+
+def connect():
+    """Open (once) the shared connection and make sure the schema exists."""
+    global _conn
+    with _lock:
+        if _conn is None:
+            folder = os.path.dirname(SQLITE_DB_FILE)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            _conn = sqlite3.connect(SQLITE_DB_FILE, check_same_thread=False)
+            _conn.execute("PRAGMA journal_mode=WAL")
+            _conn.execute("PRAGMA synchronous=NORMAL")
+            _conn.executescript(_SCHEMA)
+            if not _conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'applications_day'").fetchone():
+                _conn.executescript(_APPLICATIONS_UNIQUE)
+        return _conn
+
+def _write(sql, params=()):
+    with _lock:
+        conn = connect()
+        with conn:  # one transaction per write
+            conn.execute(sql, params)
+
+# --- QA memory --- #
+def load_memory():
+    """Return the qa_memory.json-shaped dict (questions + '_slots') from the database."""
+    with _lock:
+        conn = connect()
+        mem = {}
+        for key, kind, answer, ts in conn.execute("SELECT key, kind, answer, ts FROM qa"):
+            mem[key] = {"kind": kind, "answer": json.loads(answer), "ts": ts}
+        slots = {k: json.loads(v) for k, v in conn.execute("SELECT key, value FROM slots")}
+    if slots:
+        mem["_slots"] = slots
+    return mem
+
+def put_answer(key, entry):
+    _write(
+        "INSERT INTO qa(key, norm, kind, answer, ts) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET kind=excluded.kind, answer=excluded.answer, ts=excluded.ts",
+        (key, _normalize_q(key), entry.get("kind"), json.dumps(entry.get("answer"), ensure_ascii=False), entry.get("ts")),
+    )
+
+def put_slot(key, value):
+    _write(
+        "INSERT INTO slots(key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+        (key, json.dumps(value, ensure_ascii=False)),
+    )
+
+# --- missed questions --- #
+def bump_missed_counts(entries):
+    """entries: [(q_key, question, kind)] -- one UPSERT increment each, in a single transaction."""
+    with _lock:
+        conn = connect()
+        with conn:
+            conn.executemany(
+                "INSERT INTO missed_counts(q_key, question, kind, count) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT(q_key) DO UPDATE SET count = count + 1, kind = excluded.kind, "
+                "question = COALESCE(NULLIF(excluded.question, ''), question)",
+                entries,
+            )
+
+# --- applications --- #
+def add_application(ts, title, company, url, status, desc):
+    _write(
+        "INSERT OR IGNORE INTO applications(ts, title, company, url, status, description) VALUES (?, ?, ?, ?, ?, ?)",
+        (ts, title, company, url, status, desc),
+    )
+
+# --- one-shot import of the flat files --- #
+def migrate_from_files():
+    """
+    Import qa_memory.json (+ journal), missed_question_counts.json and every
+    jobs_applied_*.csv into the database. Safe to re-run: rows already in the
+    database win, counters keep the larger value, applications are de-duplicated
+    (one per company + title + day).
+    """
+    from utils.memory_utils import _load_json_qa_memory, _load_counts
+
+    mem = _load_json_qa_memory()
+    counts = _load_counts()
+    logs = sorted(glob.glob(config.LOG_FILE + "*.csv"))
+    stats = {"answers": 0, "slots": 0, "missed": 0, "applications": 0}
+
+    with _lock:
+        conn = connect()
+        with conn:
+            for key, entry in mem.items():
+                if key == "_slots":
+                    for slot_key, value in (entry or {}).items():
+                        cur = conn.execute(
+                            "INSERT OR IGNORE INTO slots(key, value) VALUES (?, ?)",
+                            (slot_key, json.dumps(value, ensure_ascii=False)),
+                        )
+                        stats["slots"] += cur.rowcount
+                    continue
+                if not isinstance(entry, dict):
+                    continue
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO qa(key, norm, kind, answer, ts) VALUES (?, ?, ?, ?, ?)",
+                    (key, _normalize_q(key), entry.get("kind"), json.dumps(entry.get("answer"), ensure_ascii=False), entry.get("ts")),
+                )
+                stats["answers"] += cur.rowcount
+
+            for q_key, entry in counts.items():
+                conn.execute(
+                    "INSERT INTO missed_counts(q_key, question, kind, count) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(q_key) DO UPDATE SET count = MAX(count, excluded.count)",
+                    (q_key, entry.get("question"), entry.get("kind"), int(entry.get("count", 0))),
+                )
+                stats["missed"] += 1
+
+            for path in logs:
+                with open(path, newline="", encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        cur = conn.execute(
+                            "INSERT OR IGNORE INTO applications(ts, title, company, url, status, description) VALUES (?, ?, ?, ?, ?, ?)",
+                            (row.get("Timestamp"), row.get("Job Title"), row.get("Company"), row.get("Job URL"), row.get("$$$"), row.get("Description")),
+                        )
+                        stats["applications"] += cur.rowcount
+
+    print(f"[sqlite] Migrated into {SQLITE_DB_FILE}: {stats['answers']} answers, {stats['slots']} slots, "
+          f"{stats['missed']} missed-question counters, {stats['applications']} applications from {len(logs)} log file(s).")
+    return stats
@@ -0,0 +1,171 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from config import config
+
+# Lightweight span tracing. Spans (context manager / decorator) are timed with
+# perf_counter; those running inside an application trace are written as one JSONL line
+# per application, and every span feeds a rolling per-name summary (p50/p95/max) that is
+# kept on disk so bottlenecks can be ranked across a whole day of runs.
+TRACING = getattr(config, "TRACING", True)
+TRACE_DIR = getattr(config, "TRACE_DIR", "./data/traces")
+TRACE_SUMMARY_WINDOW = getattr(config, "TRACE_SUMMARY_WINDOW", 5000)  # latest durations kept per span name
+TRACE_SUMMARY_EVERY = getattr(config, "TRACE_SUMMARY_EVERY", 20)      # applications between summary.json writes
+
+_local = threading.local()
+_lock = threading.Lock()
+_save_lock = threading.Lock()   # one summary.json writer at a time, without holding _lock
+_summary = None   # span name -> deque of recent durations (seconds)
+_unsaved = 0      # applications finished since summary.json was last written
+
+
+def _summary_path():
+    return os.path.join(TRACE_DIR, "summary.json")
+
+def _load_summary():
+    global _summary
+    if _summary is None:
+        try:
+            with open(_summary_path(), "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except Exception:
+            raw = {}
+        _summary = {k: deque(v, maxlen=TRACE_SUMMARY_WINDOW) for k, v in raw.items()}
+    return _summary
+
+def _save_summary():
+    """Write summary.json from a snapshot, so spans keep recording while it is serialized."""
+    global _unsaved
+    with _save_lock:
+        with _lock:
+            if _summary is None:
+                return
+            data = {k: list(v) for k, v in _summary.items()}
+            _unsaved = 0
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        tmp = _summary_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({k: [round(x, 4) for x in v] for k, v in data.items()}, f)
+        os.replace(tmp, _summary_path())
+
+
+class Trace:
+    def __init__(self, meta):
+        self.meta = meta
+        self.t0 = time.perf_counter()
+        self.started = datetime.now().isoformat(timespec="seconds")
+        self.spans = []
+        self.depth = 0
+        self.step = None   # (name, start, attrs) of the open flow step
+
+
+def current_trace():
+    return getattr(_local, "trace", None)
+
+def _record(name, start, dur, attrs):
+    tr = current_trace()
+    if tr is not None:
+        tr.spans.append({"name": name, "start": round(start - tr.t0, 4), "dur": round(dur, 4), "depth": tr.depth, **attrs})
+    with _lock:
+        _load_summary().setdefault(name, deque(maxlen=TRACE_SUMMARY_WINDOW)).append(dur)
+
+@contextmanager
+def span(name, **attrs):
+    """Time the enclosed block as `name` (nested spans are recorded with their depth)."""
+    if not TRACING:
+        yield
+        return
+    tr = current_trace()
+    start = time.perf_counter()
+    if tr is not None:
+        tr.depth += 1
+    try:
+        yield
+    finally:
+        if tr is not None:
+            tr.depth -= 1
+        _record(name, start, time.perf_counter() - start, attrs)
+
+def traced(name=None):
+    """Decorator form of span(); the span name defaults to the function name."""
+    def wrap(fn):
+        label = name or fn.__name__
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with span(label):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+def step(name, **attrs):
+    """Close the current flow step (if any) and open the next one, e.g. step('step:/form/questions')."""
+    tr = current_trace()
+    if not TRACING or tr is None:
+        return
+    now = time.perf_counter()
+    if tr.step is not None:
+        s_name, s_start, s_attrs = tr.step
+        _record(s_name, s_start, now - s_start, s_attrs)
+    tr.step = (name, now, attrs) if name else None
+
+def start_trace(**meta):
+    """Begin the trace of one application on this thread (job title/company/key as meta)."""
+    if TRACING:
+        _local.trace = Trace(meta)
+
+def end_trace(**outcome):
+    """Finish this thread's application trace: append it to today's JSONL (summary.json every TRACE_SUMMARY_EVERY)."""
+    global _unsaved
+    tr = current_trace()
+    if not TRACING or tr is None:
+        return
+    step(None)
+    total = time.perf_counter() - tr.t0
+    _record("application", tr.t0, total, {})
+    _local.trace = None
+    line = {"ts": tr.started, "total": round(total, 3), **tr.meta, **outcome, "spans": tr.spans}
+    with _lock:
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        path = os.path.join(TRACE_DIR, f"traces_{datetime.now().strftime('%Y%m%d')}.jsonl")
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        _unsaved += 1
+        due = _unsaved >= TRACE_SUMMARY_EVERY
+    if due:
+        _save_summary()
+
+def _pct(sorted_vals, p):
+    return sorted_vals[min(len(sorted_vals) - 1, int(p * len(sorted_vals)))]
+
+def summary():
+    """{span name: {n, p50, p95, max, total}} over the rolling window, slowest total first."""
+    with _lock:
+        data = {k: sorted(v) for k, v in _load_summary().items() if v}
+    rows = {
+        k: {"n": len(v), "p50": _pct(v, 0.5), "p95": _pct(v, 0.95), "max": v[-1], "total": sum(v)}
+        for k, v in data.items()
+    }
+    return dict(sorted(rows.items(), key=lambda kv: -kv[1]["total"]))
+
+def report(top=25):
+    if not TRACING:
+        return
+    _save_summary()
+    for name, s in list(summary().items())[:top]:
+        print(f"[trace] {name:<40} n={s['n']:<5} p50={s['p50']:.2f}s p95={s['p95']:.2f}s max={s['max']:.2f}s total={s['total']:.0f}s")
+
+
+@atexit.register
+def _save_on_exit():
+    if _unsaved:
+        _save_summary()
+
+
+if __name__ == "__main__":
+    report(top=100)
@@ -0,0 +1,99 @@
+import os
+import sys
+import threading
+import time
+from config import config
+
+# Opt-in WebDriver command profiler (WD_PROFILE = True). Wraps driver.execute -- which
+# WebElements call through as well -- to count every command and its latency, attributed
+# to the utils/ function that issued it and to the application page it happened on.
+WD_PROFILE = getattr(config, "WD_PROFILE", False)
+
+_UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+_SKIP_FILES = {"wd_profiler.py", "locators.py", "tracing.py"}   # helpers: charge their caller instead
+_site_of_file = {}
+
+
+class CommandStats:
+    def __init__(self):
+        self.by_func = {}   # "module.function" -> [commands, seconds]
+        self.by_page = {}   # page -> [commands, seconds]
+        self.by_cmd = {}    # WebDriver command name -> [commands, seconds]
+
+    def add(self, func, page, cmd, secs):
+        for table, key in ((self.by_func, func), (self.by_page, page), (self.by_cmd, cmd)):
+            row = table.setdefault(key, [0, 0.0])
+            row[0] += 1
+            row[1] += secs
+
+    def total(self):
+        return sum(n for n, _ in self.by_cmd.values()), sum(s for _, s in self.by_cmd.values())
+
+    def report(self, title, top=12):
+        n, secs = self.total()
+        if not n:
+            return
+        print(f"[webdriver] {title}: {n} commands, {secs:.1f}s in WebDriver")
+        print("  commands per page: " + ", ".join(f"{p}={c}" for p, (c, _) in sorted(self.by_page.items(), key=lambda kv: -kv[1][0])))
+        for func, (c, s) in sorted(self.by_func.items(), key=lambda kv: -kv[1][1])[:top]:
+            print(f"  {func:<50} {c:>6} cmds {s:>7.2f}s")
+
+
+_run = CommandStats()
+_run_lock = threading.Lock()
+
+
+def _site(frame):
+    """First utils/ function (outside the helper modules) on the stack."""
+    while frame is not None:
+        path = frame.f_code.co_filename
+        mod = _site_of_file.get(path)
+        if mod is None:
+            inside = os.path.dirname(os.path.abspath(path)) == _UTILS_DIR and os.path.basename(path) not in _SKIP_FILES
+            mod = os.path.splitext(os.path.basename(path))[0] if inside else ""
+            _site_of_file[path] = mod
+        if mod:
+            return f"{mod}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "<outside utils>"
+
+def profile_driver(driver):
+    """Wrap driver.execute in place (and so every WebElement command) with the profiler."""
+    orig = driver.execute
+    driver._wd_app = CommandStats()
+    driver._wd_page = "search"
+    driver._wd_lock = threading.Lock()
+
+    def execute(driver_command, params=None):
+        start = time.perf_counter()
+        try:
+            return orig(driver_command, params)
+        finally:
+            secs = time.perf_counter() - start
+            func = _site(sys._getframe(1))
+            with driver._wd_lock:
+                driver._wd_app.add(func, driver._wd_page, driver_command, secs)
+            with _run_lock:
+                _run.add(func, driver._wd_page, driver_command, secs)
+
+    driver.execute = execute
+    return driver
+
+def set_page(driver, page):
+    """Attribute the following commands to `page` (e.g. the application step's route)."""
+    if hasattr(driver, "_wd_app"):
+        driver._wd_page = page
+
+def application_done(driver, title=""):
+    """Print and reset the per-application counters."""
+    if not hasattr(driver, "_wd_app"):
+        return
+    with driver._wd_lock:
+        stats, driver._wd_app = driver._wd_app, CommandStats()
+        driver._wd_page = "search"
+    stats.report(f"application {title[:50]!r}")
+
+def report():
+    """Whole-run totals."""
+    with _run_lock:
+        _run.report("run total", top=25)
@@ -0,0 +1,156 @@
+import os
+import queue
+import shutil
+import threading
+import time
+from selenium.webdriver.common.by import By
+from config import config
+from utils.applied_index import get_applied_index
+from utils.application_flow import _applied_this_run, apply_to_job
+from utils.browser_utils import _safe_click, human_sleep, setup_driver
+from utils.job_cards import filter_cards, harvest_cards
+from utils.locators import EXPECTED, find
+
+# Several browsers applying in parallel. The main browser walks the search results and
+# feeds filtered JobCards into a bounded queue; each worker has its own Chrome (with a
+# copy of the logged-in profile) and applies to the cards it pulls off the queue.
+WORKERS = getattr(config, "WORKERS", 1)
+WORKER_PROFILE_DIR = getattr(config, "WORKER_PROFILE_DIR", "./data/worker_profiles")
+WORKER_QUEUE_SIZE = getattr(config, "WORKER_QUEUE_SIZE", 10)
+POOL_REPORT_EVERY = getattr(config, "POOL_REPORT_EVERY", 300)  # seconds
+
+# Chrome refuses a profile another instance holds; caches are just dead weight in a copy
+_PROFILE_SKIP = shutil.ignore_patterns("Singleton*", "lockfile", "*Cache*", "Crashpad", "ShaderCache", "GrShaderCache")
+
+_launch_lock = threading.Lock()  # undetected_chromedriver patches its binary on launch; start one at a time
+
+
+def clone_profile(n, refresh=False):
+    """
+    Copy PROFILE_PATH to WORKER_PROFILE_DIR/worker_<n> (once) and return the copy's path.
+    Copied to a temporary folder first and renamed into place, so a failed copy is never reused.
+    PROFILE_PATH must not be open in a browser (Chrome locks Cookies / Login Data on Windows,
+    and its SQLite files could be caught mid-write): see clone_profiles().
+    """
+    dest = os.path.abspath(os.path.join(WORKER_PROFILE_DIR, f"worker_{n}"))
+    if refresh and os.path.isdir(dest):
+        shutil.rmtree(dest)
+    if not os.path.isdir(dest):
+        print(f"[pool] Cloning browser profile for worker {n} -> {dest}")
+        tmp = dest + ".tmp"
+        if os.path.isdir(tmp):
+            shutil.rmtree(tmp)   # left by a copy that failed partway
+        shutil.copytree(config.PROFILE_PATH, tmp, ignore=_PROFILE_SKIP)
+        os.replace(tmp, dest)
+    return dest
+
+def clone_profiles(workers=WORKERS):
+    """Clone every worker's profile; call before the main browser opens PROFILE_PATH."""
+    for n in range(workers):
+        clone_profile(n)
+
+
+class PoolStats:
+    def __init__(self, workers):
+        self.start = time.time()
+        self.submitted = [0] * workers
+        self.attempted = [0] * workers
+        self._lock = threading.Lock()
+
+    def add(self, worker, submitted):
+        with self._lock:
+            self.attempted[worker] += 1
+            self.submitted[worker] += bool(submitted)
+
+    def report(self):
+        hours = max(time.time() - self.start, 1) / 3600
+        total = sum(self.submitted)
+        per = " ".join(f"w{i}={n}" for i, n in enumerate(self.submitted))
+        print(f"[pool] {total} applied / {sum(self.attempted)} attempted in {hours * 60:.0f} min "
+              f"({total / hours:.1f} applications/hour; {per})")
+
+
+def _worker(n, jobs, mem, stats, stop):
+    try:
+        with _launch_lock:
+            driver = setup_driver(clone_profile(n))
+    except Exception as e:
+        print(f"[pool] worker {n} could not start its browser: {e}")
+        return
+    try:
+        root = driver.current_window_handle
+        while not stop.is_set():
+            card = jobs.get()
+            if card is None:
+                break
+            try:
+                driver.get(card.link)
+                human_sleep(2, 3)
+                stats.add(n, apply_to_job(driver, root, mem, card) == "submitted")
+            except Exception as e:
+                print(f"[pool] worker {n} skip job: {e}")
+                stats.add(n, False)
+    finally:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+def _put(jobs, item, threads):
+    """Queue item, waiting for room; False (not queued) once no worker is left to take it."""
+    while True:
+        try:
+            jobs.put(item, timeout=1)
+            return True
+        except queue.Full:
+            if not any(t.is_alive() for t in threads):
+                return False
+
+
+def _reporter(stats, stop):
+    while not stop.wait(POOL_REPORT_EVERY):
+        stats.report()
+
+
+def run_pool(search_driver, mem, workers=WORKERS):
+    """
+    Crawl the search results with search_driver and apply with `workers` extra browsers.
+    Returns when the results run out (or on Ctrl+C / error), after the workers finish
+    the cards already queued.
+    """
+    jobs = queue.Queue(maxsize=WORKER_QUEUE_SIZE)  # back-pressure: the crawler never runs far ahead
+    stats = PoolStats(workers)
+    stop = threading.Event()
+    threads = [threading.Thread(target=_worker, args=(n, jobs, mem, stats, stop), name=f"worker-{n}", daemon=True)
+               for n in range(workers)]
+    for t in threads:
+        t.start()
+    threading.Thread(target=_reporter, args=(stats, stop), daemon=True).start()
+    try:
+        while True:
+            cards = filter_cards(harvest_cards(search_driver), applied=get_applied_index(), handled=_applied_this_run)
+            for card in cards:
+                if card.job_key:
+                    _applied_this_run.add(card.job_key)  # claimed: no other worker gets it
+                if not _put(jobs, card, threads):
+                    _applied_this_run.discard(card.job_key)
+                    raise RuntimeError("no worker browsers left")
+            el = find(search_driver, By.CSS_SELECTOR, '[data-testid="pagination-page-next"]', mode=EXPECTED)
+            _safe_click(search_driver, el)
+            time.sleep(2)
+    except Exception as e:
+        print(f"[pool] Search crawl ended: {e}")
+    except KeyboardInterrupt:
+        # drop whatever is still queued; workers stop after their current job
+        stop.set()
+        while not jobs.empty():
+            jobs.get_nowait()
+    finally:
+        for _ in threads:
+            if not _put(jobs, None, threads):
+                break
+        for t in threads:
+            t.join()
+        stop.set()
+        stats.report()